@@ -1,16 +1,38 @@
 from datetime import date
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from fastapi import Query, Depends, HTTPException, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from Services.EventService import EventService
+from Services.EventCache import get_event_cache
+from Services.SingleFlight import get_events_flight, get_async_events_flight
+from Services.MemoryIndex import get_event_index
 from Repositories.EventRepository import EventRepository
+from Repositories.MemoryEventRepository import MemoryEventRepository
+from Repositories.EventQueries import COUNT_MODES, decode_cursor, effective_sort
 from Entities.Event import Event, EventTypeEnum, PricingTypeEnum
 from database import get_session
+from db_routing import DatabaseOverloaded
+from metrics import span
 
 class EventController:
-    def __init__(self, session: Session = Depends(get_session)):
-        self.repository = EventRepository(session)
-        self.service = EventService(self.repository)
+    def __init__(self, session: Optional[Session] = Depends(get_session)):
+        # Sem sessão a listagem vem do índice em memória (EVENTS_MEMORY_INDEX); sem
+        # banco envolvido, cache de respostas e coalescência não compensam
+        self.in_memory = session is None
+        if self.in_memory:
+            self.repository = MemoryEventRepository(get_event_index())
+            self.service = EventService(self.repository)
+        elif isinstance(session, AsyncSession):
+            # O caminho assíncrono só é carregado com DB_MODE=async, encurtando a inicialização no modo sync
+            from Services.AsyncEventService import AsyncEventService
+            from Repositories.AsyncEventRepository import AsyncEventRepository
+
+            self.repository = AsyncEventRepository(session)
+            self.service = AsyncEventService(self.repository, get_event_cache(), get_async_events_flight())
+        else:
+            self.repository = EventRepository(session)
+            self.service = EventService(self.repository, get_event_cache(), get_events_flight())
     
     def list_events(
         self,
@@ -37,38 +59,125 @@ class EventController:
         ),
         sort: Optional[str] = Query(
             None, description="String usada para ordenar a lista de eventos ('relevance', 'date' ou 'popularity')."
+        ),
+        count_mode: Optional[str] = Query(
+            None, description="Como calcular o total de itens ('exact', 'estimate' ou 'none'). Padrão: 'exact', ou 'none' com cursor."
+        ),
+        cursor: Optional[str] = Query(
+            None, description="Cursor opaco ('nextCursor'/'prevCursor' de uma resposta anterior). Quando informado, 'page' é ignorado."
+        ),
+        include_description: bool = Query(
+            True, description="Inclui a descrição completa de cada evento na listagem."
+        ),
+        filter_uf: Optional[str] = Query(
+            None, description="Sigla da UF (exata) para filtrar a lista de eventos."
+        ),
+        filter_city: Optional[str] = Query(
+            None, description="Cidade (exata) para filtrar a lista de eventos."
+        ),
+        filter_category: Optional[str] = Query(
+            None, description="Categoria (exata) para filtrar a lista de eventos."
+        ),
+        facets: bool = Query(
+            False, description="Inclui as contagens por tipo, precificação, UF e categoria sob os filtros atuais."
         )
     ) -> Dict[str, Any]:
         
         try:
-            filters = {}
-            if filter_type:
-                filters["event_type"] = filter_type
-            if filter_pricing:
-                filters["pricing_type"] = filter_pricing
-            if search:
-                filters["search_query"] = search.strip()
+            filters, decoded_cursor = self._parse_list_params(
+                search, filter_type, filter_pricing, filter_interval_start, filter_interval_end, sort, count_mode, cursor,
+                filter_uf, filter_city, filter_category
+            )
+            with span("service"):
+                result = self.service.get_events(
+                    filters, page, page_size, sort, count_mode, decoded_cursor, include_description, facets
+                )
+            return self._check_result(result)
             
-            if filter_interval_start and filter_interval_end:
-                if filter_interval_start > filter_interval_end:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail={
-                            "data": None,
-                            "pagination": None,
-                            "error": {
-                                "code": "INVALID_QUERY_PARAMS",
-                                "message": "A data de início do intervalo não pode ser maior que a data de término.",
-                                "details": [
-                                    {"field": "filter-interval-start", "message": "Data inválida"},
-                                    {"field": "filter-interval-end", "message": "Data inválida"}
-                                ]
-                            }
-                        }
-                    )
-                filters["start_date_interval"] = filter_interval_start.strftime('%Y-%m-%d')
-                filters["end_date_interval"] = filter_interval_end.strftime('%Y-%m-%d')
-            elif filter_interval_start or filter_interval_end:
+        except HTTPException as he:
+            raise he
+        except DatabaseOverloaded:
+            raise
+        except Exception as e:
+            raise self._server_error(e)
+
+    async def list_events_async(
+        self,
+        search: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10,
+        filter_type: Optional[EventTypeEnum] = None,
+        filter_pricing: Optional[PricingTypeEnum] = None,
+        filter_interval_start: Optional[date] = None,
+        filter_interval_end: Optional[date] = None,
+        sort: Optional[str] = None,
+        count_mode: Optional[str] = None,
+        cursor: Optional[str] = None,
+        include_description: bool = True,
+        filter_uf: Optional[str] = None,
+        filter_city: Optional[str] = None,
+        filter_category: Optional[str] = None,
+        facets: bool = False
+    ) -> Dict[str, Any]:
+        """Mesmo contrato de `list_events`, para o serviço assíncrono (DB_MODE=async)."""
+        try:
+            filters, decoded_cursor = self._parse_list_params(
+                search, filter_type, filter_pricing, filter_interval_start, filter_interval_end, sort, count_mode, cursor,
+                filter_uf, filter_city, filter_category
+            )
+            with span("service"):
+                result = await self.service.get_events(
+                    filters, page, page_size, sort, count_mode, decoded_cursor, include_description, facets
+                )
+            return self._check_result(result)
+
+        except HTTPException as he:
+            raise he
+        except DatabaseOverloaded:
+            raise
+        except Exception as e:
+            raise self._server_error(e)
+
+    def _check_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        if result["error"]:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["error"])
+        return result
+
+    def _server_error(self, e: Exception) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+            detail={
+                "data": None,
+                "pagination": None,
+                "error": {
+                    "code": "SERVER_ERROR",
+                    "message": f"Erro interno do servidor: {str(e)}"
+                }
+            }
+        )
+
+    def _parse_list_params(
+        self,
+        search: Optional[str],
+        filter_type: Optional[EventTypeEnum],
+        filter_pricing: Optional[PricingTypeEnum],
+        filter_interval_start: Optional[date],
+        filter_interval_end: Optional[date],
+        sort: Optional[str],
+        count_mode: Optional[str],
+        cursor: Optional[str],
+        filter_uf: Optional[str] = None,
+        filter_city: Optional[str] = None,
+        filter_category: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Valida os parâmetros da listagem e retorna (filtros, cursor decodificado)."""
+        filters = {}
+        if filter_type:
+            filters["event_type"] = filter_type
+        if filter_pricing:
+            filters["pricing_type"] = filter_pricing
+        if filter_uf and filter_uf.strip():
+            if len(filter_uf.strip()) != 2 or not filter_uf.strip().isalpha():
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail={
@@ -76,46 +185,106 @@ class EventController:
                         "pagination": None,
                         "error": {
                             "code": "INVALID_QUERY_PARAMS",
-                            "message": "Para usar o filtro por intervalo de data, 'filter-interval-start' e 'filter-interval-end' devem ser fornecidos juntos.",
-                            "details": []
+                            "message": "O parâmetro 'filter_uf' deve ser a sigla da UF, com duas letras.",
+                            "details": [
+                                {"field": "filter_uf", "message": "Valor inválido"}
+                            ]
                         }
                     }
                 )
-
-            if sort and sort not in ["relevance", "date", "popularity"]:
-                 raise HTTPException(
+            filters["location_uf"] = filter_uf
+        if filter_city and filter_city.strip():
+            filters["location_city"] = filter_city
+        if filter_category and filter_category.strip():
+            filters["category"] = filter_category
+        if search:
+            filters["search_query"] = search.strip()
+        
+        if filter_interval_start and filter_interval_end:
+            if filter_interval_start > filter_interval_end:
+                raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail={
                         "data": None,
                         "pagination": None,
                         "error": {
                             "code": "INVALID_QUERY_PARAMS",
-                            "message": "O parâmetro 'sort' deve ser 'relevance', 'date' ou 'popularity'.",
+                            "message": "A data de início do intervalo não pode ser maior que a data de término.",
                             "details": [
-                                {"field": "sort", "message": "Valor inválido"}
+                                {"field": "filter-interval-start", "message": "Data inválida"},
+                                {"field": "filter-interval-end", "message": "Data inválida"}
                             ]
                         }
                     }
                 )
+            filters["start_date_interval"] = filter_interval_start.strftime('%Y-%m-%d')
+            filters["end_date_interval"] = filter_interval_end.strftime('%Y-%m-%d')
+        elif filter_interval_start or filter_interval_end:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "data": None,
+                    "pagination": None,
+                    "error": {
+                        "code": "INVALID_QUERY_PARAMS",
+                        "message": "Para usar o filtro por intervalo de data, 'filter-interval-start' e 'filter-interval-end' devem ser fornecidos juntos.",
+                        "details": []
+                    }
+                }
+            )
 
-            result = self.service.get_events(filters, page, page_size, sort)
+        if sort and sort not in ["relevance", "date", "popularity"]:
+             raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "data": None,
+                    "pagination": None,
+                    "error": {
+                        "code": "INVALID_QUERY_PARAMS",
+                        "message": "O parâmetro 'sort' deve ser 'relevance', 'date' ou 'popularity'.",
+                        "details": [
+                            {"field": "sort", "message": "Valor inválido"}
+                        ]
+                    }
+                }
+            )
 
-            if result["error"]:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=result["error"])
-            
-            return result
-            
-        except HTTPException as he:
-            raise he
-        except Exception as e:
+        if count_mode is not None and count_mode not in COUNT_MODES:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, 
+                status_code=status.HTTP_400_BAD_REQUEST,
                 detail={
                     "data": None,
                     "pagination": None,
                     "error": {
-                        "code": "SERVER_ERROR",
-                        "message": f"Erro interno do servidor: {str(e)}"
+                        "code": "INVALID_QUERY_PARAMS",
+                        "message": "O parâmetro 'count_mode' deve ser 'exact', 'estimate' ou 'none'.",
+                        "details": [
+                            {"field": "count_mode", "message": "Valor inválido"}
+                        ]
                     }
                 }
-            )
\ No newline at end of file
+            )
+
+        decoded_cursor = None
+        if cursor:
+            try:
+                decoded_cursor = decode_cursor(cursor)
+                if decoded_cursor["sort"] != effective_sort(sort, bool(filters.get("search_query"))):
+                    raise ValueError("Cursor gerado para outra ordenação")
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "data": None,
+                        "pagination": None,
+                        "error": {
+                            "code": "INVALID_QUERY_PARAMS",
+                            "message": "O parâmetro 'cursor' é inválido ou não corresponde à ordenação solicitada.",
+                            "details": [
+                                {"field": "cursor", "message": "Valor inválido"}
+                            ]
+                        }
+                    }
+                )
+
+        return filters, decoded_cursor
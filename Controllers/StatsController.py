@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+import uuid
+from Services.StatsService import StatsService
+from Repositories.RollupRepository import RollupRepository, TOP_METRICS
+from Entities.Event import GRANULARITY_HOUR, GRANULARITY_DAY
+from metrics import span
+from db_routing import database_overloaded
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class StatsController:
+    """
+    Estatísticas de atividade dos eventos. As consultas nos agregados são
+    curtas; no modo async rodam na sessão assíncrona via run_sync.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def _run(self, method: str, *args) -> Dict[str, Any]:
+        def call(session: Session):
+            service = StatsService(RollupRepository(session))
+            return getattr(service, method)(*args)
+
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(call)
+        return await run_in_threadpool(call, self.session)
+
+    async def event_stats(
+        self,
+        event_id: uuid.UUID,
+        granularity: str,
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> Dict[str, Any]:
+        if granularity not in (GRANULARITY_HOUR, GRANULARITY_DAY):
+            raise self._invalid_params("O parâmetro 'granularity' deve ser 'hour' ou 'day'.", "granularity")
+        # Os agregados são em UTC, sem fuso
+        start, end = _as_utc(start), _as_utc(end)
+        if start is not None and end is not None and start >= end:
+            raise self._invalid_params("O início do período deve ser anterior ao fim.", "start")
+
+        try:
+            with span("service"):
+                result = await self._run("get_event_stats", event_id, granularity, start, end)
+        except Exception as e:
+            overloaded = database_overloaded(e)
+            if overloaded is not None:
+                raise overloaded from e
+            raise self._server_error(e)
+
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "data": None,
+                    "error": {
+                        "code": "EVENT_NOT_FOUND",
+                        "message": "Evento não encontrado.",
+                        "details": []
+                    }
+                }
+            )
+        return result
+
+    async def top_events(self, window_hours: int, metric: str, limit: int) -> Dict[str, Any]:
+        if metric not in TOP_METRICS:
+            raise self._invalid_params("O parâmetro 'metric' deve ser 'score', 'views' ou 'registrations'.", "metric")
+        try:
+            with span("service"):
+                return await self._run("get_top_events", window_hours, metric, limit)
+        except Exception as e:
+            overloaded = database_overloaded(e)
+            if overloaded is not None:
+                raise overloaded from e
+            raise self._server_error(e)
+
+    def _invalid_params(self, message: str, field: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "data": None,
+                "error": {
+                    "code": "INVALID_QUERY_PARAMS",
+                    "message": message,
+                    "details": [{"field": field, "message": "Valor inválido"}]
+                }
+            }
+        )
+
+    def _server_error(self, e: Exception) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={
+                "data": None,
+                "error": {
+                    "code": "SERVER_ERROR",
+                    "message": f"Erro interno do servidor: {str(e)}"
+                }
+            }
+        )
@@ -1,9 +1,16 @@
 from typing import List, Optional
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import DateTime, Index, event as sa_event
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from datetime import datetime
 import enum
 import uuid
 
+# Peso de uma inscrição em relação a uma visualização no cálculo de popularidade
+WEIGHT_VIEW = 1
+WEIGHT_REGISTRATION = 2
+
 class EventTypeEnum(str, enum.Enum):
     presencial = "presencial"
     online = "online"
@@ -14,6 +21,20 @@ class PricingTypeEnum(str, enum.Enum):
     gratis = "gratis"
     pago = "pago"  
 
+class utcnow(FunctionElement):
+    """Horário atual em UTC no banco (default de `updated_at` para inserções que não passam pela aplicação, como o COPY)."""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow, "postgresql")
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    # No SQLite, CURRENT_TIMESTAMP já é UTC
+    return "CURRENT_TIMESTAMP"
+
 class Event(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
     name: str = Field(nullable=False)
@@ -27,14 +48,28 @@ class Event(SQLModel, table=True):
     event_type: EventTypeEnum = Field(sa_column_kwargs={"nullable": False})
     pricing_type: PricingTypeEnum = Field(sa_column_kwargs={"nullable": False})
     category: str = Field(nullable=False)
+    # Última alteração (UTC); é o feed de mudanças lido pelo índice em memória da listagem.
+    # Fora do ORM, o trigger `event_updated_at` mantém a coluna atualizada (ver updated_at_ddl)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        nullable=False,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow, "server_default": utcnow()}
+    )
+    # Cópia de EventPopularity.score na própria linha, para a ordenação por
+    # popularidade sair do índice sem JOIN; mantida pelo PopularityRepository
+    popularity_score: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
 
     views: List["EventView"] = Relationship(back_populates="event")
     registrations: List["EventRegistration"] = Relationship(back_populates="event")
+    popularity: Optional["EventPopularity"] = Relationship(back_populates="event")
 
 class EventView(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, nullable=False)
     event_id: uuid.UUID = Field(foreign_key="event.id", nullable=False)
     view_timestamp: datetime = Field(nullable=False)
+    # Visualizações representadas pela linha: 1, ou as de um minuto inteiro com VIEW_BUFFER_PRE_AGGREGATE
+    view_count: int = Field(default=1, nullable=False, sa_column_kwargs={"server_default": "1"})
 
     event: Event = Relationship(back_populates="views")
 
@@ -45,4 +80,179 @@ class EventRegistration(SQLModel, table=True):
     status: str = Field(nullable=False)
     payment_id: Optional[uuid.UUID] = None
 
-    event: Event = Relationship(back_populates="registrations")
\ No newline at end of file
+    event: Event = Relationship(back_populates="registrations")
+
+class EventPopularity(SQLModel, table=True):
+    """Contadores agregados por evento, mantidos a cada visualização/inscrição gravada."""
+    __tablename__ = "event_popularity"
+
+    event_id: uuid.UUID = Field(foreign_key="event.id", primary_key=True, nullable=False)
+    view_count: int = Field(default=0, nullable=False)
+    registration_count: int = Field(default=0, nullable=False)
+    score: int = Field(default=0, nullable=False, index=True)
+
+    event: Event = Relationship(back_populates="popularity")
+
+# Granularidades dos agregados de atividade (views/inscrições por janela de tempo, em UTC)
+GRANULARITY_HOUR = "hour"
+GRANULARITY_DAY = "day"
+
+class EventActivityBucket(SQLModel):
+    """Views e inscrições de um evento em uma janela de tempo iniciada em `bucket_start`."""
+    event_id: uuid.UUID = Field(foreign_key="event.id", primary_key=True, nullable=False)
+    bucket_start: datetime = Field(primary_key=True, nullable=False)
+    view_count: int = Field(default=0, nullable=False)
+    registration_count: int = Field(default=0, nullable=False)
+
+class EventActivityHourly(EventActivityBucket, table=True):
+    __tablename__ = "event_activity_hourly"
+
+class EventActivityDaily(EventActivityBucket, table=True):
+    __tablename__ = "event_activity_daily"
+
+
+# Índices alinhados às consultas de /events (criados pela migração 0003; ver
+# `python manage.py check-indexes` para o EXPLAIN de cada um).
+# Ordenação por data e cursor: ORDER BY start_date DESC, id DESC
+Index("ix_event_start_date_id_desc", Event.start_date.desc(), Event.id.desc())
+# Ordenação por popularidade e cursor: ORDER BY popularity_score DESC, start_date DESC, id DESC
+Index(
+    "ix_event_popularity_score_start_date_id",
+    Event.popularity_score.desc(), Event.start_date.desc(), Event.id.desc()
+)
+# Filtros por tipo/precificação combinados com a ordenação ou intervalo de datas
+Index("ix_event_type_pricing_start_date", Event.event_type, Event.pricing_type, Event.start_date)
+# Filtros exatos por UF (e UF + cidade), por cidade e por categoria, que também agrupam as facetas
+Index("ix_event_location_uf_city", Event.location_uf, Event.location_city)
+Index("ix_event_location_city", Event.location_city)
+Index("ix_event_category_start_date", Event.category, Event.start_date)
+# Contagens de views por evento, totais ou por janela de tempo; também atende buscas só por event_id
+Index("ix_eventview_event_id_view_timestamp", EventView.event_id, EventView.view_timestamp)
+# Contagens de inscrições por evento
+Index("ix_eventregistration_event_id", EventRegistration.event_id)
+# Rankings por janela de tempo (/stats/top); as séries por evento usam a chave primária
+Index("ix_event_activity_hourly_bucket_start", EventActivityHourly.bucket_start)
+Index("ix_event_activity_daily_bucket_start", EventActivityDaily.bucket_start)
+
+# Busca textual: no Postgres uma coluna tsvector gerada com índice GIN,
+# no SQLite uma tabela FTS5 sincronizada por triggers. Ambas ficam fora do
+# modelo ORM e são criadas junto com a tabela `event`.
+SEARCH_CONFIG = "portuguese"
+
+POSTGRES_SEARCH_DDL = [
+    f"""
+    ALTER TABLE event ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'B') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_event_search_vector ON event USING GIN (search_vector)",
+]
+
+# Só quando muda o texto indexado: o UPDATE de `updated_at` feito pelo trigger
+# event_updated_at não pode reindexar a linha antes deste trigger rodar
+SQLITE_SEARCH_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF name, summary, description ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, name, summary, description)
+        VALUES ('delete', old.rowid, old.name, old.summary, old.description);
+        INSERT INTO event_fts(rowid, name, summary, description)
+        VALUES (new.rowid, new.name, new.summary, new.description);
+    END
+    """
+
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        name, summary, description,
+        content='event', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Pesos equivalentes aos setweight A/B/C do Postgres
+    "INSERT INTO event_fts(event_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts(rowid, name, summary, description)
+        VALUES (new.rowid, new.name, new.summary, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, name, summary, description)
+        VALUES ('delete', old.rowid, old.name, old.summary, old.description);
+    END
+    """,
+    SQLITE_SEARCH_UPDATE_TRIGGER,
+]
+
+def search_ddl(dialect_name: str) -> List[str]:
+    """Comandos que criam (de forma idempotente) o índice de busca para o dialeto."""
+    if dialect_name == "postgresql":
+        return POSTGRES_SEARCH_DDL
+    if dialect_name == "sqlite":
+        return SQLITE_SEARCH_DDL
+    return []
+
+def search_rebuild_ddl(dialect_name: str) -> List[str]:
+    """Comandos que reindexam os eventos já existentes."""
+    if dialect_name == "sqlite":
+        return ["INSERT INTO event_fts(event_fts) VALUES ('rebuild')"]
+    # No Postgres a coluna gerada é recalculada pelo próprio banco
+    return []
+
+@sa_event.listens_for(Event.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    for statement in search_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+
+# `updated_at` também para escritas fora do ORM (SQL direto, scripts de
+# manutenção): no Postgres um trigger BEFORE UPDATE grava o horário na linha;
+# o SQLite não permite alterar NEW, então um trigger AFTER UPDATE regrava a
+# coluna quando o próprio UPDATE não a alterou (o ORM já a define via onupdate).
+# Mudanças de `popularity_score` não contam como alteração do evento: o índice
+# em memória lê as pontuações à parte, e cada lote de views regravaria a linha
+UPDATED_AT_TRIGGER = "event_updated_at"
+UPDATED_AT_FUNCTION = "event_set_updated_at"
+
+POSTGRES_UPDATED_AT_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION {UPDATED_AT_FUNCTION}() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.popularity_score IS NOT DISTINCT FROM OLD.popularity_score THEN
+            NEW.updated_at := timezone('utc', now());
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"DROP TRIGGER IF EXISTS {UPDATED_AT_TRIGGER} ON event",
+    f"""
+    CREATE TRIGGER {UPDATED_AT_TRIGGER} BEFORE UPDATE ON event
+    FOR EACH ROW EXECUTE FUNCTION {UPDATED_AT_FUNCTION}()
+    """,
+]
+
+SQLITE_UPDATED_AT_DDL = [
+    # Mesmo formato de texto que o SQLAlchemy grava (microssegundos), para as comparações com `updated_at`
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {UPDATED_AT_TRIGGER} AFTER UPDATE ON event
+    WHEN new.updated_at IS old.updated_at AND new.popularity_score IS old.popularity_score
+    BEGIN
+        UPDATE event SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now') WHERE rowid = new.rowid;
+    END
+    """,
+]
+
+def updated_at_ddl(dialect_name: str) -> List[str]:
+    """Comandos que criam (de forma idempotente) o trigger de `updated_at` para o dialeto."""
+    if dialect_name == "postgresql":
+        return POSTGRES_UPDATED_AT_DDL
+    if dialect_name == "sqlite":
+        return SQLITE_UPDATED_AT_DDL
+    return []
+
+@sa_event.listens_for(Event.__table__, "after_create")
+def _create_updated_at_trigger(target, connection, **kw):
+    for statement in updated_at_ddl(connection.dialect.name):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+from typing_extensions import NotRequired, TypedDict
+from pydantic import TypeAdapter
+from datetime import datetime
+import uuid
+from Entities.Event import Event, EventTypeEnum, PricingTypeEnum
+
+# Colunas lidas pela listagem, na ordem em que aparecem nas linhas da consulta.
+# `description` é opcional por ser o campo mais pesado da listagem.
+LIST_FIELDS = [
+    "id", "name", "summary", "description", "start_date", "end_date", "photo_url",
+    "location_city", "location_uf", "event_type", "pricing_type", "category",
+]
+LIST_FIELDS_WITHOUT_DESCRIPTION = [field for field in LIST_FIELDS if field != "description"]
+
+def list_fields(include_description: bool = True) -> List[str]:
+    return LIST_FIELDS if include_description else LIST_FIELDS_WITHOUT_DESCRIPTION
+
+def list_columns(include_description: bool = True) -> List[Any]:
+    return [getattr(Event, field) for field in list_fields(include_description)]
+
+class EventListItem(TypedDict):
+    id: uuid.UUID
+    name: str
+    summary: Optional[str]
+    description: NotRequired[str]
+    start_date: datetime
+    end_date: Optional[datetime]
+    photo_url: Optional[str]
+    location_city: str
+    location_uf: str
+    event_type: EventTypeEnum
+    pricing_type: PricingTypeEnum
+    category: str
+
+class EventImportItem(TypedDict):
+    """Linha aceita pela importação em lote; sem `id`, um novo é gerado."""
+    id: NotRequired[uuid.UUID]
+    name: str
+    summary: NotRequired[Optional[str]]
+    description: str
+    start_date: datetime
+    end_date: NotRequired[Optional[datetime]]
+    photo_url: NotRequired[Optional[str]]
+    location_city: str
+    location_uf: str
+    event_type: EventTypeEnum
+    pricing_type: PricingTypeEnum
+    category: str
+
+class EventListPagination(TypedDict):
+    currentPage: Optional[int]
+    totalPages: Optional[int]
+    previousPage: Optional[int]
+    nextPage: Optional[int]
+    totalItems: Optional[int]
+    totalIsEstimate: bool
+    nextCursor: Optional[str]
+    prevCursor: Optional[str]
+
+class EventFacetBucket(TypedDict):
+    value: str
+    count: int
+
+class EventListFacets(TypedDict):
+    eventType: List[EventFacetBucket]
+    pricingType: List[EventFacetBucket]
+    locationUf: List[EventFacetBucket]
+    category: List[EventFacetBucket]
+
+class EventListResponse(TypedDict):
+    data: Optional[List[EventListItem]]
+    pagination: Optional[EventListPagination]
+    # Só com `facets=true`: contagens por valor sob os filtros da requisição
+    facets: NotRequired[Optional[EventListFacets]]
+    error: Optional[Dict[str, Any]]
+
+# Compilados uma única vez; serializam os dicionários da listagem direto para bytes
+EVENT_LIST_RESPONSE_ADAPTER = TypeAdapter(EventListResponse)
+EVENT_LIST_ITEM_ADAPTER = TypeAdapter(EventListItem)
+EVENT_IMPORT_ADAPTER = TypeAdapter(EventImportItem)
+
+# A exportação traz todas as colunas de Event, no formato aceito pela importação
+EXPORT_FIELDS = LIST_FIELDS
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional
+    orjson = None
+
+def serialize_event_list(content: Dict[str, Any]) -> bytes:
+    """JSON da listagem sem passar pelo jsonable_encoder (orjson, ou o TypeAdapter como alternativa)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return EVENT_LIST_RESPONSE_ADAPTER.dump_json(content)
+
+def serialize_event_row(row: Dict[str, Any]) -> bytes:
+    """JSON de um evento (uma linha do NDJSON da exportação)"""
+    if orjson is not None:
+        return orjson.dumps(row)
+    return EVENT_LIST_ITEM_ADAPTER.dump_json(row)
@@ -0,0 +1,112 @@
+from typing import List, Dict, Any, AsyncIterator, Optional
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime
+import uuid
+from Entities.Event import Event, EventView, EventRegistration
+from Repositories.EventRepository import EventRepository
+from Entities.EventSchemas import list_columns, list_fields
+from Repositories import EventQueries
+
+class AsyncEventRepository:
+    """
+    Variante assíncrona do EventRepository. As consultas são as mesmas
+    (EventQueries); as escritas reaproveitam o repositório síncrono via run_sync.
+    """
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    async def get_all_events(self) -> List[Event]:
+        try:
+            statement = select(Event).order_by(Event.start_date.desc())
+            events = (await self.session.exec(statement)).all()
+            return events
+        except Exception as e:
+            print(f"Error fetching all events: {e}")
+            return []
+
+    async def iter_all_events(self, batch_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Mesmo contrato de `EventRepository.iter_all_events`, com o cursor do driver assíncrono."""
+        query = select(*list_columns()).order_by(Event.start_date.desc(), Event.id.desc())
+        fields = list_fields()
+        result = await self.session.stream(query, execution_options={"yield_per": batch_size})
+        async for partition in result.partitions():
+            yield [dict(zip(fields, row)) for row in partition]
+
+    async def count_filtered_events(self, filters: Dict[str, Any]) -> int:
+        try:
+            query, params = EventQueries.cached_count_query(filters, self._dialect())
+            count = (await self.session.exec(query, params=params)).one()
+            return count
+        except Exception as e:
+            print(f"Error counting filtered events: {e}")
+            raise
+
+    async def estimate_filtered_events(self, filters: Dict[str, Any]) -> int:
+        if self._dialect() != "postgresql":
+            return await self.count_filtered_events(filters)
+        try:
+            plan = (await self.session.exec(EventQueries.estimate_query(filters, "postgresql"))).scalar()
+            return EventQueries.estimate_from_plan(plan)
+        except Exception as e:
+            print(f"Error estimating filtered events: {e}")
+            raise
+
+    async def get_facets(self, filters: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        try:
+            query, params = EventQueries.cached_facet_query(filters, self._dialect())
+            return EventQueries.build_facets((await self.session.exec(query, params=params)).all())
+        except Exception as e:
+            print(f"Error fetching event facets: {e}")
+            raise
+
+    async def get_filtered_events_page(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str] = None,
+        count_mode: str = EventQueries.COUNT_EXACT,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True
+    ) -> Dict[str, Any]:
+        try:
+            query, params = EventQueries.cached_page_query(
+                filters, page, page_size, sort_by, self._dialect(), count_mode, cursor, include_description
+            )
+            rows = (await self.session.exec(query, params=params)).all()
+
+            total, pending = EventQueries.page_total(rows, page, count_mode, cursor)
+            if pending == EventQueries.COUNT_EXACT:
+                total = await self.count_filtered_events(filters)
+            elif pending == EventQueries.COUNT_ESTIMATE:
+                total = await self.estimate_filtered_events(filters)
+
+            return EventQueries.finish_page(
+                rows, filters, page, page_size, sort_by, count_mode, cursor, total, include_description
+            )
+
+        except Exception as e:
+            print(f"Error fetching filtered events page: {e}")
+            raise
+
+    async def record_view(self, event_id: uuid.UUID, view_timestamp: Optional[datetime] = None) -> Optional[EventView]:
+        return await self.session.run_sync(
+            lambda session: EventRepository(session).record_view(event_id, view_timestamp)
+        )
+
+    async def record_registration(
+        self,
+        event_id: uuid.UUID,
+        status: str,
+        payment_id: Optional[uuid.UUID] = None,
+        registration_timestamp: Optional[datetime] = None
+    ) -> Optional[EventRegistration]:
+        return await self.session.run_sync(
+            lambda session: EventRepository(session).record_registration(
+                event_id, status, payment_id, registration_timestamp
+            )
+        )
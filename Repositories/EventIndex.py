@@ -0,0 +1,358 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+from datetime import datetime, timedelta
+import re
+import threading
+import time
+import unicodedata
+import uuid
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from Entities.Event import Event, EventPopularity, EventTypeEnum, PricingTypeEnum
+from Entities.EventSchemas import LIST_FIELDS, list_columns
+from Repositories.EventQueries import SORT_POPULARITY, SORT_RELEVANCE
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Códigos compactos (1 byte por evento) dos enums, na ordem de declaração
+EVENT_TYPES = list(EventTypeEnum)
+PRICING_TYPES = list(PricingTypeEnum)
+EVENT_TYPE_CODES = {member: code for code, member in enumerate(EVENT_TYPES)}
+PRICING_TYPE_CODES = {member: code for code, member in enumerate(PRICING_TYPES)}
+
+# Filtros de igualdade exata atendidos por listas invertidas (valor -> posições)
+EQUALITY_FIELDS = ("location_uf", "location_city", "category")
+
+# Pesos de cada campo na relevância, os mesmos da busca no banco (setweight A/B/C, bm25(10, 5, 1))
+SEARCH_WEIGHTS = (("name", 10.0), ("summary", 5.0), ("description", 1.0))
+
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos, como o `remove_diacritics` do FTS5."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(normalize_text(text)) if text else []
+
+
+def _micros(value: datetime) -> int:
+    """Datas (sem fuso, como gravadas) em microssegundos desde 1970: comparação exata em um array de inteiros."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class EventRecord:
+    """Colunas da listagem de um evento; sem __dict__, o custo por evento fica fixo."""
+
+    __slots__ = tuple(LIST_FIELDS)
+
+    def __init__(self, row: Dict[str, Any]):
+        for field in LIST_FIELDS:
+            setattr(self, field, row[field])
+
+    def values(self, fields: Iterable[str] = LIST_FIELDS) -> Tuple[Any, ...]:
+        return tuple(getattr(self, field) for field in fields)
+
+    def search_terms(self) -> Dict[str, float]:
+        """Peso de cada termo do nome, resumo e descrição (soma das ocorrências ponderadas)."""
+        terms: Dict[str, float] = {}
+        for field, weight in SEARCH_WEIGHTS:
+            for token in tokenize(getattr(self, field)):
+                terms[token] = terms.get(token, 0.0) + weight
+        return terms
+
+
+def _ranks(order: array) -> array:
+    """Posição de cada evento em `order` (inversa da permutação)."""
+    ranks = array("I", bytes(4 * len(order)))
+    for rank, position in enumerate(order):
+        ranks[position] = rank
+    return ranks
+
+
+class EventIndexSnapshot:
+    """
+    Fotografia imutável dos eventos, em colunas: cada evento tem uma posição
+    e as colunas usadas para filtrar e ordenar ficam em arrays compactos
+    (início em microssegundos, códigos dos enums, pontuação de popularidade).
+    As ordens por data e por popularidade já vêm calculadas, e a busca usa
+    uma lista invertida termo -> {posição: peso}. Atualizações constroem um
+    snapshot novo e trocam a referência, então as leituras nunca travam.
+    """
+
+    __slots__ = (
+        "records", "start", "event_type", "pricing_type", "scores", "date_order", "date_rank",
+        "popularity_order", "popularity_rank", "postings", "terms", "vocabulary"
+    )
+
+    def __init__(self, records: List[EventRecord], terms: List[Dict[str, float]], scores: Dict[uuid.UUID, int]):
+        self.records = records
+        self.start = array("q", (_micros(record.start_date) for record in records))
+        self.event_type = array("B", (EVENT_TYPE_CODES[record.event_type] for record in records))
+        self.pricing_type = array("B", (PRICING_TYPE_CODES[record.pricing_type] for record in records))
+        self.scores = array("q", (scores.get(record.id, 0) for record in records))
+
+        # Mesma ordem total do banco (ver EventQueries.sort_keys), sempre decrescente
+        positions = range(len(records))
+        self.date_order = array("I", sorted(positions, key=self._date_key, reverse=True))
+        self.popularity_order = array("I", sorted(positions, key=self._popularity_key, reverse=True))
+        self.date_rank = _ranks(self.date_order)
+        self.popularity_rank = _ranks(self.popularity_order)
+
+        self.postings: Dict[str, Dict[str, array]] = {field: {} for field in EQUALITY_FIELDS}
+        self.terms: Dict[str, Dict[int, float]] = {}
+        for position, record in enumerate(records):
+            for field in EQUALITY_FIELDS:
+                self.postings[field].setdefault(getattr(record, field), array("I")).append(position)
+            for term, weight in terms[position].items():
+                self.terms.setdefault(term, {})[position] = weight
+        self.vocabulary = sorted(self.terms)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _date_key(self, position: int) -> Tuple[Any, ...]:
+        record = self.records[position]
+        return (record.start_date, record.id)
+
+    def _popularity_key(self, position: int) -> Tuple[Any, ...]:
+        record = self.records[position]
+        return (self.scores[position], record.start_date, record.id)
+
+    def sort_key(self, sort: str, ranks: Optional[Dict[int, float]] = None) -> Callable[[int], Tuple[Any, ...]]:
+        """Chaves de ordenação de uma posição, nos mesmos tipos e ordem dos valores do cursor."""
+        if sort == SORT_RELEVANCE:
+            return lambda position: (ranks[position],) + self._date_key(position)
+        if sort == SORT_POPULARITY:
+            return self._popularity_key
+        return self._date_key
+
+    def search(self, query: str) -> Dict[int, float]:
+        """
+        Relevância por posição dos eventos que contêm todos os termos de
+        `query`, cada um como prefixo (como a busca FTS5 no SQLite).
+        """
+        ranks: Optional[Dict[int, float]] = None
+        for term in tokenize(query):
+            matched: Dict[int, float] = {}
+            index = bisect_left(self.vocabulary, term)
+            while index < len(self.vocabulary) and self.vocabulary[index].startswith(term):
+                for position, weight in self.terms[self.vocabulary[index]].items():
+                    matched[position] = matched.get(position, 0.0) + weight
+                index += 1
+            if ranks is None:
+                ranks = matched
+            else:
+                ranks = {position: ranks[position] + weight for position, weight in matched.items() if position in ranks}
+            if not ranks:
+                break
+        return ranks or {}
+
+    def _predicate(self, filters: Dict[str, Any]) -> Optional[Callable[[int], bool]]:
+        """Filtros de tipo, precificação e intervalo de datas, verificados nos arrays de colunas."""
+        checks = []
+        if 'event_type' in filters:
+            event_types, code = self.event_type, EVENT_TYPE_CODES[filters['event_type']]
+            checks.append(lambda position: event_types[position] == code)
+        if 'pricing_type' in filters:
+            pricing_types, pricing_code = self.pricing_type, PRICING_TYPE_CODES[filters['pricing_type']]
+            checks.append(lambda position: pricing_types[position] == pricing_code)
+        if 'start_date_interval' in filters and 'end_date_interval' in filters:
+            start, low, high = self.start, _micros(filters['start_date_interval']), _micros(filters['end_date_interval'])
+            checks.append(lambda position: low <= start[position] <= high)
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda position: all(check(position) for check in checks)
+
+    def _candidates(self, filters: Dict[str, Any], ranks: Optional[Dict[int, float]]) -> Optional[set]:
+        """Interseção das listas invertidas dos filtros exatos (e da busca); None quando não há nenhum."""
+        lists = [self.postings[field].get(filters[field], ()) for field in EQUALITY_FIELDS if field in filters]
+        if ranks is not None:
+            lists.append(ranks.keys())
+        if not lists:
+            return None
+        lists.sort(key=len)
+        candidates = set(lists[0])
+        for other in lists[1:]:
+            candidates.intersection_update(other)
+        return candidates
+
+    def select(
+        self, filters: Dict[str, Any], sort: str, limit: Optional[int] = None
+    ) -> Tuple[Sequence[int], Optional[Dict[int, float]]]:
+        """
+        Posições dos eventos que atendem aos filtros (já validados pelo
+        EventService), na ordem `sort`, e a relevância de cada uma quando há
+        busca. Sem filtros, devolve a própria ordem pré-calculada (sem cópia).
+        Com `limit` a varredura para nas primeiras `limit` posições (quando
+        o total não é necessário).
+        """
+        ranks = self.search(filters['search_query']) if filters.get('search_query') else None
+        candidates = self._candidates(filters, ranks)
+        predicate = self._predicate(filters)
+
+        if sort == SORT_RELEVANCE:
+            matches = [position for position in candidates if predicate is None or predicate(position)]
+            matches.sort(key=self.sort_key(sort, ranks), reverse=True)
+            return matches, ranks
+
+        if sort == SORT_POPULARITY:
+            order, rank = self.popularity_order, self.popularity_rank
+        else:
+            order, rank = self.date_order, self.date_rank
+
+        if candidates is None:
+            source = order
+        elif len(candidates) * 8 < len(order):
+            # Poucos candidatos: ordená-los pela posição pré-calculada sai mais barato que percorrer a ordem toda
+            source = sorted(candidates, key=rank.__getitem__)
+        else:
+            source = (position for position in order if position in candidates)
+
+        if predicate is not None:
+            source = (position for position in source if predicate(position))
+        if limit is not None:
+            return list(islice(source, limit)), ranks
+        return source if isinstance(source, (array, list)) else list(source), ranks
+
+    def facet_rows(self, filters: Dict[str, Any]) -> List[Tuple[str, str, int]]:
+        """Linhas (faceta, valor, contagem) no formato de `EventQueries.facet_query`."""
+        ranks = self.search(filters['search_query']) if filters.get('search_query') else None
+        candidates = self._candidates(filters, ranks)
+        predicate = self._predicate(filters)
+        positions = candidates if candidates is not None else range(len(self.records))
+        if predicate is not None:
+            positions = [position for position in positions if predicate(position)]
+
+        # Enums pelo nome, como o CAST(coluna AS VARCHAR) do banco os devolve
+        counts = {
+            "eventType": Counter(EVENT_TYPES[self.event_type[position]].name for position in positions),
+            "pricingType": Counter(PRICING_TYPES[self.pricing_type[position]].name for position in positions),
+            "locationUf": Counter(self.records[position].location_uf for position in positions),
+            "category": Counter(self.records[position].category for position in positions),
+        }
+        return [(facet, value, count) for facet, counter in counts.items() for value, count in counter.items()]
+
+
+class EventIndex:
+    """
+    Eventos em memória para a listagem. `load` lê a tabela inteira;
+    `refresh` lê só as linhas com `updated_at` a partir da última leitura
+    (menos `overlap` segundos, para não perder transações que gravaram com
+    um horário anterior e confirmaram depois) e as pontuações de popularidade,
+    e só reconstrói o snapshot quando algo mudou. Exclusões só aparecem na
+    próxima carga completa.
+    """
+
+    def __init__(self, bind: Engine, overlap: float = 30.0, batch_size: int = 1000):
+        self.bind = bind
+        self.overlap = timedelta(seconds=overlap)
+        self.batch_size = batch_size
+        self.snapshot: Optional[EventIndexSnapshot] = None
+
+        self._records: Dict[uuid.UUID, EventRecord] = {}
+        self._terms: Dict[uuid.UUID, Dict[str, float]] = {}
+        self._scores: Dict[uuid.UUID, int] = {}
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+        self.loads = 0
+        self.refreshes = 0
+        self.changed = 0
+        self.loaded_at: Optional[float] = None
+        self.refreshed_at: Optional[float] = None
+        self.last_duration: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.snapshot is not None
+
+    def _read_rows(self, session: Session, since: Optional[datetime]) -> Iterable[Dict[str, Any]]:
+        query = select(*list_columns(), Event.updated_at)
+        if since is not None:
+            query = query.where(Event.updated_at >= since)
+        fields = LIST_FIELDS + ["updated_at"]
+        result = session.exec(query, execution_options={"yield_per": self.batch_size})
+        for partition in result.partitions():
+            for row in partition:
+                yield dict(zip(fields, row))
+
+    def _read_scores(self, session: Session) -> Dict[uuid.UUID, int]:
+        query = select(EventPopularity.event_id, EventPopularity.score).where(EventPopularity.score != 0)
+        return dict(session.exec(query).all())
+
+    def _apply(self, row: Dict[str, Any]) -> bool:
+        """Grava a linha nos registros; retorna False quando nada mudou."""
+        updated_at = row.pop("updated_at")
+        if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+        current = self._records.get(row["id"])
+        record = EventRecord(row)
+        if current is not None and current.values() == record.values():
+            return False
+        self._records[record.id] = record
+        self._terms[record.id] = record.search_terms()
+        return True
+
+    def _publish(self) -> None:
+        records = list(self._records.values())
+        self.snapshot = EventIndexSnapshot(records, [self._terms[record.id] for record in records], self._scores)
+
+    def load(self) -> int:
+        """Carga completa (também remove eventos excluídos). Retorna quantos eventos foram carregados."""
+        with self._lock:
+            started = time.perf_counter()
+            self._records, self._terms, self._watermark = {}, {}, None
+            with Session(self.bind) as session:
+                for row in self._read_rows(session, None):
+                    self._apply(row)
+                self._scores = self._read_scores(session)
+            self._publish()
+            self.loads += 1
+            self.loaded_at = self.refreshed_at = time.time()
+            self.last_duration = time.perf_counter() - started
+            return len(self._records)
+
+    def refresh(self) -> int:
+        """Atualização incremental. Retorna quantos eventos mudaram."""
+        if self.snapshot is None:
+            return self.load()
+        with self._lock:
+            started = time.perf_counter()
+            since = self._watermark - self.overlap if self._watermark is not None else None
+            with Session(self.bind) as session:
+                changed = sum(self._apply(row) for row in self._read_rows(session, since))
+                scores = self._read_scores(session)
+            if changed or scores != self._scores:
+                self._scores = scores
+                self._publish()
+            self.refreshes += 1
+            self.changed += changed
+            self.refreshed_at = time.time()
+            self.last_duration = time.perf_counter() - started
+            return changed
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "ready": snapshot is not None,
+            "events": len(snapshot) if snapshot is not None else 0,
+            "terms": len(snapshot.vocabulary) if snapshot is not None else 0,
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "changed": self.changed,
+            "watermark": self._watermark.isoformat() if self._watermark is not None else None,
+            "ageSeconds": time.time() - self.refreshed_at if self.refreshed_at is not None else None,
+            "lastDurationMs": self.last_duration * 1000 if self.last_duration is not None else None,
+        }
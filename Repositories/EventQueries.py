@@ -0,0 +1,566 @@
+from typing import Any, Dict, List, Optional, Tuple
+from sqlmodel import select, or_, and_, func
+from sqlalchemy import (
+    Integer, String, bindparam, cast, literal, select as sa_select, table, column, literal_column, tuple_, union_all
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from datetime import datetime
+import base64
+import json
+import threading
+import uuid
+from Entities.Event import Event, SEARCH_CONFIG
+from Entities.EventSchemas import list_columns, list_fields
+from metrics import span
+
+# Modos de contagem do total de itens na listagem
+COUNT_EXACT = "exact"
+COUNT_ESTIMATE = "estimate"
+COUNT_NONE = "none"
+COUNT_MODES = (COUNT_EXACT, COUNT_ESTIMATE, COUNT_NONE)
+
+SORT_RELEVANCE = "relevance"
+SORT_DATE = "date"
+SORT_POPULARITY = "popularity"
+
+# Direção de navegação codificada no cursor
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+# Tabela FTS5 usada pela busca no SQLite (ver Entities.Event.SQLITE_SEARCH_DDL)
+event_fts = table("event_fts", column("rowid"), column("rank"))
+
+def _fts5_query(search_query: str) -> str:
+    """Converte o texto do usuário em uma consulta FTS5 segura (termos entre aspas, com prefixo)."""
+    terms = [term.replace('"', '""') for term in search_query.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+def filter_params(filters: Dict[str, Any], dialect: str) -> Dict[str, Any]:
+    """
+    Valores dos parâmetros nomeados usados por `apply_filters`. A consulta só
+    depende de quais filtros estão presentes (`filter_shape`); os valores vão
+    sempre como parâmetros, o que permite reaproveitar a consulta montada.
+    """
+    params = {}
+    if 'event_type' in filters:
+        params['event_type'] = filters['event_type']
+    if 'pricing_type' in filters:
+        params['pricing_type'] = filters['pricing_type']
+    # Igualdade exata (atendida pelos índices); a normalização fica no EventService
+    if 'location_uf' in filters:
+        params['location_uf'] = filters['location_uf']
+    if 'location_city' in filters:
+        params['location_city'] = filters['location_city']
+    if 'category' in filters:
+        params['category'] = filters['category']
+    if 'start_date_interval' in filters and 'end_date_interval' in filters:
+        params['start_date_interval'] = filters['start_date_interval']
+        params['end_date_interval'] = filters['end_date_interval']
+
+    search_query = filters.get('search_query')
+    if search_query:
+        if dialect == "postgresql":
+            params['search_query'] = search_query
+        elif dialect == "sqlite":
+            params['search_query'] = _fts5_query(search_query)
+        else:
+            params['search_query'] = f"%{search_query}%"
+            params['search_term'] = search_query.lower()
+    return params
+
+# Filtros que mudam o formato da consulta, na ordem dos bits de `filter_shape`
+FILTER_SHAPE_BITS = (
+    'event_type', 'pricing_type', 'location_uf', 'location_city', 'category', 'start_date_interval', 'search_query'
+)
+
+def filter_shape(params: Dict[str, Any]) -> int:
+    """Bitmap dos filtros presentes em `filter_params` (bit i = FILTER_SHAPE_BITS[i])."""
+    return sum(1 << bit for bit, name in enumerate(FILTER_SHAPE_BITS) if name in params)
+
+def apply_search(query, params: Dict[str, Any], dialect: str):
+    """
+    Aplica a busca textual à consulta e retorna (consulta, expressão de relevância).
+    A relevância é normalizada para que valores maiores sejam mais relevantes.
+    """
+    search_param = bindparam('search_query', params['search_query'])
+    if dialect == "postgresql":
+        search_vector = literal_column("event.search_vector")
+        ts_query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'"), search_param)
+        query = query.where(search_vector.op("@@")(ts_query))
+        return query, func.ts_rank(search_vector, ts_query)
+    if dialect == "sqlite":
+        query = (
+            query
+            .join_from(Event, event_fts, event_fts.c.rowid == literal_column("event.rowid"))
+            .where(literal_column("event_fts").op("MATCH")(search_param))
+        )
+        # bm25 do FTS5 é negativo: quanto menor, mais relevante
+        return query, -event_fts.c.rank
+
+    query = query.where(or_(
+        Event.name.ilike(search_param),
+        Event.summary.ilike(search_param),
+        Event.description.ilike(search_param)
+    ))
+    search_term = bindparam('search_term', params['search_term'])
+    rank = (
+        func.lower(Event.name).contains(search_term).cast(Integer) * 4
+        + func.lower(Event.summary).contains(search_term).cast(Integer) * 2
+        + func.lower(Event.description).contains(search_term).cast(Integer)
+    )
+    return query, rank
+
+def _param(column, name: str, params: Dict[str, Any]):
+    """Parâmetro nomeado com o tipo da coluna comparada (enums e datas não se inferem pelo valor)."""
+    return bindparam(name, params[name], type_=column.type)
+
+def apply_filters(query, filters: Dict[str, Any], dialect: str) -> Tuple[Any, Optional[Any]]:
+    """
+    Compila os filtros validados em cláusulas WHERE (e no JOIN da busca, quando houver).
+    Usada tanto pela consulta da página quanto pela contagem, para que as duas
+    nunca divirjam. Os valores entram como parâmetros nomeados (`filter_params`).
+    Retorna (consulta, expressão de relevância ou None).
+    """
+    params = filter_params(filters, dialect)
+    conditions = []
+
+    if 'event_type' in params:
+        conditions.append(Event.event_type == _param(Event.event_type, 'event_type', params))
+    if 'pricing_type' in params:
+        conditions.append(Event.pricing_type == _param(Event.pricing_type, 'pricing_type', params))
+    if 'location_uf' in params:
+        conditions.append(Event.location_uf == _param(Event.location_uf, 'location_uf', params))
+    if 'location_city' in params:
+        conditions.append(Event.location_city == _param(Event.location_city, 'location_city', params))
+    if 'category' in params:
+        conditions.append(Event.category == _param(Event.category, 'category', params))
+
+    if 'start_date_interval' in params:
+        conditions.append(and_(
+            Event.start_date >= _param(Event.start_date, 'start_date_interval', params),
+            Event.start_date <= _param(Event.start_date, 'end_date_interval', params)
+        ))
+
+    if conditions:
+        query = query.where(and_(*conditions))
+
+    rank = None
+    if 'search_query' in params:
+        query, rank = apply_search(query, params, dialect)
+
+    return query, rank
+
+def effective_sort(sort_by: Optional[str], has_search: bool) -> str:
+    """Ordenação realmente aplicada: 'relevance' sem busca cai para 'date'."""
+    if sort_by == SORT_RELEVANCE and has_search:
+        return SORT_RELEVANCE
+    if sort_by == SORT_POPULARITY:
+        return SORT_POPULARITY
+    return SORT_DATE
+
+def default_count_mode(cursor: Optional[Dict[str, Any]]) -> str:
+    """Total usado quando o cliente não escolhe: exato por página, nenhum com cursor.
+
+    Quem pagina por cursor não mostra número de páginas, e o total exato custaria
+    a mesma varredura que o cursor evita.
+    """
+    return COUNT_NONE if cursor is not None else COUNT_EXACT
+
+def sort_keys(sort: str, rank=None) -> List[Any]:
+    """
+    Chaves de ordenação (todas decrescentes), terminando sempre em `Event.id`
+    para que a ordem seja total e possa ser usada na paginação por cursor.
+    """
+    keys = [Event.start_date, Event.id]
+    if sort == SORT_RELEVANCE:
+        return [rank] + keys
+    if sort == SORT_POPULARITY:
+        # Coluna da própria tabela: a ordem sai de ix_event_popularity_score_start_date_id
+        return [Event.popularity_score] + keys
+    return keys
+
+def sort_order(sort: str, rank=None, reverse: bool = False) -> List[Any]:
+    """Cláusulas do ORDER BY para `sort_keys` (crescentes com `reverse`, nos cursores 'prev')."""
+    return [key.asc() if reverse else key.desc() for key in sort_keys(sort, rank)]
+
+def apply_sort(query, sort: str, rank=None, reverse: bool = False):
+    return query.order_by(*sort_order(sort, rank, reverse))
+
+def page_query(
+    filters: Dict[str, Any],
+    page: int,
+    page_size: int,
+    sort_by: Optional[str],
+    dialect: str,
+    count_mode: str = COUNT_EXACT,
+    cursor: Optional[Dict[str, Any]] = None,
+    columns: Optional[List[Any]] = None
+):
+    """
+    Consulta da página. Cada linha traz as colunas da listagem (`columns`, por
+    padrão `list_columns()`) seguidas das chaves de ordenação (`sort_key_0`,
+    `sort_key_1`, ...), usadas para montar os cursores.
+
+    Com `count_mode` exato e paginação por offset, a linha traz também o total
+    filtrado via `count(*) OVER ()`, evitando uma segunda ida ao banco. Nos demais
+    casos busca uma linha extra para saber se existe página seguinte.
+
+    Com `cursor`, a página é definida por uma comparação de tupla sobre as chaves
+    de ordenação (keyset) em vez de OFFSET; cursores 'prev' invertem a ordem e
+    o chamador deve inverter as linhas retornadas.
+
+    Filtros, cursor, LIMIT e OFFSET entram como parâmetros nomeados
+    (`filter_params` e `page_params`), para que a consulta possa ser
+    reaproveitada com outros valores (ver `cached_page_query`).
+    """
+    params = page_params(page, page_size, count_mode, cursor)
+    limit = bindparam("limit", params["limit"], type_=Integer)
+    # select do SQLAlchemy (e não do SQLModel) para que as colunas extras não sejam descartadas
+    query = sa_select(*(columns if columns is not None else list_columns()))
+    query, rank = apply_filters(query, filters, dialect)
+    sort = effective_sort(sort_by, rank is not None)
+    keys = sort_keys(sort, rank)
+    query = query.add_columns(*[key.label(f"sort_key_{i}") for i, key in enumerate(keys)])
+
+    if cursor is not None:
+        if cursor["sort"] != sort:
+            raise ValueError("Cursor gerado para outra ordenação")
+        reverse = cursor["direction"] == CURSOR_PREV
+        key_tuple = tuple_(*keys)
+        value_tuple = tuple_(*[
+            bindparam(f"cursor_{i}", params[f"cursor_{i}"], type_=key.type) for i, key in enumerate(keys)
+        ])
+        query = query.where(key_tuple > value_tuple if reverse else key_tuple < value_tuple)
+        return apply_sort(query, sort, rank, reverse=reverse).limit(limit)
+
+    query = apply_sort(query, sort, rank)
+    if count_mode == COUNT_EXACT:
+        # Janela na mesma ordem da página e sobre todas as linhas: o total é o
+        # mesmo de OVER (), mas o SQLite continua lendo a ordem do índice em vez
+        # de ordenar de novo o resultado da janela (USE TEMP B-TREE FOR ORDER BY)
+        total = func.count().over(order_by=sort_order(sort, rank), rows=(None, None))
+        query = query.add_columns(total.label("total_count"))
+    return query.offset(bindparam("offset", params["offset"], type_=Integer)).limit(limit)
+
+def page_params(page: int, page_size: int, count_mode: str, cursor: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Valores de LIMIT/OFFSET (e das chaves do cursor) usados por `page_query`."""
+    if cursor is not None:
+        params = {f"cursor_{i}": value for i, value in enumerate(cursor["values"])}
+        params["limit"] = page_size + 1
+        return params
+    limit = page_size if count_mode == COUNT_EXACT else page_size + 1
+    return {"offset": (page - 1) * page_size, "limit": limit}
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+# Tipos das chaves de ordenação de cada modo, na ordem de `sort_keys`
+_CURSOR_KEY_TYPES = {
+    SORT_DATE: (datetime.fromisoformat, uuid.UUID),
+    SORT_POPULARITY: (int, datetime.fromisoformat, uuid.UUID),
+    SORT_RELEVANCE: (float, datetime.fromisoformat, uuid.UUID),
+}
+
+def sort_key_values(row, sort: str) -> List[Any]:
+    """Valores das chaves de ordenação de uma linha retornada por `page_query`."""
+    return [row._mapping[f"sort_key_{i}"] for i in range(len(_CURSOR_KEY_TYPES[sort]))]
+
+def encode_cursor(sort: str, values: List[Any], direction: str) -> str:
+    """Cursor opaco com as chaves de ordenação de uma linha (JSON em base64 url-safe)."""
+    payload = {"s": sort, "d": direction, "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decodifica um cursor gerado por `encode_cursor`. Lança ValueError se for inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        sort = payload["s"]
+        direction = payload["d"]
+        types = _CURSOR_KEY_TYPES[sort]
+        if direction not in (CURSOR_NEXT, CURSOR_PREV) or len(payload["v"]) != len(types):
+            raise ValueError
+        values = [convert(value) for convert, value in zip(types, payload["v"])]
+    except Exception:
+        raise ValueError("Cursor inválido")
+    return {"sort": sort, "direction": direction, "values": values}
+
+# Facetas da listagem: nome no JSON -> coluna agrupada
+FACET_COLUMNS = {
+    "eventType": Event.event_type,
+    "pricingType": Event.pricing_type,
+    "locationUf": Event.location_uf,
+    "category": Event.category,
+}
+
+def facet_query(filters: Dict[str, Any], dialect: str):
+    """
+    Contagens por valor de cada faceta sob os filtros atuais, em uma única
+    consulta: um GROUP BY por faceta, empilhados com UNION ALL. Cada linha é
+    (faceta, valor, contagem).
+    """
+    grouped = []
+    for name, facet_column in FACET_COLUMNS.items():
+        query = (
+            sa_select(
+                literal(name).label("facet"),
+                cast(facet_column, String).label("value"),
+                func.count().label("count"),
+            )
+            .select_from(Event)
+        )
+        query, _ = apply_filters(query, filters, dialect)
+        grouped.append(query.group_by(facet_column))
+    return union_all(*grouped)
+
+def build_facets(rows: List[Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Facetas a partir das linhas de `facet_query`, cada uma ordenada por contagem (maior primeiro)."""
+    facets: Dict[str, List[Dict[str, Any]]] = {name: [] for name in FACET_COLUMNS}
+    for facet, value, count in rows:
+        facets[facet].append({"value": value, "count": count})
+    for buckets in facets.values():
+        buckets.sort(key=lambda bucket: (-bucket["count"], bucket["value"]))
+    return facets
+
+def count_query(filters: Dict[str, Any], dialect: str):
+    query = select(func.count(Event.id)).select_from(Event)
+    query, _ = apply_filters(query, filters, dialect)
+    return query
+
+class StatementCache:
+    """
+    Consultas da listagem já montadas, indexadas pelo formato: dialeto, bitmap
+    dos filtros presentes, ordenação, paginação (janela, offset ou direção do
+    cursor) e colunas. Como os valores vão em parâmetros nomeados, a mesma
+    consulta é reexecutada com outros `params`; o SQLAlchemy encontra a SQL já
+    compilada no cache do engine. As chaves possíveis são finitas (algumas
+    centenas no máximo), então o cache não precisa de descarte.
+    """
+
+    def __init__(self):
+        self._statements: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple, build) -> Any:
+        statement = self._statements.get(key)
+        if statement is not None:
+            self.hits += 1
+            return statement
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is None:
+                self.misses += 1
+                statement = self._statements[key] = build()
+            else:
+                self.hits += 1
+        return statement
+
+    def clear(self) -> None:
+        with self._lock:
+            self._statements.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": self.hits / lookups if lookups else None,
+            "shapes": len(self._statements),
+        }
+
+statement_cache = StatementCache()
+
+def cached_page_query(
+    filters: Dict[str, Any],
+    page: int,
+    page_size: int,
+    sort_by: Optional[str],
+    dialect: str,
+    count_mode: str = COUNT_EXACT,
+    cursor: Optional[Dict[str, Any]] = None,
+    include_description: bool = True
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Mesma consulta de `page_query`, reaproveitada do `statement_cache`.
+    Retorna (consulta, params) para `session.exec(consulta, params=params)`.
+    """
+    params = filter_params(filters, dialect)
+    sort = effective_sort(sort_by, 'search_query' in params)
+    if cursor is not None and cursor["sort"] != sort:
+        raise ValueError("Cursor gerado para outra ordenação")
+
+    pagination = cursor["direction"] if cursor is not None else uses_window_total(count_mode, cursor)
+    key = ("page", dialect, filter_shape(params), sort, pagination, include_description)
+    statement = statement_cache.get(key, lambda: page_query(
+        filters, page, page_size, sort_by, dialect, count_mode, cursor, columns=list_columns(include_description)
+    ))
+    params.update(page_params(page, page_size, count_mode, cursor))
+    return statement, params
+
+def cached_count_query(filters: Dict[str, Any], dialect: str) -> Tuple[Any, Dict[str, Any]]:
+    """Mesma consulta de `count_query`, reaproveitada do `statement_cache`."""
+    params = filter_params(filters, dialect)
+    statement = statement_cache.get(("count", dialect, filter_shape(params)), lambda: count_query(filters, dialect))
+    return statement, params
+
+def cached_facet_query(filters: Dict[str, Any], dialect: str) -> Tuple[Any, Dict[str, Any]]:
+    """Mesma consulta de `facet_query`, reaproveitada do `statement_cache`."""
+    params = filter_params(filters, dialect)
+    statement = statement_cache.get(("facets", dialect, filter_shape(params)), lambda: facet_query(filters, dialect))
+    return statement, params
+
+def startup_queries(dialect: str) -> List[Tuple[Any, Dict[str, Any]]]:
+    """
+    Formatos mais comuns da listagem (sem filtros, cada ordenação, com e sem
+    descrição), como pares (consulta, params) de `cached_page_query`.
+    Montá-los na inicialização deixa as consultas no `statement_cache` (ver
+    `db_pool.compile_startup_queries`).
+    """
+    return [
+        cached_page_query({}, 1, 10, sort, dialect, COUNT_EXACT, include_description=include_description)
+        for sort in (SORT_DATE, SORT_POPULARITY)
+        for include_description in (True, False)
+    ]
+
+def estimate_query(filters: Dict[str, Any], dialect: str) -> "Explain":
+    """EXPLAIN da consulta filtrada (sem ordenação nem paginação), para a estimativa do planner."""
+    query = select(Event.id)
+    query, _ = apply_filters(query, filters, dialect)
+    return Explain(query)
+
+def estimate_from_plan(plan: Any) -> int:
+    # psycopg2 já decodifica o JSON do plano; asyncpg devolve texto
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+class Explain(Executable, ClauseElement):
+    """
+    `EXPLAIN <consulta>`, com os parâmetros no estilo do driver em uso. No
+    Postgres usa `FORMAT JSON` por padrão (`json=False` para o plano em texto);
+    no SQLite gera `EXPLAIN QUERY PLAN`.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement, json: bool = True):
+        self.statement = statement
+        self.json = json
+
+def _compile_explained(element, compiler, **kw) -> str:
+    # Compila a consulta como aninhada, para que as colunas dela não virem o
+    # mapa de resultado (o EXPLAIN devolve o plano, não linhas de `event`)
+    compiler.stack.append({"correlate_froms": set(), "asfrom_froms": set(), "selectable": element.statement})
+    try:
+        return compiler.process(element.statement, **kw)
+    finally:
+        compiler.stack.pop()
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN (FORMAT JSON) " if element.json else "EXPLAIN "
+    return prefix + _compile_explained(element, compiler, **kw)
+
+@compiles(Explain, "sqlite")
+def _compile_explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + _compile_explained(element, compiler, **kw)
+
+def uses_window_total(count_mode: str, cursor: Optional[Dict[str, Any]]) -> bool:
+    """Indica se `page_query` traz o total na própria linha (`count(*) OVER ()`)."""
+    return cursor is None and count_mode == COUNT_EXACT
+
+def window_total(rows: List[Any]) -> Optional[int]:
+    """Total trazido pela janela, ou None quando a página veio vazia."""
+    return rows[0].total_count if rows else None
+
+def page_total(
+    rows: List[Any], page: int, count_mode: str, cursor: Optional[Dict[str, Any]]
+) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Total já conhecido depois da consulta da página e, quando faltar, a consulta
+    que o completa: COUNT_EXACT (`count_query`), COUNT_ESTIMATE (`estimate_query`)
+    ou None. Os repositórios só executam o que for pedido.
+    """
+    if uses_window_total(count_mode, cursor):
+        total = window_total(rows)
+        if total is not None:
+            return total, None
+        # Página além do fim: a janela não traz linhas, então conta à parte
+        return (None, COUNT_EXACT) if page > 1 else (0, None)
+    if count_mode in (COUNT_EXACT, COUNT_ESTIMATE):
+        return None, count_mode
+    return None, None
+
+def build_page(
+    rows: List[Any],
+    page: int,
+    page_size: int,
+    sort: str,
+    count_mode: str,
+    cursor: Optional[Dict[str, Any]],
+    total: Optional[int],
+    fields: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Monta o resultado da página a partir das linhas de `page_query`. Retorna um
+    dicionário com `events` (dicionários com `fields`, por padrão `list_fields()`),
+    `total` (ou None), `has_next`, `next_cursor` e `prev_cursor`.
+    """
+    fields = fields if fields is not None else list_fields()
+    if uses_window_total(count_mode, cursor):
+        has_more = False
+        has_next = page * page_size < (total or 0)
+    else:
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        has_next = has_more
+
+    backwards = cursor is not None and cursor["direction"] == CURSOR_PREV
+    if backwards:
+        rows = list(reversed(rows))
+        has_next, has_previous = True, has_more
+    else:
+        has_previous = cursor is not None or page > 1
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_next:
+            next_cursor = encode_cursor(sort, sort_key_values(rows[-1], sort), CURSOR_NEXT)
+        if has_previous:
+            prev_cursor = encode_cursor(sort, sort_key_values(rows[0], sort), CURSOR_PREV)
+    elif cursor is not None and not backwards:
+        # Cursor além do fim: volta a partir do mesmo ponto
+        prev_cursor = encode_cursor(sort, cursor["values"], CURSOR_PREV)
+
+    return {
+        "events": [dict(zip(fields, row)) for row in rows],
+        "total": total,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+
+def finish_page(
+    rows: List[Any],
+    filters: Dict[str, Any],
+    page: int,
+    page_size: int,
+    sort_by: Optional[str],
+    count_mode: str,
+    cursor: Optional[Dict[str, Any]],
+    total: Optional[int],
+    include_description: bool = True
+) -> Dict[str, Any]:
+    """`build_page` com a ordenação efetiva e as colunas pedidas, medido como 'hydrate'."""
+    sort = effective_sort(sort_by, bool(filters.get("search_query")))
+    with span("hydrate"):
+        return build_page(
+            rows, page, page_size, sort, count_mode, cursor, total, fields=list_fields(include_description)
+        )
@@ -1,12 +1,35 @@
-from typing import List, Dict, Any, Tuple, Optional
-from sqlmodel import Session, select, or_, and_, func
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+from sqlmodel import Session, select, insert
+from collections import Counter
 from datetime import datetime, date
+import csv
+import enum
+import io
 import uuid
-from Entities.Event import Event, EventView, EventRegistration 
+from Entities.Event import Event, EventView, EventRegistration
+from Repositories.PopularityRepository import PopularityRepository
+from Repositories.RollupRepository import RollupRepository
+from Entities.EventSchemas import list_columns, list_fields, EXPORT_FIELDS
+from Repositories import EventQueries
+
+def _copy_value(value: Any) -> Any:
+    """Valor de uma coluna no CSV do COPY (NULL como \\N; enums pelo nome, como o SQLAlchemy grava)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 class EventRepository:
     def __init__(self, session: Session):
         self.session = session
+        self.popularity = PopularityRepository(session)
+        self.rollups = RollupRepository(session)
+
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
 
     def get_all_events(self) -> List[Event]:
         try:
@@ -17,110 +40,194 @@ class EventRepository:
             print(f"Error fetching all events: {e}")
             return []
 
-    def get_filtered_events(
+    def iter_all_events(self, batch_size: int = 1000) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Todos os eventos (mais recentes primeiro, como `get_all_events`) em lotes
+        de dicionários, lidos por um cursor do lado do servidor: a memória usada
+        não depende do tamanho da tabela.
+        """
+        query = select(*list_columns()).order_by(Event.start_date.desc(), Event.id.desc())
+        fields = list_fields()
+        result = self.session.exec(query, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            yield [dict(zip(fields, row)) for row in partition]
+
+    def bulk_insert_events(self, rows: List[Dict[str, Any]], chunk: int = 0) -> int:
+        """
+        Grava um lote de eventos já validados em uma transação: COPY no Postgres
+        (psycopg2) e INSERT com executemany nos demais bancos. Retorna quantos foram gravados.
+        `chunk` (posição do bloco na importação) só identifica o bloco no log.
+        """
+        if not rows:
+            return 0
+        try:
+            connection = self.session.connection()
+            if connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2":
+                self._copy_events(connection, rows)
+            else:
+                self.session.exec(insert(Event), params=rows)
+            self.session.commit()
+            return len(rows)
+        except Exception as e:
+            self.session.rollback()
+            # Só o bloco e a classe do erro: a mensagem do banco pode trazer os dados das linhas
+            print(f"Error importing events (chunk {chunk}): {type(e).__name__}")
+            raise
+
+    def _copy_events(self, connection, rows: List[Dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row.get(field)) for field in EXPORT_FIELDS])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY event ({', '.join(EXPORT_FIELDS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buffer
+            )
+        finally:
+            cursor.close()
+
+    def count_filtered_events(self, filters: Dict[str, Any]) -> int:
+        try:
+            query, params = EventQueries.cached_count_query(filters, self._dialect())
+            count = self.session.exec(query, params=params).one()
+            return count
+        except Exception as e:
+            print(f"Error counting filtered events: {e}")
+            raise
+
+    def estimate_filtered_events(self, filters: Dict[str, Any]) -> int:
+        """Estimativa do total pelo planner do Postgres (sem executar a consulta); exato nos demais bancos."""
+        if self._dialect() != "postgresql":
+            return self.count_filtered_events(filters)
+        try:
+            plan = self.session.exec(EventQueries.estimate_query(filters, "postgresql")).scalar()
+            return EventQueries.estimate_from_plan(plan)
+        except Exception as e:
+            print(f"Error estimating filtered events: {e}")
+            raise
+
+    def get_facets(self, filters: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        """Contagens por tipo, precificação, UF e categoria sob os filtros, em uma única consulta agrupada."""
+        try:
+            query, params = EventQueries.cached_facet_query(filters, self._dialect())
+            return EventQueries.build_facets(self.session.exec(query, params=params).all())
+        except Exception as e:
+            print(f"Error fetching event facets: {e}")
+            raise
+
+    def get_filtered_events_page(
         self,
         filters: Dict[str, Any],
         page: int,
         page_size: int,
-        sort_by: Optional[str] = None
-    ) -> List[Event]:
+        sort_by: Optional[str] = None,
+        count_mode: str = EventQueries.COUNT_EXACT,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Busca a página e o total em uma única ida ao banco quando possível.
+        Retorna um dicionário com `events` (dicionários só com as colunas da
+        listagem, sem hidratar entidades), `total` (ou None), `has_next`,
+        `next_cursor` e `prev_cursor`. Erros do banco são propagados: uma
+        consulta que falhou não pode parecer uma listagem vazia.
+        """
         try:
-            query = select(Event)
-            conditions = []
-            
-            if 'event_type' in filters:
-                conditions.append(Event.event_type == filters['event_type'])
-            if 'pricing_type' in filters:
-                conditions.append(Event.pricing_type == filters['pricing_type'])
-            if 'location_uf' in filters:
-                conditions.append(Event.location_uf.ilike(f"%{filters['location_uf']}%"))
-            if 'category' in filters:
-                conditions.append(Event.category.ilike(f"%{filters['category']}%"))
-            
-            if 'start_date_interval' in filters and 'end_date_interval' in filters:
-                start_interval = filters['start_date_interval']
-                end_interval = filters['end_date_interval']
-                
-                conditions.append(and_(Event.start_date >= start_interval, Event.start_date <= end_interval))
-            
-            if 'search_query' in filters and filters['search_query']:
-                search_text = f"%{filters['search_query']}%"
-                search_conditions = or_(
-                    Event.name.ilike(search_text),
-                    Event.summary.ilike(search_text),
-                    Event.description.ilike(search_text)
-                )
-                conditions.append(search_conditions)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
-            
-            if sort_by == 'date':
-                query = query.order_by(Event.start_date.desc())
-            elif sort_by == 'relevance' and 'search_query' in filters:
-                search_term = filters['search_query']
-                query = query.order_by(
-                    func.lower(Event.name).contains(search_term.lower()).desc(),
-                    func.lower(Event.summary).contains(search_term.lower()).desc(),
-                    func.lower(Event.description).contains(search_term.lower()).desc()
-                )
-            elif sort_by == 'popularity':
-                WEIGHT_REGISTRATION = 2
-                query = (
-                    query
-                    .outerjoin(EventView, Event.id == EventView.event_id)
-                    .outerjoin(EventRegistration, Event.id == EventRegistration.event_id)
-                    .group_by(Event.id) 
-                    .order_by(
-                        (func.count(EventView.id) + (func.count(EventRegistration.id) * WEIGHT_REGISTRATION)).desc()
-                    )
-                )
-            else: 
-                query = query.order_by(Event.start_date.desc())
-            
-            offset = (page - 1) * page_size
-            query = query.offset(offset).limit(page_size)
-            
-            events = self.session.exec(query).all()
-            return events
-            
+            query, params = EventQueries.cached_page_query(
+                filters, page, page_size, sort_by, self._dialect(), count_mode, cursor, include_description
+            )
+            rows = self.session.exec(query, params=params).all()
+
+            total, pending = EventQueries.page_total(rows, page, count_mode, cursor)
+            if pending == EventQueries.COUNT_EXACT:
+                total = self.count_filtered_events(filters)
+            elif pending == EventQueries.COUNT_ESTIMATE:
+                total = self.estimate_filtered_events(filters)
+
+            return EventQueries.finish_page(
+                rows, filters, page, page_size, sort_by, count_mode, cursor, total, include_description
+            )
+
         except Exception as e:
-            print(f"Error fetching filtered events: {e}")
-            return []
+            print(f"Error fetching filtered events page: {e}")
+            raise
 
-    def count_filtered_events(self, filters: Dict[str, Any]) -> int:
+    def record_view(self, event_id: uuid.UUID, view_timestamp: Optional[datetime] = None) -> Optional[EventView]:
         try:
-            query = select(func.count(Event.id))
-            conditions = []
-            
-            if 'event_type' in filters:
-                conditions.append(Event.event_type == filters['event_type'])
-            if 'pricing_type' in filters:
-                conditions.append(Event.pricing_type == filters['pricing_type'])
-            if 'location_uf' in filters:
-                conditions.append(Event.location_uf.ilike(f"%{filters['location_uf']}%"))
-            if 'category' in filters:
-                conditions.append(Event.category.ilike(f"%{filters['category']}%"))
-            
-            if 'start_date_interval' in filters and 'end_date_interval' in filters:
-                start_interval = filters['start_date_interval']
-                end_interval = filters['end_date_interval']
-                conditions.append(and_(Event.start_date >= start_interval, Event.start_date <= end_interval))
-
-            if 'search_query' in filters and filters['search_query']:
-                search_text = f"%{filters['search_query']}%"
-                search_conditions = or_(
-                    Event.name.ilike(search_text),
-                    Event.summary.ilike(search_text),
-                    Event.description.ilike(search_text)
-                )
-                conditions.append(search_conditions)
-            
-            if conditions:
-                query = query.where(and_(*conditions))
-            
-            count = self.session.exec(query).one()
-            return count
+            view = EventView(event_id=event_id, view_timestamp=view_timestamp or datetime.utcnow())
+            self.session.add(view)
+            self.popularity.increment(event_id, views=1)
+            self.rollups.increment_many([(event_id, view.view_timestamp, 1, 0)])
+            self.session.commit()
+            self.session.refresh(view)
+            return view
         except Exception as e:
-            print(f"Error counting filtered events: {e}")
-            return 0
\ No newline at end of file
+            self.session.rollback()
+            print(f"Error recording event view: {e}")
+            return None
+
+    def bulk_record_views(self, views: List[Tuple[uuid.UUID, datetime, int]]) -> int:
+        """
+        Grava visualizações em lote: um INSERT multi-linha em EventView, um único
+        upsert de contadores por evento e um upsert por tabela de agregados. Cada item é (event_id, view_timestamp, quantidade);
+        cada item vira uma linha de EventView com `view_count` = quantidade (com o buffer
+        pré-agregado, uma linha por evento e minuto). Visualizações de eventos inexistentes
+        são descartadas. Retorna quantas visualizações foram gravadas.
+        """
+        if not views:
+            return 0
+        try:
+            event_ids = {event_id for event_id, _, _ in views}
+            existing = set(self.session.exec(select(Event.id).where(Event.id.in_(event_ids))).all())
+
+            rows = []
+            per_event = Counter()
+            activity = []
+            for event_id, view_timestamp, count in views:
+                if event_id not in existing:
+                    continue
+                per_event[event_id] += count
+                activity.append((event_id, view_timestamp, count, 0))
+                rows.append({
+                    "id": uuid.uuid4(), "event_id": event_id, "view_timestamp": view_timestamp, "view_count": count
+                })
+
+            if rows:
+                self.session.exec(insert(EventView), params=rows)
+                self.popularity.increment_many([
+                    {"event_id": event_id, "view_count": count} for event_id, count in per_event.items()
+                ])
+                self.rollups.increment_many(activity)
+            self.session.commit()
+            return sum(per_event.values())
+        except Exception as e:
+            self.session.rollback()
+            print(f"Error recording event views in bulk: {e}")
+            raise
+
+    def record_registration(
+        self,
+        event_id: uuid.UUID,
+        status: str,
+        payment_id: Optional[uuid.UUID] = None,
+        registration_timestamp: Optional[datetime] = None
+    ) -> Optional[EventRegistration]:
+        try:
+            registration = EventRegistration(
+                event_id=event_id,
+                status=status,
+                payment_id=payment_id,
+                registration_timestamp=registration_timestamp or datetime.utcnow()
+            )
+            self.session.add(registration)
+            self.popularity.increment(event_id, registrations=1)
+            self.rollups.increment_many([(event_id, registration.registration_timestamp, 0, 1)])
+            self.session.commit()
+            self.session.refresh(registration)
+            return registration
+        except Exception as e:
+            self.session.rollback()
+            print(f"Error recording event registration: {e}")
+            return None
@@ -0,0 +1,99 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from Entities.EventSchemas import list_fields
+from Repositories import EventQueries
+from Repositories.EventIndex import EventIndex
+from metrics import span
+
+
+class _IndexRow:
+    """Linha no formato de `EventQueries.page_query`: colunas da listagem, chaves de ordenação e o total."""
+
+    __slots__ = ("values", "_mapping", "total_count")
+
+    def __init__(self, values: Tuple[Any, ...], keys: Tuple[Any, ...], total: int):
+        self.values = values
+        self._mapping = {f"sort_key_{i}": key for i, key in enumerate(keys)}
+        self.total_count = total
+
+    def __iter__(self):
+        return iter(self.values)
+
+
+def _first_below(matches: Sequence[int], key: Callable[[int], Tuple[Any, ...]], bound: Tuple[Any, ...], inclusive: bool) -> int:
+    """Primeira posição de `matches` (ordem decrescente) com chave menor que `bound` (ou igual, com `inclusive`)."""
+    low, high = 0, len(matches)
+    while low < high:
+        middle = (low + high) // 2
+        value = key(matches[middle])
+        if value < bound or (inclusive and value == bound):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+class MemoryEventRepository:
+    """
+    Mesmo contrato de leitura da listagem do EventRepository
+    (`get_filtered_events_page` e `get_facets`), respondido pelo snapshot
+    do EventIndex, sem ir ao banco. As páginas passam pelo mesmo
+    `EventQueries.build_page`, então cursores e paginação têm o mesmo formato.
+    """
+
+    def __init__(self, index: EventIndex):
+        self.index = index
+
+    def get_facets(self, filters: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+        try:
+            return EventQueries.build_facets(self.index.snapshot.facet_rows(filters))
+        except Exception as e:
+            print(f"Error fetching event facets from memory index: {e}")
+            raise
+
+    def get_filtered_events_page(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str] = None,
+        count_mode: str = EventQueries.COUNT_EXACT,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True
+    ) -> Dict[str, Any]:
+        try:
+            snapshot = self.index.snapshot
+            sort = EventQueries.effective_sort(sort_by, bool(filters.get('search_query')))
+            if cursor is not None and cursor["sort"] != sort:
+                raise ValueError("Cursor gerado para outra ordenação")
+
+            # Mesmas janelas de `page_query`: linha extra para saber se há próxima página, exceto com o total
+            offset = (page - 1) * page_size
+            limit = page_size if EventQueries.uses_window_total(count_mode, cursor) else page_size + 1
+            # Sem total e sem cursor, basta encontrar os eventos até o fim da página
+            scan_limit = offset + limit if count_mode == EventQueries.COUNT_NONE and cursor is None else None
+
+            matches, ranks = snapshot.select(filters, sort, scan_limit)
+            key = snapshot.sort_key(sort, ranks)
+
+            if cursor is None:
+                positions = matches[offset:offset + limit]
+            elif cursor["direction"] == EventQueries.CURSOR_PREV:
+                # Ordem crescente a partir do cursor, como a consulta invertida do banco
+                end = _first_below(matches, key, tuple(cursor["values"]), inclusive=True)
+                positions = matches[max(0, end - page_size - 1):end][::-1]
+            else:
+                start = _first_below(matches, key, tuple(cursor["values"]), inclusive=False)
+                positions = matches[start:start + page_size + 1]
+
+            total = len(matches) if count_mode in (EventQueries.COUNT_EXACT, EventQueries.COUNT_ESTIMATE) else None
+            fields = list_fields(include_description)
+            with span("hydrate"):
+                rows = [
+                    _IndexRow(snapshot.records[position].values(fields), key(position), total)
+                    for position in positions
+                ]
+                return EventQueries.build_page(rows, page, page_size, sort, count_mode, cursor, total, fields=fields)
+
+        except Exception as e:
+            print(f"Error fetching filtered events page from memory index: {e}")
+            raise
@@ -0,0 +1,137 @@
+from typing import List, Dict, Any
+from sqlmodel import Session, select, func, delete, insert
+from sqlalchemy import bindparam
+import uuid
+from Entities.Event import Event, EventView, EventRegistration, EventPopularity, WEIGHT_VIEW, WEIGHT_REGISTRATION
+from Repositories.Upsert import upsert_increment
+
+event_table = Event.__table__
+
+class PopularityRepository:
+    """
+    Contadores de popularidade: a tabela event_popularity e a cópia da
+    pontuação em `event.popularity_score` (usada na ordenação da listagem),
+    sempre gravadas juntas. As escritas em `event` repetem `updated_at` para
+    que o onupdate da coluna não marque o evento como alterado.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def increment(self, event_id: uuid.UUID, views: int = 0, registrations: int = 0) -> None:
+        self.increment_many([
+            {"event_id": event_id, "view_count": views, "registration_count": registrations}
+        ])
+
+    def increment_many(self, deltas: List[Dict[str, Any]]) -> None:
+        """Aplica incrementos de visualizações/inscrições a vários eventos (não faz commit)."""
+        rows = []
+        for delta in deltas:
+            views = delta.get("view_count", 0)
+            registrations = delta.get("registration_count", 0)
+            if not views and not registrations:
+                continue
+            rows.append({
+                "event_id": delta["event_id"],
+                "view_count": views,
+                "registration_count": registrations,
+                "score": views * WEIGHT_VIEW + registrations * WEIGHT_REGISTRATION,
+            })
+        upsert_increment(
+            self.session,
+            EventPopularity.__table__,
+            key_columns=["event_id"],
+            increment_columns=["view_count", "registration_count", "score"],
+            rows=rows
+        )
+        scored = [{"target_id": row["event_id"], "delta": row["score"]} for row in rows if row["score"]]
+        if scored:
+            self.session.execute(
+                event_table.update()
+                .where(event_table.c.id == bindparam("target_id"))
+                .values(
+                    popularity_score=event_table.c.popularity_score + bindparam("delta"),
+                    updated_at=event_table.c.updated_at,
+                ),
+                scored
+            )
+
+    def _raw_counts_query(self):
+        """Contagens calculadas a partir das tabelas brutas, agregadas separadamente para não multiplicar linhas."""
+        views = (
+            select(EventView.event_id, func.sum(EventView.view_count).label("view_count"))
+            .group_by(EventView.event_id)
+            .subquery()
+        )
+        registrations = (
+            select(EventRegistration.event_id, func.count().label("registration_count"))
+            .group_by(EventRegistration.event_id)
+            .subquery()
+        )
+        view_count = func.coalesce(views.c.view_count, 0)
+        registration_count = func.coalesce(registrations.c.registration_count, 0)
+        return (
+            select(
+                Event.id.label("event_id"),
+                view_count.label("view_count"),
+                registration_count.label("registration_count"),
+                (view_count * WEIGHT_VIEW + registration_count * WEIGHT_REGISTRATION).label("score"),
+            )
+            .outerjoin(views, views.c.event_id == Event.id)
+            .outerjoin(registrations, registrations.c.event_id == Event.id)
+        )
+
+    def rebuild(self) -> int:
+        """Recalcula todos os contadores a partir de EventView/EventRegistration."""
+        try:
+            raw = self._raw_counts_query()
+            self.session.exec(delete(EventPopularity))
+            self.session.exec(
+                insert(EventPopularity).from_select(
+                    ["event_id", "view_count", "registration_count", "score"], raw
+                )
+            )
+            score = func.coalesce(
+                select(EventPopularity.score)
+                .where(EventPopularity.event_id == event_table.c.id)
+                .scalar_subquery(),
+                0
+            )
+            self.session.execute(
+                event_table.update()
+                .where(event_table.c.popularity_score != score)
+                .values(popularity_score=score, updated_at=event_table.c.updated_at)
+            )
+            self.session.commit()
+            return self.session.exec(select(func.count()).select_from(EventPopularity)).one()
+        except Exception as e:
+            self.session.rollback()
+            print(f"Error rebuilding popularity counters: {e}")
+            raise
+
+    def check_consistency(self) -> List[Dict[str, Any]]:
+        """Retorna os eventos cujos contadores (ou `event.popularity_score`) divergem das tabelas brutas."""
+        raw = self._raw_counts_query().subquery()
+        stored_views = func.coalesce(EventPopularity.view_count, 0)
+        stored_registrations = func.coalesce(EventPopularity.registration_count, 0)
+        stored_score = func.coalesce(EventPopularity.score, 0)
+        query = (
+            select(
+                raw.c.event_id,
+                raw.c.view_count,
+                raw.c.registration_count,
+                stored_views.label("stored_view_count"),
+                stored_registrations.label("stored_registration_count"),
+                stored_score.label("stored_score"),
+                event_table.c.popularity_score.label("stored_popularity_score"),
+            )
+            .join(event_table, event_table.c.id == raw.c.event_id)
+            .outerjoin(EventPopularity, EventPopularity.event_id == raw.c.event_id)
+            .where(
+                (raw.c.view_count != stored_views)
+                | (raw.c.registration_count != stored_registrations)
+                | (raw.c.score != stored_score)
+                | (raw.c.score != event_table.c.popularity_score)
+            )
+        )
+        return [dict(row._mapping) for row in self.session.exec(query).all()]
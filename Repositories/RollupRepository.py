@@ -0,0 +1,170 @@
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from sqlmodel import Session, select, func, delete, insert
+from sqlalchemy import literal, union_all
+from datetime import datetime
+import uuid
+from Entities.Event import (
+    Event, EventView, EventRegistration, EventActivityHourly, EventActivityDaily,
+    GRANULARITY_HOUR, GRANULARITY_DAY, WEIGHT_VIEW, WEIGHT_REGISTRATION
+)
+from Repositories.Upsert import upsert_increment
+
+ROLLUP_TABLES = {GRANULARITY_HOUR: EventActivityHourly, GRANULARITY_DAY: EventActivityDaily}
+
+# Ordenações aceitas pelo ranking
+TOP_BY_VIEWS = "views"
+TOP_BY_REGISTRATIONS = "registrations"
+TOP_BY_SCORE = "score"
+TOP_METRICS = (TOP_BY_SCORE, TOP_BY_VIEWS, TOP_BY_REGISTRATIONS)
+
+def truncate(timestamp: datetime, granularity: str) -> datetime:
+    """Início da janela (hora ou dia) que contém o horário."""
+    if granularity == GRANULARITY_DAY:
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def _truncate_sql(column, granularity: str, dialect: str):
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    if dialect == "sqlite":
+        # Mesmo formato em que o SQLAlchemy grava DateTime no SQLite, para casar com a chave primária
+        pattern = "%Y-%m-%d 00:00:00.000000" if granularity == GRANULARITY_DAY else "%Y-%m-%d %H:00:00.000000"
+        return func.strftime(pattern, column)
+    raise NotImplementedError(f"Agregados não suportados para o dialeto '{dialect}'")
+
+def backfill_statements(dialect: str, since: Optional[datetime] = None) -> List[Any]:
+    """
+    Comandos que recalculam os agregados a partir de EventView/EventRegistration:
+    apagam as janelas a partir de `since` (todas, se None) e as reinserem. `since`
+    é truncado para o início do dia, para que as janelas diárias fiquem completas.
+    Cada linha de EventView vale o seu `view_count`.
+    """
+    since = truncate(since, GRANULARITY_DAY) if since is not None else None
+    statements = []
+    for granularity, table in ROLLUP_TABLES.items():
+        # Views e inscrições são empilhadas (UNION ALL) e agregadas juntas, sem multiplicar linhas
+        views = select(
+            EventView.event_id.label("event_id"),
+            _truncate_sql(EventView.view_timestamp, granularity, dialect).label("bucket_start"),
+            EventView.view_count.label("view_count"),
+            literal(0).label("registration_count"),
+        )
+        registrations = select(
+            EventRegistration.event_id.label("event_id"),
+            _truncate_sql(EventRegistration.registration_timestamp, granularity, dialect).label("bucket_start"),
+            literal(0).label("view_count"),
+            literal(1).label("registration_count"),
+        )
+        if since is not None:
+            views = views.where(EventView.view_timestamp >= since)
+            registrations = registrations.where(EventRegistration.registration_timestamp >= since)
+        activity = union_all(views, registrations).subquery()
+        aggregated = (
+            select(
+                activity.c.event_id,
+                activity.c.bucket_start,
+                func.sum(activity.c.view_count),
+                func.sum(activity.c.registration_count),
+            )
+            .group_by(activity.c.event_id, activity.c.bucket_start)
+        )
+
+        target = table.__table__
+        clear = delete(target)
+        if since is not None:
+            clear = clear.where(target.c.bucket_start >= since)
+        statements.append(clear)
+        statements.append(
+            insert(target).from_select(["event_id", "bucket_start", "view_count", "registration_count"], aggregated)
+        )
+    return statements
+
+class RollupRepository:
+    """
+    Agregados de views e inscrições por evento e por hora/dia (UTC), mantidos a
+    cada gravação e usados pelas estatísticas, sem varrer as tabelas brutas.
+    """
+    def __init__(self, session: Session):
+        self.session = session
+
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    def increment_many(self, activity: Iterable[Tuple[uuid.UUID, datetime, int, int]]) -> None:
+        """
+        Soma (event_id, horário, views, inscrições) às janelas de hora e de dia
+        correspondentes, com um upsert por tabela (não faz commit).
+        """
+        activity = list(activity)
+        for granularity, table in ROLLUP_TABLES.items():
+            rows: Dict[Tuple[uuid.UUID, datetime], Dict[str, Any]] = {}
+            for event_id, timestamp, views, registrations in activity:
+                bucket_start = truncate(timestamp, granularity)
+                row = rows.setdefault(
+                    (event_id, bucket_start),
+                    {"event_id": event_id, "bucket_start": bucket_start, "view_count": 0, "registration_count": 0}
+                )
+                row["view_count"] += views
+                row["registration_count"] += registrations
+            upsert_increment(
+                self.session,
+                table.__table__,
+                key_columns=["event_id", "bucket_start"],
+                increment_columns=["view_count", "registration_count"],
+                rows=list(rows.values())
+            )
+
+    def rebuild(self, since: Optional[datetime] = None) -> int:
+        """Recalcula os agregados a partir das tabelas brutas (todas as janelas ou a partir de `since`)."""
+        try:
+            for statement in backfill_statements(self._dialect(), since):
+                self.session.exec(statement)
+            self.session.commit()
+            return self.session.exec(select(func.count()).select_from(EventActivityHourly)).one()
+        except Exception as e:
+            self.session.rollback()
+            print(f"Error rebuilding activity rollups: {e}")
+            raise
+
+    def event_series(
+        self, event_id: uuid.UUID, granularity: str, start: datetime, end: datetime
+    ) -> List[Dict[str, Any]]:
+        """Janelas de um evento entre `start` (inclusive) e `end` (exclusive), só as que tiveram atividade."""
+        table = ROLLUP_TABLES[granularity]
+        query = (
+            select(table.bucket_start, table.view_count, table.registration_count)
+            .where(table.event_id == event_id, table.bucket_start >= start, table.bucket_start < end)
+            .order_by(table.bucket_start)
+        )
+        return [
+            {"bucket_start": bucket_start, "views": views, "registrations": registrations}
+            for bucket_start, views, registrations in self.session.exec(query).all()
+        ]
+
+    def top_events(
+        self, granularity: str, since: datetime, metric: str = TOP_BY_SCORE, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Eventos com mais atividade desde `since`, somando as janelas da granularidade."""
+        table = ROLLUP_TABLES[granularity]
+        views = func.sum(table.view_count)
+        registrations = func.sum(table.registration_count)
+        score = views * WEIGHT_VIEW + registrations * WEIGHT_REGISTRATION
+        order = {TOP_BY_VIEWS: views, TOP_BY_REGISTRATIONS: registrations, TOP_BY_SCORE: score}[metric]
+        query = (
+            select(
+                table.event_id,
+                Event.name,
+                views.label("views"),
+                registrations.label("registrations"),
+                score.label("score"),
+            )
+            .join(Event, Event.id == table.event_id)
+            .where(table.bucket_start >= since)
+            .group_by(table.event_id, Event.name)
+            .order_by(order.desc(), table.event_id)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in self.session.exec(query).all()]
+
+    def event_exists(self, event_id: uuid.UUID) -> bool:
+        return self.session.exec(select(Event.id).where(Event.id == event_id)).first() is not None
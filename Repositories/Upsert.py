@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import Table
+from sqlmodel import Session
+
+
+def upsert_increment(
+    session: Session,
+    table: Table,
+    key_columns: Sequence[str],
+    increment_columns: Sequence[str],
+    rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Insere as linhas ou, se a chave já existir, soma os valores de
+    `increment_columns` aos contadores atuais, em um único comando.
+    """
+    if not rows:
+        return
+
+    # Só o dialeto em uso é importado (e só na primeira escrita)
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects import postgresql
+
+        statement = postgresql.insert(table)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"Upsert não suportado para o dialeto '{dialect}'")
+
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            column: table.c[column] + statement.excluded[column]
+            for column in increment_columns
+        }
+    )
+    session.execute(statement, rows)
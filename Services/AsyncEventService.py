@@ -0,0 +1,87 @@
+from typing import Optional, Dict, Any
+from Repositories.AsyncEventRepository import AsyncEventRepository
+from Services.EventService import EventService
+from Services.EventCache import EventListCache
+from Services.SingleFlight import AsyncSingleFlight
+from metrics import span
+from functools import partial
+
+class AsyncEventService(EventService):
+    """
+    Mesmas regras do EventService, aguardando o AsyncEventRepository: cache,
+    single-flight e montagem da resposta são os da classe base.
+    """
+    def __init__(
+        self,
+        repository: AsyncEventRepository,
+        cache: Optional[EventListCache] = None,
+        flight: Optional[AsyncSingleFlight] = None
+    ):
+        self.repository = repository
+        self.cache = cache
+        self.flight = flight
+
+    async def get_events(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        page: int = 1,
+        page_size: int = 10,
+        sort_by: Optional[str] = None,
+        count_mode: Optional[str] = None,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True,
+        include_facets: bool = False
+    ) -> Dict[str, Any]:
+        try:
+            args, cache_key, flight_key = self._list_request(
+                filters, page, page_size, sort_by, count_mode, cursor, include_description, include_facets
+            )
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                return cached
+
+            load = partial(self._load_events, *args)
+            if self.flight is not None:
+                response, shared = await self.flight.do(flight_key, load)
+            else:
+                response, shared = await load(), False
+
+            self._store_response(cache_key, response, shared, sort_by)
+            return response
+
+        except Exception as e:
+            return self._failure(e)
+
+    async def _load_events(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        count_mode: str,
+        cursor: Optional[Dict[str, Any]],
+        include_description: bool,
+        include_facets: bool
+    ) -> Dict[str, Any]:
+        with span("repository"):
+            result = await self.repository.get_filtered_events_page(
+                filters, page, page_size, sort_by, count_mode, cursor, include_description
+            )
+        response = self._build_response(result, page, page_size, count_mode, cursor)
+        if include_facets:
+            with span("facets"):
+                response["facets"] = await self._get_facets(filters)
+        return response
+
+    async def _get_facets(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key, cached = self._cached_facets(filters)
+        if cached is not None:
+            return cached
+        facets = await self.repository.get_facets(filters)
+        self._store_facets(key, facets)
+        return facets
+
+    async def search_events(self, query: str, page: int = 1, page_size: int = 10, sort_by: Optional[str] = None) -> Dict[str, Any]:
+        if not query or not query.strip():
+            return self._empty_response()
+        return await self.get_events(filters={"search_query": query.strip()}, page=page, page_size=page_size, sort_by=sort_by)
@@ -0,0 +1,296 @@
+from typing import Any, Dict, Iterable, Optional
+from collections import OrderedDict
+from datetime import date, datetime
+from os import getenv
+import enum
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session as OrmSession
+
+from Entities.Event import Event, EventView, EventRegistration, EventPopularity
+from Repositories.EventQueries import SORT_POPULARITY
+
+# Grupos de invalidação: escritas em Event afetam toda a listagem; views e
+# inscrições só afetam a ordenação por popularidade.
+SCOPE_EVENTS = "events"
+SCOPE_ACTIVITY = "activity"
+
+_SCOPES_BY_ENTITY = {
+    Event: SCOPE_EVENTS,
+    EventView: SCOPE_ACTIVITY,
+    EventRegistration: SCOPE_ACTIVITY,
+    EventPopularity: SCOPE_ACTIVITY,
+}
+
+
+class MemoryCacheBackend:
+    """Cache local ao processo com expiração (TTL) e descarte do menos usado (LRU)."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Contadores (gerações) ficam fora do LRU para nunca serem descartados
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Cache compartilhado entre processos/máquinas. Requer os pacotes `redis` e
+    `orjson`. Os valores são gravados como JSON, nunca com pickle: um Redis
+    compartilhado não pode virar execução de código ao ler o cache. Datas,
+    UUIDs e enums voltam como texto, no mesmo formato em que a resposta é
+    serializada. Uma entrada que não seja JSON válido é tratada como ausente.
+    """
+
+    def __init__(self, url: str, prefix: str = "darc:", client=None):
+        import orjson  # dependências opcionais
+
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._orjson = orjson
+        # Descartes são feitos pelo próprio Redis (maxmemory-policy)
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        try:
+            return self._orjson.loads(raw)
+        except self._orjson.JSONDecodeError:
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(self.prefix + key, self._orjson.dumps(value), ex=int(ttl) if ttl else None)
+
+    def get_counter(self, key: str) -> int:
+        raw = self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def list_request_digest(
+    filters: Dict[str, Any],
+    page: int,
+    page_size: int,
+    sort_by: Optional[str],
+    count_mode: str,
+    cursor: Optional[Dict[str, Any]] = None,
+    include_description: bool = True,
+    include_facets: bool = False
+) -> str:
+    """Identifica uma listagem pelos filtros já validados e pelos parâmetros de paginação/ordenação."""
+    params = _normalize({
+        "filters": filters,
+        "page": page if cursor is None else None,
+        "page_size": page_size,
+        "sort": sort_by,
+        "count_mode": count_mode,
+        "cursor": cursor,
+        "include_description": include_description,
+        "include_facets": include_facets,
+    })
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+class EventListCache:
+    """
+    Cache das respostas de `EventService.get_events`. A chave é derivada dos
+    filtros já validados e dos parâmetros de paginação/ordenação, prefixada pela
+    geração atual dos dados: invalidar é apenas incrementar a geração, e as
+    entradas antigas saem por TTL/LRU.
+    """
+
+    def __init__(self, backend, ttl: float = 30, popularity_staleness: float = 60):
+        self.backend = backend
+        self.ttl = ttl
+        # Por quanto tempo a ordenação por popularidade pode ignorar novas views/inscrições.
+        # Com 0, cada escrita dessas invalida as listagens por popularidade.
+        self.popularity_staleness = popularity_staleness
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # Os contadores são atualizados por várias threads (threadpool do modo sync)
+        self._lock = threading.Lock()
+
+    def _generation(self, scope: str) -> int:
+        return self.backend.get_counter(f"generation:{scope}")
+
+    def make_key(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        count_mode: str,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True,
+        include_facets: bool = False
+    ) -> str:
+        digest = list_request_digest(
+            filters, page, page_size, sort_by, count_mode, cursor, include_description, include_facets
+        )
+
+        generation = f"{self._generation(SCOPE_EVENTS)}"
+        if sort_by == SORT_POPULARITY and self.popularity_staleness <= 0:
+            generation += f".{self._generation(SCOPE_ACTIVITY)}"
+        return f"events:{generation}:{sort_by or ''}:{digest}"
+
+    def make_facets_key(self, filters: Dict[str, Any]) -> str:
+        """
+        Chave das facetas de um conjunto de filtros. Elas não dependem de página,
+        ordenação nem cursor, então todas as páginas da mesma busca compartilham
+        uma única entrada (invalidada junto com a listagem).
+        """
+        digest = hashlib.sha1(json.dumps(_normalize(filters), sort_keys=True).encode()).hexdigest()
+        return f"facets:{self._generation(SCOPE_EVENTS)}:{digest}"
+
+    def _ttl_for(self, sort_by: Optional[str]) -> float:
+        if sort_by == SORT_POPULARITY and self.popularity_staleness > 0:
+            return min(self.ttl, self.popularity_staleness)
+        return self.ttl
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any], sort_by: Optional[str]) -> None:
+        self.backend.set(key, value, self._ttl_for(sort_by))
+
+    def invalidate(self, scopes: Iterable[str]) -> None:
+        for scope in set(scopes):
+            if scope == SCOPE_ACTIVITY and self.popularity_staleness > 0:
+                continue
+            self.backend.incr(f"generation:{scope}")
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        lookups = hits + misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": hits,
+            "misses": misses,
+            "hitRatio": hits / lookups if lookups else None,
+            "evictions": self.backend.evictions,
+            "invalidations": invalidations,
+            "entries": self.backend.size(),
+        }
+
+
+def _build_cache() -> Optional[EventListCache]:
+    backend_name = getenv("EVENTS_CACHE_BACKEND", "memory").lower()
+    if backend_name in ("", "none", "off"):
+        return None
+    if backend_name == "redis":
+        backend = RedisCacheBackend(getenv("REDIS_URL", "redis://localhost:6379/0"))
+    elif backend_name == "memory":
+        backend = MemoryCacheBackend(int(getenv("EVENTS_CACHE_MAX_ENTRIES", "1024")))
+    else:
+        raise ValueError(f"EVENTS_CACHE_BACKEND inválido: '{backend_name}' (use memory, redis ou none)")
+    return EventListCache(
+        backend,
+        ttl=float(getenv("EVENTS_CACHE_TTL", "30")),
+        popularity_staleness=float(getenv("EVENTS_CACHE_POPULARITY_STALENESS", "60")),
+    )
+
+event_cache = _build_cache()
+
+def get_event_cache() -> Optional[EventListCache]:
+    return event_cache
+
+def invalidate_event_cache(scopes: Iterable[str]) -> None:
+    """Invalidação explícita, para escritas feitas fora do ORM (bulk/Core)."""
+    if event_cache is not None:
+        event_cache.invalidate(scopes)
+
+
+# Invalidação automática: toda sessão que grava Event/EventView/EventRegistration
+# invalida o cache depois do commit.
+@sa_event.listens_for(OrmSession, "after_flush")
+def _collect_touched_scopes(session, flush_context):
+    touched = session.info.setdefault("event_cache_scopes", set())
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        scope = _SCOPES_BY_ENTITY.get(type(instance))
+        if scope:
+            touched.add(scope)
+
+@sa_event.listens_for(OrmSession, "after_commit")
+def _invalidate_after_commit(session):
+    touched = session.info.pop("event_cache_scopes", None)
+    if touched:
+        invalidate_event_cache(touched)
+
+@sa_event.listens_for(OrmSession, "after_rollback")
+def _discard_touched_scopes(session):
+    session.info.pop("event_cache_scopes", None)
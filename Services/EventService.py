@@ -1,56 +1,183 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from Repositories.EventRepository import EventRepository
+from Repositories.EventQueries import COUNT_ESTIMATE, default_count_mode
 from Entities.Event import Event, EventTypeEnum, PricingTypeEnum
+from Services.EventCache import EventListCache, list_request_digest
+from Services.SingleFlight import SingleFlight
+from metrics import span
+from db_routing import database_overloaded
+from functools import partial
 import math
 from datetime import date, datetime
 
 class EventService:
-    def __init__(self, repository: EventRepository):
+    def __init__(
+        self,
+        repository: EventRepository,
+        cache: Optional[EventListCache] = None,
+        flight: Optional[SingleFlight] = None
+    ):
         self.repository = repository
+        self.cache = cache
+        self.flight = flight
 
     def get_events(
         self,
         filters: Optional[Dict[str, Any]] = None,
         page: int = 1,
         page_size: int = 10,
-        sort_by: Optional[str] = None
+        sort_by: Optional[str] = None,
+        count_mode: Optional[str] = None,
+        cursor: Optional[Dict[str, Any]] = None,
+        include_description: bool = True,
+        include_facets: bool = False
     ) -> Dict[str, Any]:
         try:
-            if filters is None:
-                filters = {}
+            args, cache_key, flight_key = self._list_request(
+                filters, page, page_size, sort_by, count_mode, cursor, include_description, include_facets
+            )
+            cached = self.cache.get(cache_key) if cache_key is not None else None
+            if cached is not None:
+                return cached
 
-            validated_filters = self._validate_filters(filters)
-            
-            total_items = self.repository.count_filtered_events(validated_filters)
-            
-            events = self.repository.get_filtered_events(validated_filters, page, page_size, sort_by)
+            load = partial(self._load_events, *args)
+            if self.flight is not None:
+                # Requisições idênticas simultâneas compartilham uma única ida ao banco
+                response, shared = self.flight.do(flight_key, load)
+            else:
+                response, shared = load(), False
 
-            total_pages = math.ceil(total_items / page_size) if page_size > 0 else 0
-            
-            pagination = {
-                "currentPage": page,
-                "totalPages": total_pages,
-                "previousPage": page - 1 if page > 1 else None,
-                "nextPage": page + 1 if page < total_pages else None,
-                "totalItems": total_items,
-            }
-
-            return {
-                "data": events,
-                "pagination": pagination,
-                "error": None
-            }
+            self._store_response(cache_key, response, shared, sort_by)
+            return response
 
         except Exception as e:
-            print(f"Error in service when fetching events: {e}")
-            return {
-                "data": None,
-                "pagination": None,
-                "error": {
-                    "code": "SERVER_ERROR",
-                    "message": f"Internal server error: {str(e)}"
-                }
+            return self._failure(e)
+
+    def _list_request(
+        self,
+        filters: Optional[Dict[str, Any]],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        count_mode: Optional[str],
+        cursor: Optional[Dict[str, Any]],
+        include_description: bool,
+        include_facets: bool
+    ) -> Tuple[Tuple[Any, ...], Optional[str], Optional[str]]:
+        """
+        Normaliza a requisição da listagem e retorna (argumentos de `_load_events`,
+        chave do cache, chave do single-flight). A versão assíncrona usa o mesmo.
+        """
+        validated_filters = self._validate_filters(filters or {})
+        if count_mode is None:
+            count_mode = default_count_mode(cursor)
+        args = (validated_filters, page, page_size, sort_by, count_mode, cursor, include_description, include_facets)
+
+        cache_key = self.cache.make_key(*args) if self.cache is not None else None
+        flight_key = None
+        if self.flight is not None:
+            flight_key = cache_key or list_request_digest(*args)
+        return args, cache_key, flight_key
+
+    def _store_response(
+        self, cache_key: Optional[str], response: Dict[str, Any], shared: bool, sort_by: Optional[str]
+    ) -> None:
+        # Só quem consultou o banco grava no cache, e nunca um erro
+        if cache_key is not None and not shared and response["error"] is None:
+            self.cache.set(cache_key, response, sort_by)
+
+    def _failure(self, e: Exception) -> Dict[str, Any]:
+        # Falta de tempo no banco (checkout ou statement_timeout) vira 503, não erro interno
+        overloaded = database_overloaded(e)
+        if overloaded is not None:
+            raise overloaded from e
+        print(f"Error in service when fetching events: {e}")
+        return self._error_response(e)
+
+    def _load_events(
+        self,
+        filters: Dict[str, Any],
+        page: int,
+        page_size: int,
+        sort_by: Optional[str],
+        count_mode: str,
+        cursor: Optional[Dict[str, Any]],
+        include_description: bool,
+        include_facets: bool
+    ) -> Dict[str, Any]:
+        """Consulta a página (e as facetas) e monta a resposta da listagem."""
+        with span("repository"):
+            result = self.repository.get_filtered_events_page(
+                filters, page, page_size, sort_by, count_mode, cursor, include_description
+            )
+        response = self._build_response(result, page, page_size, count_mode, cursor)
+        if include_facets:
+            with span("facets"):
+                response["facets"] = self._get_facets(filters)
+        return response
+
+    def _get_facets(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Facetas dos filtros, do cache quando possível (compartilhadas por todas as páginas)."""
+        key, cached = self._cached_facets(filters)
+        if cached is not None:
+            return cached
+        facets = self.repository.get_facets(filters)
+        self._store_facets(key, facets)
+        return facets
+
+    def _cached_facets(self, filters: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_facets_key(filters)
+        return key, self.cache.get(key)
+
+    def _store_facets(self, key: Optional[str], facets: Optional[Dict[str, Any]]) -> None:
+        if key is not None and facets is not None:
+            self.cache.set(key, facets, None)
+
+    def _build_response(
+        self,
+        result: Dict[str, Any],
+        page: int,
+        page_size: int,
+        count_mode: str,
+        cursor: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        events = result["events"]
+        total_items = result["total"]
+
+        if total_items is not None and page_size > 0:
+            total_pages = math.ceil(total_items / page_size)
+        else:
+            total_pages = None
+        
+        # Com cursor a posição não é um número de página
+        pagination = {
+            "currentPage": page if cursor is None else None,
+            "totalPages": total_pages,
+            "previousPage": page - 1 if page > 1 and cursor is None else None,
+            "nextPage": page + 1 if result["has_next"] and cursor is None else None,
+            "totalItems": total_items,
+            "totalIsEstimate": count_mode == COUNT_ESTIMATE,
+            "nextCursor": result["next_cursor"],
+            "prevCursor": result["prev_cursor"],
+        }
+
+        return {
+            "data": events,
+            "pagination": pagination,
+            "error": None
+        }
+
+    def _error_response(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "data": None,
+            "pagination": None,
+            "error": {
+                "code": "SERVER_ERROR",
+                "message": f"Internal server error: {str(e)}"
             }
+        }
             
     def get_events_by_type(self, event_type: EventTypeEnum, page: int = 1, page_size: int = 10, sort_by: Optional[str] = None) -> Dict[str, Any]:
         return self.get_events(filters={"event_type": event_type}, page=page, page_size=page_size, sort_by=sort_by)
@@ -60,15 +187,19 @@ class EventService:
 
     def search_events(self, query: str, page: int = 1, page_size: int = 10, sort_by: Optional[str] = None) -> Dict[str, Any]:
         if not query or not query.strip():
-            return {
-                "data": [],
-                "pagination": {
-                    "currentPage": 1, "totalPages": 0, "previousPage": None, "nextPage": None, "totalItems": 0
-                },
-                "error": None
-            }
+            return self._empty_response()
         return self.get_events(filters={"search_query": query.strip()}, page=page, page_size=page_size, sort_by=sort_by)
 
+    def _empty_response(self) -> Dict[str, Any]:
+        return {
+            "data": [],
+            "pagination": {
+                "currentPage": 1, "totalPages": 0, "previousPage": None, "nextPage": None, "totalItems": 0,
+                "totalIsEstimate": False, "nextCursor": None, "prevCursor": None
+            },
+            "error": None
+        }
+
     def _validate_filters(self, filters: Dict[str, Any]) -> Dict[str, Any]:
         validated = {}
         
@@ -90,6 +221,14 @@ class EventService:
                 except ValueError:
                     pass 
                 
+        # Local e categoria são comparados por igualdade; a UF é sempre a sigla em maiúsculas
+        if isinstance(filters.get('location_uf'), str) and filters['location_uf'].strip():
+            validated['location_uf'] = filters['location_uf'].strip().upper()
+        if isinstance(filters.get('location_city'), str) and filters['location_city'].strip():
+            validated['location_city'] = filters['location_city'].strip()
+        if isinstance(filters.get('category'), str) and filters['category'].strip():
+            validated['category'] = filters['category'].strip()
+
         if 'search_query' in filters:
             query = filters['search_query']
             if isinstance(query, str) and query.strip():
@@ -0,0 +1,258 @@
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+from os import getenv
+import codecs
+import csv
+import enum
+import io
+import json
+import uuid
+
+import anyio
+from pydantic import ValidationError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import engine, async_engine
+from Entities.EventSchemas import EXPORT_FIELDS, EVENT_IMPORT_ADAPTER, serialize_event_row
+from Repositories.EventRepository import EventRepository
+from Services.EventCache import invalidate_event_cache, SCOPE_EVENTS
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+MEDIA_TYPES = {FORMAT_NDJSON: "application/x-ndjson", FORMAT_CSV: "text/csv"}
+
+EXPORT_BATCH_SIZE = int(getenv("EVENTS_EXPORT_BATCH_SIZE", "1000"))
+IMPORT_CHUNK_SIZE = int(getenv("EVENTS_IMPORT_CHUNK_SIZE", "1000"))
+# Limite de erros detalhados no relatório da importação; as contagens são sempre completas
+MAX_REPORTED_ERRORS = 100
+
+# Campos que podem vir vazios no CSV (vazio = ausente)
+_OPTIONAL_FIELDS = ("id", "summary", "end_date", "photo_url")
+
+
+def format_for_content_type(content_type: Optional[str]) -> str:
+    return FORMAT_CSV if content_type and content_type.split(";")[0].strip() == MEDIA_TYPES[FORMAT_CSV] else FORMAT_NDJSON
+
+
+# Exportação
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_batch(rows: List[Dict[str, Any]], fmt: str) -> bytes:
+    if fmt == FORMAT_CSV:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_csv_value(row[field]) for field in EXPORT_FIELDS])
+        return buffer.getvalue().encode()
+    return b"".join(serialize_event_row(row) + b"\n" for row in rows)
+
+
+def _csv_header() -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue().encode()
+
+
+def export_events(fmt: str) -> Iterator[bytes]:
+    """
+    Todos os eventos em NDJSON ou CSV, um pedaço por lote do cursor. Abre a
+    própria sessão, que vive enquanto a resposta está sendo enviada.
+    """
+    if fmt == FORMAT_CSV:
+        yield _csv_header()
+    with Session(engine) as session:
+        for batch in EventRepository(session).iter_all_events(EXPORT_BATCH_SIZE):
+            yield encode_batch(batch, fmt)
+
+
+async def export_events_async(fmt: str) -> AsyncIterator[bytes]:
+    """Versão assíncrona de `export_events` (DB_MODE=async)"""
+    from Repositories.AsyncEventRepository import AsyncEventRepository
+
+    if fmt == FORMAT_CSV:
+        yield _csv_header()
+    async with AsyncSession(async_engine) as session:
+        async for batch in AsyncEventRepository(session).iter_all_events(EXPORT_BATCH_SIZE):
+            yield encode_batch(batch, fmt)
+
+
+# Importação
+
+def iter_request_body(stream: AsyncIterator[bytes]) -> Iterator[bytes]:
+    """
+    Consome o corpo da requisição (assíncrono) a partir de uma thread do
+    threadpool, pedaço a pedaço, sem carregá-lo inteiro em memória.
+    """
+    iterator = stream.__aiter__()
+
+    async def next_chunk() -> bytes:
+        return await iterator.__anext__()
+
+    while True:
+        try:
+            yield anyio.from_thread.run(next_chunk)
+        except StopAsyncIteration:
+            return
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Linhas de texto (com o '\\n') de uma sequência de pedaços de bytes em UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_records(chunks: Iterable[bytes], fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """(linha, registro, erro de leitura) de cada registro do NDJSON ou CSV."""
+    lines = iter_lines(chunks)
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(lines)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, None, str(e)
+                continue
+            yield reader.line_num, {
+                key: value for key, value in row.items()
+                if key is not None and not (value == "" and key in _OPTIONAL_FIELDS)
+            }, None
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Cada linha deve ser um objeto JSON"
+            continue
+        yield line_number, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'registro'}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+class EventImporter:
+    """
+    Importação em lote: valida os registros e grava cada bloco de
+    `chunk_size` registros em uma transação (ver EventRepository.bulk_insert_events).
+    Registros inválidos são descartados; se a gravação de um bloco falhar, o
+    bloco inteiro é desfeito e a importação continua no próximo. O relatório
+    lista só os blocos com problemas.
+    """
+
+    def __init__(self, repository: EventRepository, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.repository = repository
+        self.chunk_size = chunk_size
+
+        self.received = 0
+        self.inserted = 0
+        self.rejected = 0
+        self.chunks = 0
+        self.reported_errors = 0
+        self.problems: List[Dict[str, Any]] = []
+
+    def run(self, records: Iterable[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]) -> Dict[str, Any]:
+        rows: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        first_line = last_line = 0
+        for line_number, record, read_error in records:
+            if not rows and not errors:
+                first_line = line_number
+            last_line = line_number
+            self.received += 1
+            row, error = self._validate(record, read_error)
+            if error is not None:
+                errors.append({"line": line_number, "message": error})
+            else:
+                rows.append(row)
+            if len(rows) + len(errors) >= self.chunk_size:
+                self._flush(rows, errors, first_line, last_line)
+                rows, errors = [], []
+        if rows or errors:
+            self._flush(rows, errors, first_line, last_line)
+
+        if self.inserted:
+            # Gravação via COPY/Core: o hook de invalidação do ORM não a enxerga
+            invalidate_event_cache([SCOPE_EVENTS])
+        return self.report()
+
+    def _validate(self, record: Optional[Dict[str, Any]], read_error: Optional[str]):
+        if read_error is not None:
+            return None, read_error
+        try:
+            item = EVENT_IMPORT_ADAPTER.validate_python(record)
+        except ValidationError as e:
+            return None, _validation_message(e)
+        row = {field: item.get(field) for field in EXPORT_FIELDS}
+        row["id"] = row["id"] or uuid.uuid4()
+        return row, None
+
+    def _flush(self, rows: List[Dict[str, Any]], errors: List[Dict[str, Any]], first_line: int, last_line: int) -> None:
+        index = self.chunks
+        self.chunks += 1
+        write_error = None
+        inserted = 0
+        try:
+            inserted = self.repository.bulk_insert_events(rows, index)
+        except Exception as e:
+            write_error = str(e).splitlines()[0] if str(e) else type(e).__name__
+
+        rejected = len(rows) + len(errors) - inserted
+        self.inserted += inserted
+        self.rejected += rejected
+        if not rejected:
+            return
+
+        budget = max(0, MAX_REPORTED_ERRORS - self.reported_errors)
+        self.reported_errors += min(budget, len(errors))
+        self.problems.append({
+            "chunk": index,
+            "firstLine": first_line,
+            "lastLine": last_line,
+            "inserted": inserted,
+            "rejected": rejected,
+            "writeError": write_error,
+            "errors": errors[:budget],
+        })
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "chunks": self.chunks,
+            "chunkSize": self.chunk_size,
+            "problems": self.problems[:MAX_REPORTED_ERRORS],
+            "problemsTruncated": len(self.problems) > MAX_REPORTED_ERRORS,
+        }
+
+
+def import_events(chunks: Iterable[bytes], fmt: str) -> Dict[str, Any]:
+    """Importa eventos de um corpo NDJSON/CSV (executado no threadpool, com uma sessão própria)"""
+    with Session(engine) as session:
+        return EventImporter(EventRepository(session)).run(iter_records(chunks, fmt))
@@ -0,0 +1,108 @@
+from typing import Any, Dict, Optional
+from os import getenv
+import asyncio
+import time
+
+from fastapi.concurrency import run_in_threadpool
+
+from database import engine, replica_engine
+from Repositories.EventIndex import EventIndex
+
+# Listagem respondida por um índice em memória carregado na inicialização (em vez do banco)
+MEMORY_INDEX_ENABLED = getenv("EVENTS_MEMORY_INDEX", "false").lower() in ("1", "true", "yes")
+# Intervalo (segundos) da atualização incremental, pelo updated_at dos eventos
+MEMORY_INDEX_REFRESH_INTERVAL = float(getenv("EVENTS_MEMORY_INDEX_REFRESH_INTERVAL", "5"))
+# Intervalo (segundos) da recarga completa, que também remove eventos excluídos; 0 desativa
+MEMORY_INDEX_FULL_RELOAD_INTERVAL = float(getenv("EVENTS_MEMORY_INDEX_FULL_RELOAD_INTERVAL", "600"))
+# Margem (segundos) relida antes do último updated_at visto, para transações confirmadas fora de ordem
+MEMORY_INDEX_OVERLAP = float(getenv("EVENTS_MEMORY_INDEX_OVERLAP", "30"))
+
+
+class EventIndexRefresher:
+    """
+    Mantém o EventIndex atualizado em segundo plano: carga completa na
+    inicialização, atualização incremental a cada `interval` segundos e
+    recarga completa a cada `full_reload_interval`. Enquanto a primeira carga
+    não der certo, a listagem continua indo ao banco e a carga é tentada de
+    novo no próximo ciclo.
+    """
+
+    def __init__(self, index: EventIndex, interval: float = 5.0, full_reload_interval: float = 600.0):
+        self.index = index
+        self.interval = interval
+        self.full_reload_interval = full_reload_interval
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._last_full_load = 0.0
+
+        self.failures = 0
+
+    async def _load(self) -> int:
+        loaded = await run_in_threadpool(self.index.load)
+        self._last_full_load = time.monotonic()
+        return loaded
+
+    async def refresh(self) -> int:
+        """Um ciclo: recarga completa quando vencida (ou sem carga ainda), senão incremental."""
+        due = self.full_reload_interval > 0 and time.monotonic() - self._last_full_load >= self.full_reload_interval
+        if not self.index.ready or due:
+            return await self._load()
+        return await run_in_threadpool(self.index.refresh)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping.is_set():
+                break
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.failures += 1
+                print(f"❌ Erro ao atualizar o índice de eventos em memória: {e}")
+
+    async def start(self) -> None:
+        """Faz a carga inicial e inicia a atualização periódica"""
+        if self._task is not None:
+            return
+        try:
+            loaded = await self._load()
+            print(f"✅ {loaded} eventos carregados no índice em memória")
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️ Falha ao carregar o índice de eventos em memória: {e}")
+        if self.interval > 0:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "fullReloadInterval": self.full_reload_interval,
+            "failures": self.failures,
+            **self.index.stats(),
+        }
+
+
+# O índice lê da réplica quando houver: a carga completa é uma varredura da tabela
+event_index = EventIndex(replica_engine or engine, overlap=MEMORY_INDEX_OVERLAP) if MEMORY_INDEX_ENABLED else None
+index_refresher = (
+    EventIndexRefresher(event_index, MEMORY_INDEX_REFRESH_INTERVAL, MEMORY_INDEX_FULL_RELOAD_INTERVAL)
+    if event_index is not None else None
+)
+
+def get_event_index() -> Optional[EventIndex]:
+    """O índice em memória, só quando habilitado e já carregado."""
+    return event_index if event_index is not None and event_index.ready else None
+
+def memory_index_ready() -> bool:
+    return get_event_index() is not None
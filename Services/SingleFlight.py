@@ -0,0 +1,154 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from os import getenv
+import asyncio
+import threading
+
+from metrics import span, SINGLE_FLIGHT_REQUESTS
+
+# Quanto tempo (segundos) uma requisição espera pela consulta idêntica já em
+# andamento antes de desistir e consultar o banco por conta própria
+SINGLE_FLIGHT_TIMEOUT = float(getenv("EVENTS_SINGLE_FLIGHT_TIMEOUT", "5"))
+SINGLE_FLIGHT_ENABLED = getenv("EVENTS_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+
+OUTCOME_LEADER = "leader"
+OUTCOME_COALESCED = "coalesced"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+
+
+class _FlightStats:
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self.counts = {OUTCOME_LEADER: 0, OUTCOME_COALESCED: 0, OUTCOME_TIMEOUT: 0, OUTCOME_ERROR: 0}
+
+    def _record(self, outcome: str) -> None:
+        self.counts[outcome] += 1
+        SINGLE_FLIGHT_REQUESTS.inc(self.name, outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        leaders = self.counts[OUTCOME_LEADER]
+        coalesced = self.counts[OUTCOME_COALESCED]
+        return {
+            "timeout": self.timeout,
+            "inFlight": len(self._calls),
+            "leaders": leaders,
+            "coalesced": coalesced,
+            "timeouts": self.counts[OUTCOME_TIMEOUT],
+            "errors": self.counts[OUTCOME_ERROR],
+            "coalescedRatio": coalesced / (leaders + coalesced) if leaders + coalesced else None,
+        }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_FlightStats):
+    """
+    Deduplicação de chamadas idênticas simultâneas entre threads (modo sync):
+    a primeira chamada com uma chave executa `fn`; as que chegam enquanto ela
+    roda esperam até `timeout` segundos e recebem o mesmo resultado (ou a
+    mesma exceção). Esgotado o prazo, a chamada executa `fn` por conta própria.
+    Nada é guardado depois que a chamada termina: isso é papel do cache.
+    """
+
+    def __init__(self, name: str, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        super().__init__(name, timeout)
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Retorna (resultado, compartilhado), com compartilhado=True quando veio de outra chamada."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+                self._record(OUTCOME_LEADER)
+                return call.result, False
+            except BaseException as e:
+                call.error = e
+                self._record(OUTCOME_ERROR)
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        with span("coalesced"):
+            finished = call.done.wait(self.timeout)
+        if not finished:
+            self._record(OUTCOME_TIMEOUT)
+            return fn(), False
+        self._record(OUTCOME_COALESCED)
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+
+class AsyncSingleFlight(_FlightStats):
+    """Mesmo contrato de `SingleFlight` para corrotinas no event loop (DB_MODE=async)."""
+
+    def __init__(self, name: str, timeout: float = SINGLE_FLIGHT_TIMEOUT):
+        super().__init__(name, timeout)
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.get_running_loop().create_future()
+            try:
+                result = await fn()
+                future.set_result(result)
+                self._record(OUTCOME_LEADER)
+                return result, False
+            except asyncio.CancelledError:
+                # Requisição líder cancelada (cliente desconectou): quem esperava consulta por conta própria
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # Marca a exceção como lida, caso ninguém esteja esperando
+                future.exception()
+                self._record(OUTCOME_ERROR)
+                raise
+            finally:
+                del self._calls[key]
+
+        try:
+            with span("coalesced"):
+                result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self._record(OUTCOME_TIMEOUT)
+            return await fn(), False
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            self._record(OUTCOME_TIMEOUT)
+            return await fn(), False
+        except Exception:
+            # Erro da chamada líder, repassado a todas as que esperavam
+            self._record(OUTCOME_COALESCED)
+            raise
+        self._record(OUTCOME_COALESCED)
+        return result, True
+
+
+events_flight = SingleFlight("events") if SINGLE_FLIGHT_ENABLED else None
+async_events_flight = AsyncSingleFlight("events") if SINGLE_FLIGHT_ENABLED else None
+
+def get_events_flight() -> Optional[SingleFlight]:
+    return events_flight
+
+def get_async_events_flight() -> Optional[AsyncSingleFlight]:
+    return async_events_flight
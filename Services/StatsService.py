@@ -0,0 +1,110 @@
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
+import uuid
+from Repositories.RollupRepository import RollupRepository, TOP_BY_SCORE, truncate
+from Entities.Event import GRANULARITY_HOUR, GRANULARITY_DAY
+
+# Janela padrão e máxima (em número de janelas) da série de um evento
+DEFAULT_SERIES_WINDOW = {GRANULARITY_HOUR: timedelta(hours=48), GRANULARITY_DAY: timedelta(days=30)}
+MAX_SERIES_BUCKETS = {GRANULARITY_HOUR: 24 * 31, GRANULARITY_DAY: 366}
+BUCKET_SIZE = {GRANULARITY_HOUR: timedelta(hours=1), GRANULARITY_DAY: timedelta(days=1)}
+
+# Rankings de até 72 horas usam as janelas por hora; acima disso, as diárias
+TOP_HOURLY_MAX_HOURS = 72
+
+class StatsService:
+    """Estatísticas de views e inscrições respondidas a partir dos agregados por hora/dia."""
+
+    def __init__(self, repository: RollupRepository):
+        self.repository = repository
+
+    def get_event_stats(
+        self,
+        event_id: uuid.UUID,
+        granularity: str = GRANULARITY_DAY,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        now: Optional[datetime] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Série de views/inscrições do evento entre `start` (inclusive) e `end`
+        (exclusive), por padrão as últimas 48 horas ou 30 dias, com todas as
+        janelas preenchidas (zeros onde não houve atividade). Os limites se
+        alargam até as janelas que os contêm, então um período menor que uma
+        janela ainda traz a janela inteira. Retorna None se o evento não existir.
+        """
+        if not self.repository.event_exists(event_id):
+            return None
+
+        step = BUCKET_SIZE[granularity]
+        if end is None:
+            # Inclui a janela corrente, ainda em andamento
+            end = truncate(now or datetime.utcnow(), granularity) + step
+        elif truncate(end, granularity) < end:
+            # Fim no meio de uma janela: ela entra inteira, como a do início
+            end = truncate(end, granularity) + step
+        start = truncate(start, granularity) if start is not None else end - DEFAULT_SERIES_WINDOW[granularity]
+        start = max(start, end - step * MAX_SERIES_BUCKETS[granularity])
+
+        stored = {
+            row["bucket_start"]: row for row in self.repository.event_series(event_id, granularity, start, end)
+        }
+        series = []
+        bucket_start = start
+        while bucket_start < end:
+            row = stored.get(bucket_start)
+            series.append({
+                "bucketStart": bucket_start,
+                "views": row["views"] if row else 0,
+                "registrations": row["registrations"] if row else 0,
+            })
+            bucket_start += step
+
+        return {
+            "data": {
+                "eventId": event_id,
+                "granularity": granularity,
+                "start": start,
+                "end": end,
+                "totals": {
+                    "views": sum(bucket["views"] for bucket in series),
+                    "registrations": sum(bucket["registrations"] for bucket in series),
+                },
+                "series": series,
+            },
+            "error": None
+        }
+
+    def get_top_events(
+        self,
+        window_hours: int = 24,
+        metric: str = TOP_BY_SCORE,
+        limit: int = 10,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Eventos em alta: maior atividade nas últimas `window_hours` horas. Janelas
+        longas usam os agregados diários, então começam na virada do dia.
+        """
+        now = now or datetime.utcnow()
+        granularity = GRANULARITY_HOUR if window_hours <= TOP_HOURLY_MAX_HOURS else GRANULARITY_DAY
+        since = truncate(now - timedelta(hours=window_hours), granularity)
+        if granularity == GRANULARITY_HOUR:
+            # A hora corrente conta como uma das janelas
+            since += BUCKET_SIZE[GRANULARITY_HOUR]
+
+        events = self.repository.top_events(granularity, since, metric, limit)
+        return {
+            "data": [
+                {
+                    "eventId": event["event_id"],
+                    "name": event["name"],
+                    "views": event["views"],
+                    "registrations": event["registrations"],
+                    "score": event["score"],
+                }
+                for event in events
+            ],
+            "window": {"hours": window_hours, "since": since, "granularity": granularity, "metric": metric},
+            "error": None
+        }
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime
+from os import getenv
+import asyncio
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session
+
+from database import engine
+from Repositories.EventRepository import EventRepository
+from Services.EventCache import invalidate_event_cache, SCOPE_ACTIVITY
+
+
+def write_views(views: List[Tuple[uuid.UUID, datetime, int]]) -> int:
+    """Grava um lote de visualizações com uma sessão própria (executado no threadpool)"""
+    with Session(engine) as session:
+        written = EventRepository(session).bulk_record_views(views)
+    # Escrita via Core: o hook de invalidação do ORM não a enxerga
+    invalidate_event_cache([SCOPE_ACTIVITY])
+    return written
+
+
+class ViewIngestionBuffer:
+    """
+    Buffer em memória para o registro de visualizações. As visualizações aceitas
+    são gravadas em lote por uma tarefa em segundo plano quando o buffer atinge
+    `flush_size` ou a cada `flush_interval` segundos. Acima de `max_pending`
+    novas visualizações são recusadas (backpressure). No encerramento o buffer
+    é esvaziado.
+
+    Com `pre_aggregate`, as visualizações são agrupadas por evento e minuto:
+    o buffer guarda só uma contagem por chave e cada chave é gravada como uma
+    única linha de EventView com `view_count` = contagem, com o horário truncado
+    para o minuto. Contadores e agregados recebem a mesma contagem, e as
+    reconstruções a partir das tabelas brutas somam `view_count`, então
+    continuam exatas; perde-se só a precisão abaixo do minuto.
+    """
+
+    def __init__(
+        self,
+        writer=write_views,
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        pre_aggregate: bool = False
+    ):
+        self.writer = writer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.pre_aggregate = pre_aggregate
+
+        self._raw: List[Tuple[uuid.UUID, datetime, int]] = []
+        self._aggregated: Counter = Counter()
+        self._pending_views = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._flush_lock = asyncio.Lock()
+
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def _pending_entries(self) -> int:
+        return len(self._aggregated) if self.pre_aggregate else len(self._raw)
+
+    def add(self, event_id: uuid.UUID, view_timestamp: Optional[datetime] = None) -> bool:
+        """Enfileira uma visualização. Retorna False quando o buffer está cheio."""
+        view_timestamp = view_timestamp or datetime.utcnow()
+        if self.pre_aggregate:
+            key = (event_id, view_timestamp.replace(second=0, microsecond=0))
+            if key not in self._aggregated and len(self._aggregated) >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._aggregated[key] += 1
+        else:
+            if len(self._raw) >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._raw.append((event_id, view_timestamp, 1))
+
+        self._pending_views += 1
+        self.accepted += 1
+        if self._pending_views >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    def _take_batch(self) -> List[Tuple[uuid.UUID, datetime, int]]:
+        if self.pre_aggregate:
+            batch = [(event_id, minute, count) for (event_id, minute), count in self._aggregated.items()]
+            self._aggregated = Counter()
+        else:
+            batch, self._raw = self._raw, []
+        self._pending_views = 0
+        return batch
+
+    def _requeue(self, batch: List[Tuple[uuid.UUID, datetime, int]]) -> None:
+        """Devolve um lote que falhou ao buffer, respeitando o limite de memória"""
+        for event_id, view_timestamp, count in batch:
+            if self._pending_entries() >= self.max_pending:
+                self.dropped += count
+                continue
+            if self.pre_aggregate:
+                self._aggregated[(event_id, view_timestamp)] += count
+            else:
+                self._raw.append((event_id, view_timestamp, count))
+            self._pending_views += count
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            batch = self._take_batch()
+            if not batch:
+                return 0
+            try:
+                written = await run_in_threadpool(self.writer, batch)
+            except Exception as e:
+                print(f"❌ Erro ao gravar lote de visualizações: {e}")
+                self.failures += 1
+                self._requeue(batch)
+                return 0
+            self.flushes += 1
+            self.written += written
+            return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Encerra a tarefa periódica (sem interromper um lote em andamento) e grava o que restou"""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._pending_views,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "preAggregate": self.pre_aggregate,
+        }
+
+
+view_buffer = ViewIngestionBuffer(
+    flush_size=int(getenv("VIEW_BUFFER_FLUSH_SIZE", "500")),
+    flush_interval=float(getenv("VIEW_BUFFER_FLUSH_INTERVAL", "1.0")),
+    max_pending=int(getenv("VIEW_BUFFER_MAX_PENDING", "10000")),
+    pre_aggregate=getenv("VIEW_BUFFER_PRE_AGGREGATE", "false").lower() in ("1", "true", "yes"),
+)
@@ -0,0 +1,91 @@
+# benchmarks/bench_serialization.py
+"""
+Custo por linha da serialização da listagem de eventos.
+
+Compara o caminho antigo (entidades Event -> jsonable_encoder -> json.dumps)
+com o atual (tuplas de colunas -> dicionários -> orjson / TypeAdapter).
+
+    python benchmarks/bench_serialization.py --rows 100 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from Entities.Event import Event, EventTypeEnum, PricingTypeEnum
+from Entities.EventSchemas import EVENT_LIST_RESPONSE_ADAPTER, list_fields, orjson
+
+PAGINATION = {
+    "currentPage": 1, "totalPages": 10, "previousPage": None, "nextPage": 2, "totalItems": 100,
+    "totalIsEstimate": False, "nextCursor": None, "prevCursor": None,
+}
+
+
+def make_rows(count: int):
+    start = datetime(2025, 1, 1)
+    return [
+        (
+            uuid.uuid4(), f"Evento {i}", "Resumo do evento", "Descrição longa do evento " * 20,
+            start + timedelta(hours=i), None, "https://example.com/foto.jpg",
+            "São Paulo", "SP", EventTypeEnum.online, PricingTypeEnum.gratis, "tecnologia",
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(rows):
+    fields = list_fields()
+    events = [Event(**dict(zip(fields, row))) for row in rows]
+    content = {"data": events, "pagination": PAGINATION, "error": None}
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def new_path_orjson(rows):
+    fields = list_fields()
+    content = {"data": [dict(zip(fields, row)) for row in rows], "pagination": PAGINATION, "error": None}
+    return orjson.dumps(content)
+
+
+def new_path_type_adapter(rows):
+    fields = list_fields()
+    content = {"data": [dict(zip(fields, row)) for row in rows], "pagination": PAGINATION, "error": None}
+    return EVENT_LIST_RESPONSE_ADAPTER.dump_json(content)
+
+
+def measure(func, rows, repeat: int) -> float:
+    func(rows)  # aquecimento
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(rows)) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Linhas por página")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições por caminho")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    paths = [("entidades + jsonable_encoder (antigo)", old_path), ("tuplas + TypeAdapter", new_path_type_adapter)]
+    if orjson is not None:
+        paths.append(("tuplas + orjson", new_path_orjson))
+
+    baseline = None
+    for name, func in paths:
+        per_row = measure(func, rows, args.repeat)
+        baseline = baseline or per_row
+        print(f"{name:40s} {per_row:8.2f} µs/linha  ({baseline / per_row:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
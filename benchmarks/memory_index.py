@@ -0,0 +1,112 @@
+# benchmarks/memory_index.py
+"""
+Listagem pelo índice em memória (EVENTS_MEMORY_INDEX) contra o caminho SQL.
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db --events 10000
+    python benchmarks/memory_index.py --database-url sqlite:///bench.db --repeat 200
+
+Carrega o EventIndex (tempo e memória da carga completa, via tracemalloc),
+mede uma atualização incremental sem mudanças e então executa cada cenário
+pelo EventService com o EventRepository (SQL) e com o MemoryEventRepository,
+sem cache de respostas nem coalescência, reportando p50/p95 de cada caminho.
+Também confere se as duas respostas trazem os mesmos eventos, o mesmo total
+e as mesmas facetas; na busca por relevância só o total é comparado, porque
+a pontuação em memória não é a do FTS5/ts_rank.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Repositories.EventQueries import COUNT_EXACT, COUNT_NONE
+
+SCENARIOS = [
+    ("data", {}, {"sort_by": "date"}),
+    ("popularidade", {}, {"sort_by": "popularity"}),
+    ("página 50", {}, {"sort_by": "date", "page": 50}),
+    ("tipo + UF", {"event_type": "presencial", "location_uf": "SP"}, {"sort_by": "date"}),
+    ("categoria + intervalo", {"category": "tecnologia", "start_date_interval": "2025-01-01", "end_date_interval": "2025-06-30"}, {}),
+    ("busca (data)", {"search_query": "música"}, {"sort_by": "date"}),
+    ("busca (relevância)", {"search_query": "festival python"}, {"sort_by": "relevance"}),
+    ("sem total", {"pricing_type": "gratis"}, {"count_mode": COUNT_NONE}),
+    ("facetas", {"location_uf": "SP"}, {"include_facets": True}),
+]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def measure(call, repeat: int):
+    call()  # aquecimento
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return response, percentile(timings, 0.5), percentile(timings, 0.95)
+
+
+def same_result(sql, memory, compare_items: bool) -> bool:
+    if sql["pagination"]["totalItems"] != memory["pagination"]["totalItems"]:
+        return False
+    if not compare_items:
+        return True
+    same_items = [event["id"] for event in sql["data"]] == [event["id"] for event in memory["data"]]
+    return same_items and sql.get("facets") == memory.get("facets")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--repeat", type=int, default=200, help="Repetições por cenário e caminho")
+    parser.add_argument("--page-size", type=int, default=20)
+    args = parser.parse_args()
+
+    # A configuração do banco é lida na importação
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DB_MODE"] = "sync"
+
+    from sqlmodel import Session
+    from database import engine
+    from Repositories.EventIndex import EventIndex
+    from Repositories.EventRepository import EventRepository
+    from Repositories.MemoryEventRepository import MemoryEventRepository
+    from Services.EventService import EventService
+
+    index = EventIndex(engine)
+    tracemalloc.start()
+    started = time.perf_counter()
+    loaded = index.load()
+    load_seconds = time.perf_counter() - started
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    started = time.perf_counter()
+    index.refresh()
+    refresh_ms = (time.perf_counter() - started) * 1000
+    print(f"Carga: {loaded} eventos em {load_seconds:.2f} s, {memory_bytes / 1024 / 1024:.1f} MiB; "
+          f"atualização incremental sem mudanças: {refresh_ms:.1f} ms")
+    print()
+
+    memory_service = EventService(MemoryEventRepository(index))
+    print(f"{'cenário':24s} {'SQL p50':>9s} {'SQL p95':>9s} {'mem p50':>9s} {'mem p95':>9s} {'ganho':>7s}  igual")
+    with Session(engine) as session:
+        sql_service = EventService(EventRepository(session))
+        for name, filters, options in SCENARIOS:
+            kwargs = {"page_size": args.page_size, "count_mode": COUNT_EXACT, **options}
+            sql, sql_p50, sql_p95 = measure(lambda: sql_service.get_events(dict(filters), **kwargs), args.repeat)
+            memory, memory_p50, memory_p95 = measure(lambda: memory_service.get_events(dict(filters), **kwargs), args.repeat)
+            same = same_result(sql, memory, compare_items=options.get("sort_by") != "relevance")
+            print(
+                f"{name:24s} {sql_p50:8.2f}ms {sql_p95:8.2f}ms {memory_p50:8.2f}ms {memory_p95:8.2f}ms "
+                f"{sql_p50 / memory_p50:6.1f}x  {'sim' if same else 'NÃO'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
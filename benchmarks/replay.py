@@ -0,0 +1,267 @@
+# benchmarks/replay.py
+"""
+Replay de uma mistura de requisições contra GET /events, com relatório por cenário.
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db --events 10000
+    python benchmarks/replay.py --database-url sqlite:///bench.db --requests 200 --concurrency 8
+
+Os cenários vêm de benchmarks/requests.jsonl (um JSON por linha com `name`,
+`params`, `weight` e, opcionalmente, `follow_cursor`: quantas páginas seguir
+via nextCursor). Cada cenário roda isolado (latência p50/p95/p99, vazão e
+consultas SQL por requisição) e depois a mistura ponderada de todos.
+
+Por padrão a aplicação roda no mesmo processo (httpx + ASGI), o que permite
+contar as consultas de cada requisição. Com --base-url as requisições vão para
+um servidor já em execução e a contagem de consultas não fica disponível.
+
+O cache de respostas e o single-flight ficam desligados, para que cada
+requisição chegue ao banco (requisições iguais e simultâneas de um cenário
+seriam coalescidas); --with-cache e --with-single-flight os mantêm ligados.
+
+--save-baseline grava o relatório; --compare falha (código 1) se o p95 de
+algum cenário piorar mais que --tolerance ou se as consultas por requisição
+aumentarem em relação ao baseline. O baseline versionado em
+benchmarks/baseline.json foi gravado com a base padrão do seed.py e as opções
+padrão daqui; antes de um merge que mexa na listagem:
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db
+    python benchmarks/replay.py --database-url sqlite:///bench.db --compare benchmarks/baseline.json
+
+As latências dependem da máquina: a comparação é justa na mesma máquina em que
+o baseline foi gravado (regrave-o com --save-baseline benchmarks/baseline.json
+ao trocar de máquina ou quando uma mudança piorar a latência de propósito). As
+consultas por requisição não dependem da máquina.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import httpx
+
+_query_counter: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("query_counter", default=None)
+
+
+def load_mix(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def build_client(args) -> httpx.AsyncClient:
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=60)
+
+    # A aplicação lê a configuração na importação
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["DB_MODE"] = args.db_mode
+    if not args.with_cache:
+        os.environ["EVENTS_CACHE_BACKEND"] = "none"
+    os.environ["EVENTS_SINGLE_FLIGHT"] = "true" if args.with_single_flight else "false"
+
+    from sqlalchemy import event as sa_event
+    import database
+    from main import app
+
+    def count_query(*_):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    engines = [database.engine] + ([database.async_engine.sync_engine] if database.async_engine is not None else [])
+    for engine in engines:
+        sa_event.listen(engine, "before_cursor_execute", count_query)
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def timed_get(client: httpx.AsyncClient, params: Dict[str, Any]) -> Dict[str, Any]:
+    counter = [0]
+    token = _query_counter.set(counter)
+    try:
+        started = time.perf_counter()
+        response = await client.get("/events", params=params)
+        elapsed = time.perf_counter() - started
+    finally:
+        _query_counter.reset(token)
+    return {"latency": elapsed, "status": response.status_code, "queries": counter[0], "response": response}
+
+
+async def run_scenario_request(client, scenario: Dict[str, Any], samples: List[Dict[str, Any]]) -> None:
+    params = dict(scenario.get("params", {}))
+    result = await timed_get(client, params)
+    samples.append(result)
+    # Cenários de cursor seguem nextCursor, medindo cada página
+    for _ in range(scenario.get("follow_cursor", 0)):
+        if result["status"] != 200:
+            break
+        next_cursor = result["response"].json()["pagination"].get("nextCursor")
+        if not next_cursor:
+            break
+        result = await timed_get(client, {**params, "cursor": next_cursor})
+        samples.append(result)
+
+
+async def run_phase(client, scenarios: List[Dict[str, Any]], concurrency: int, counts_queries: bool) -> Dict[str, Any]:
+    queue: asyncio.Queue = asyncio.Queue()
+    for scenario in scenarios:
+        queue.put_nowait(scenario)
+    samples: List[Dict[str, Any]] = []
+
+    async def worker():
+        while not queue.empty():
+            scenario = queue.get_nowait()
+            await run_scenario_request(client, scenario, samples)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall_time = time.perf_counter() - started
+    return summarize(samples, wall_time, counts_queries)
+
+
+def summarize(samples: List[Dict[str, Any]], wall_time: float, counts_queries: bool) -> Dict[str, Any]:
+    latencies = [sample["latency"] * 1000 for sample in samples]
+    errors = sum(1 for sample in samples if sample["status"] >= 400)
+    queries = [sample["queries"] for sample in samples]
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "throughput_rps": len(samples) / wall_time if wall_time > 0 else None,
+        "queries_per_request": (sum(queries) / len(queries)) if counts_queries and queries else None,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = f"{'cenário':20s} {'req':>5s} {'err':>4s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'req/s':>8s} {'sql/req':>8s}"
+    print(header)
+    print("-" * len(header))
+
+    def fmt(value, pattern="{:8.2f}"):
+        return pattern.format(value) if value is not None else f"{'-':>8s}"
+
+    for name, row in report["scenarios"].items():
+        print(
+            f"{name:20s} {row['requests']:5d} {row['errors']:4d} {fmt(row['p50_ms'])} {fmt(row['p95_ms'])} "
+            f"{fmt(row['p99_ms'])} {fmt(row['throughput_rps'], '{:8.1f}')} {fmt(row['queries_per_request'])}"
+        )
+
+
+# Opções que mudam os números; rodadas com valores diferentes não são comparáveis
+COMPARABLE_CONFIG = ("db_mode", "with_cache", "with_single_flight", "mix", "only", "requests", "concurrency", "warmup", "seed")
+
+
+def compare(report: Dict[str, Any], baseline_path: str, tolerance: float) -> int:
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    differences = [
+        f"{key}={report['config'].get(key)!r} (baseline {baseline['config'].get(key)!r})"
+        for key in COMPARABLE_CONFIG
+        if report["config"].get(key) != baseline["config"].get(key)
+    ]
+    if differences:
+        print("\n⚠️  Opções diferentes das do baseline: " + ", ".join(differences))
+    regressions = []
+    for name, previous in baseline["scenarios"].items():
+        current = report["scenarios"].get(name)
+        if not current or previous.get("p95_ms") is None or current.get("p95_ms") is None:
+            continue
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f}ms > {limit:.2f}ms (baseline {previous['p95_ms']:.2f}ms)")
+        queries_before, queries_now = previous.get("queries_per_request"), current.get("queries_per_request")
+        if queries_before is not None and queries_now is not None and queries_now > queries_before:
+            regressions.append(f"{name}: {queries_now:.2f} consultas/req (baseline {queries_before:.2f})")
+    if regressions:
+        print("\n❌ Regressões em relação ao baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("\n✅ Sem regressões em relação ao baseline")
+    return 0
+
+
+async def run(args) -> Dict[str, Any]:
+    counts_queries = not args.base_url
+    mix = load_mix(args.mix)
+    if args.only:
+        mix = [scenario for scenario in mix if scenario["name"] in args.only]
+    rng = random.Random(args.seed)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("compare", "save_baseline")}
+    # Caminho relativo ao repositório, para o baseline valer em qualquer checkout
+    config["mix"] = os.path.relpath(os.path.abspath(args.mix), BASE_DIR)
+    report = {"config": config, "scenarios": {}}
+    async with build_client(args) as client:
+        for scenario in mix:
+            for _ in range(args.warmup):
+                await run_scenario_request(client, scenario, [])
+            report["scenarios"][scenario["name"]] = await run_phase(client, [scenario] * args.requests, args.concurrency, counts_queries)
+
+        weighted = rng.choices(mix, weights=[scenario.get("weight", 1) for scenario in mix], k=args.requests * 2)
+        report["scenarios"]["mix"] = await run_phase(client, weighted, args.concurrency, counts_queries)
+
+    if not args.base_url:
+        import database
+
+        # As conexões do aiosqlite mantêm threads vivas até o pool ser fechado
+        if database.async_engine is not None:
+            await database.async_engine.dispose()
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--base-url", help="Servidor já em execução (ex.: http://localhost:8000)")
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--with-cache", action="store_true", help="Mantém o cache de respostas ligado")
+    parser.add_argument(
+        "--with-single-flight", action="store_true", help="Mantém a coalescência de requisições iguais ligada"
+    )
+    parser.add_argument("--mix", default=os.path.join(BASE_DIR, "benchmarks", "requests.jsonl"))
+    parser.add_argument("--only", nargs="*", help="Roda apenas os cenários informados")
+    parser.add_argument("--requests", type=int, default=100, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Grava o relatório em JSON")
+    parser.add_argument("--save-baseline", help="Grava o relatório como baseline")
+    parser.add_argument("--compare", help="Baseline para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Piora aceita no p95 (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, default=str)
+        print(f"\nRelatório gravado em {path}")
+
+    if args.compare:
+        return compare(report, args.compare, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# benchmarks/seed.py
+"""
+Gera uma base sintética de Event/EventView/EventRegistration para benchmarks.
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db --events 10000 --views 1000000
+
+Funciona com SQLite ou com um Postgres local. As tabelas são criadas se não
+existirem (inclusive o índice de busca) e os contadores de popularidade são
+recalculados no final. As linhas são geradas e gravadas em lotes, então a
+memória não cresce com o tamanho da base.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert
+from sqlmodel import Session, SQLModel
+
+from Entities.Event import Event, EventView, EventRegistration, EventTypeEnum, PricingTypeEnum
+from Repositories.PopularityRepository import PopularityRepository
+from Repositories.RollupRepository import RollupRepository
+
+WORDS = [
+    "música", "tecnologia", "python", "dados", "festival", "workshop", "palestra", "arte",
+    "cinema", "teatro", "startup", "carreira", "design", "saúde", "educação", "games",
+    "literatura", "fotografia", "gastronomia", "esporte", "ciência", "inovação", "comunidade", "cultura",
+]
+CATEGORIES = ["tecnologia", "música", "negócios", "arte", "educação", "esporte", "saúde", "gastronomia"]
+CITIES = [
+    ("São Paulo", "SP"), ("Campinas", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"),
+    ("Recife", "PE"), ("Salvador", "BA"), ("Porto Alegre", "RS"), ("Curitiba", "PR"),
+    ("Fortaleza", "CE"), ("Brasília", "DF"),
+]
+START = datetime(2025, 1, 1)
+
+
+def _phrase(rng: random.Random, size: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(size))
+
+
+def event_rows(rng: random.Random, count: int):
+    for i in range(count):
+        city, uf = rng.choice(CITIES)
+        start_date = START + timedelta(minutes=rng.randrange(0, 2 * 365 * 24 * 60))
+        yield {
+            "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+            "name": f"{_phrase(rng, 3).capitalize()} {i}",
+            "summary": _phrase(rng, 8),
+            "description": _phrase(rng, 60),
+            "start_date": start_date,
+            "end_date": start_date + timedelta(hours=rng.randint(1, 8)),
+            "photo_url": f"https://example.com/eventos/{i}.jpg",
+            "location_city": city,
+            "location_uf": uf,
+            "event_type": rng.choice(list(EventTypeEnum)),
+            "pricing_type": rng.choice(list(PricingTypeEnum)),
+            "category": rng.choice(CATEGORIES),
+        }
+
+
+def activity_rows(rng: random.Random, event_ids, count: int, kind: str):
+    # Popularidade concentrada em poucos eventos (cauda longa), como em produção
+    cumulative, total = [], 0.0
+    for rank in range(len(event_ids)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    for _ in range(count):
+        event_id = rng.choices(event_ids, cum_weights=cumulative)[0]
+        timestamp = START + timedelta(seconds=rng.randrange(0, 2 * 365 * 24 * 3600))
+        if kind == "view":
+            yield {"id": uuid.UUID(int=rng.getrandbits(128), version=4), "event_id": event_id, "view_timestamp": timestamp}
+        else:
+            yield {
+                "id": uuid.UUID(int=rng.getrandbits(128), version=4),
+                "event_id": event_id,
+                "registration_timestamp": timestamp,
+                "status": rng.choice(["confirmada", "confirmada", "confirmada", "cancelada"]),
+                "payment_id": None,
+            }
+
+
+def write_batches(engine, table, rows, batch_size: int, label: str) -> int:
+    written = 0
+    started = time.perf_counter()
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            with engine.begin() as connection:
+                connection.execute(insert(table), batch)
+            written += len(batch)
+            batch = []
+            print(f"\r  {label}: {written}", end="", flush=True)
+    if batch:
+        with engine.begin() as connection:
+            connection.execute(insert(table), batch)
+        written += len(batch)
+    print(f"\r  {label}: {written} em {time.perf_counter() - started:.1f}s")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--views", type=int, default=100_000)
+    parser.add_argument("--registrations", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador (bases reprodutíveis)")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(args.seed)
+
+    print(f"Populando {engine.url.render_as_string(hide_password=True)}")
+    event_ids = []
+
+    def tracked_events():
+        for row in event_rows(rng, args.events):
+            event_ids.append(row["id"])
+            yield row
+
+    write_batches(engine, Event.__table__, tracked_events(), args.batch_size, "eventos")
+    write_batches(engine, EventView.__table__, activity_rows(rng, event_ids, args.views, "view"), args.batch_size, "views")
+    write_batches(
+        engine, EventRegistration.__table__,
+        activity_rows(rng, event_ids, args.registrations, "registration"), args.batch_size, "inscrições"
+    )
+
+    with Session(engine) as session:
+        PopularityRepository(session).rebuild()
+        RollupRepository(session).rebuild()
+    print("✅ Base pronta (popularidade e agregados recalculados)")
+
+
+if __name__ == "__main__":
+    main()
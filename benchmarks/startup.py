@@ -0,0 +1,165 @@
+# benchmarks/startup.py
+"""
+Mede a partida a frio: do início do processo à primeira resposta 200 de GET /events.
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db --events 10000
+    python benchmarks/startup.py --database-url sqlite:///bench.db --runs 5
+
+Cada rodada sobe `uvicorn main:app` em um processo novo, consulta GET /events
+até receber 200 e encerra o processo. O relatório traz, por rodada, o tempo até
+o servidor aceitar conexões e até a primeira listagem completa.
+
+Para comparar configurações, repita com variáveis diferentes (--env), por
+exemplo `--env STARTUP_WARM_QUERIES=false` ou `--env DB_POOL_WARMUP=2`.
+--cold-bytecode usa um diretório de bytecode vazio a cada rodada, simulando
+uma imagem sem os .pyc pré-compilados (ver PRECOMPILE_BYTECODE no Dockerfile).
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import httpx
+
+from replay import percentile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_env(args, bytecode_dir: Optional[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = args.database_url
+    env["DB_MODE"] = args.db_mode
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    if bytecode_dir:
+        env["PYTHONPYCACHEPREFIX"] = bytecode_dir
+    return env
+
+
+def measure_once(args, bytecode_dir: Optional[str]) -> Dict[str, Any]:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)]
+
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command, cwd=BASE_DIR, env=build_env(args, bytecode_dir),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    listening = first_events = None
+    status = None
+    try:
+        with httpx.Client(base_url=base_url, timeout=args.timeout) as client:
+            while time.perf_counter() - started < args.timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"uvicorn encerrou com código {process.returncode}")
+                try:
+                    response = client.get("/events", params=args.params)
+                except httpx.TransportError:
+                    time.sleep(args.interval)
+                    continue
+                if listening is None:
+                    listening = time.perf_counter() - started
+                status = response.status_code
+                if status == 200:
+                    first_events = time.perf_counter() - started
+                    break
+                time.sleep(args.interval)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return {
+        "listening_ms": listening * 1000 if listening is not None else None,
+        "first_events_ms": first_events * 1000 if first_events is not None else None,
+        "last_status": status,
+    }
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    for key in ("listening_ms", "first_events_ms"):
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = {
+            "min": min(values) if values else None,
+            "p50": percentile(values, 0.50),
+            "max": max(values) if values else None,
+        }
+    summary["failures"] = sum(1 for run in runs if run["first_events_ms"] is None)
+    return summary
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    def fmt(value):
+        return f"{value:9.1f}" if value is not None else f"{'-':>9s}"
+
+    header = f"{'rodada':>6s} {'aceita (ms)':>12s} {'/events (ms)':>13s}"
+    print(header)
+    print("-" * len(header))
+    for index, run in enumerate(report["runs"], 1):
+        print(f"{index:6d} {fmt(run['listening_ms']):>12s} {fmt(run['first_events_ms']):>13s}")
+
+    summary = report["summary"]
+    print()
+    for label, key in (("aceita conexões", "listening_ms"), ("primeira /events", "first_events_ms")):
+        row = summary[key]
+        print(f"{label:18s} min {fmt(row['min'])}  p50 {fmt(row['p50'])}  max {fmt(row['max'])}")
+    if summary["failures"]:
+        print(f"\n❌ {summary['failures']} rodadas sem resposta 200 de /events")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--env", action="append", default=[], metavar="CHAVE=VALOR", help="Variável extra para o servidor")
+    parser.add_argument("--cold-bytecode", action="store_true", help="Ignora os .pyc já compilados em cada rodada")
+    parser.add_argument("--interval", type=float, default=0.01, help="Intervalo entre tentativas (segundos)")
+    parser.add_argument("--timeout", type=float, default=60, help="Tempo máximo por rodada (segundos)")
+    parser.add_argument("--output", help="Grava o relatório em JSON")
+    args = parser.parse_args()
+    args.params = {"page_size": 10}
+
+    runs = []
+    for _ in range(args.runs):
+        if args.cold_bytecode:
+            with tempfile.TemporaryDirectory() as bytecode_dir:
+                runs.append(measure_once(args, bytecode_dir))
+        else:
+            runs.append(measure_once(args, None))
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "runs": runs,
+        "summary": summarize(runs),
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, default=str)
+        print(f"\nRelatório gravado em {args.output}")
+    return 1 if report["summary"]["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
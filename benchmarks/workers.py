@@ -0,0 +1,147 @@
+# benchmarks/workers.py
+"""
+Compara a vazão e a latência de GET /events com 1 e com N workers na mesma máquina.
+
+    python benchmarks/seed.py --database-url sqlite:///bench.db --events 10000
+    python benchmarks/workers.py --database-url sqlite:///bench.db --workers 1 2 4
+
+Para cada quantidade de workers sobe `serve.py` em um processo novo, espera a
+primeira resposta 200 de /events e roda benchmarks/replay.py contra ele
+(--base-url), com a mesma mistura de cenários e concorrência. O pool de cada
+worker é dimensionado pelo serve.py a partir de DB_MAX_CONNECTIONS. Como no
+replay.py, cache e single-flight ficam desligados salvo --with-cache e
+--with-single-flight.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import httpx
+
+from startup import free_port
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    started = time.perf_counter()
+    with httpx.Client(base_url=base_url, timeout=timeout) as client:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"serve.py encerrou com código {process.returncode}")
+            try:
+                if client.get("/events").status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            time.sleep(0.05)
+    raise RuntimeError(f"Servidor não respondeu em {timeout:.0f}s")
+
+
+def run_replay(args, base_url: str) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "report.json")
+        command = [
+            sys.executable, os.path.join(BASE_DIR, "benchmarks", "replay.py"),
+            "--base-url", base_url,
+            "--requests", str(args.requests),
+            "--concurrency", str(args.concurrency),
+            "--output", output,
+        ]
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        with open(output, encoding="utf-8") as file:
+            return json.load(file)
+
+
+def measure(args, workers: int) -> Dict[str, Any]:
+    port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url,
+        "DB_MODE": args.db_mode,
+        "DB_MAX_CONNECTIONS": str(args.max_connections),
+        "WEB_CONCURRENCY": str(workers),
+        "LOG_LEVEL": "warning",
+    })
+    if not args.with_cache:
+        env["EVENTS_CACHE_BACKEND"] = "none"
+    env["EVENTS_SINGLE_FLIGHT"] = "true" if args.with_single_flight else "false"
+
+    process = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        wait_ready(base_url, process, args.timeout)
+        return run_replay(args, base_url)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(results: Dict[int, Dict[str, Any]]) -> None:
+    header = f"{'workers':>7s} {'cenário':20s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'req/s':>8s} {'err':>4s}"
+    print(header)
+    print("-" * len(header))
+
+    def fmt(value, pattern="{:8.2f}"):
+        return pattern.format(value) if value is not None else f"{'-':>8s}"
+
+    for workers, report in results.items():
+        for name, row in report["scenarios"].items():
+            print(
+                f"{workers:7d} {name:20s} {fmt(row['p50_ms'])} {fmt(row['p95_ms'])} {fmt(row['p99_ms'])} "
+                f"{fmt(row['throughput_rps'], '{:8.1f}')} {row['errors']:4d}"
+            )
+
+    baseline = results[min(results)]["scenarios"]["mix"]["throughput_rps"]
+    if baseline:
+        print()
+        for workers, report in results.items():
+            throughput = report["scenarios"]["mix"]["throughput_rps"]
+            print(f"{workers} workers: {throughput / baseline:.2f}x a vazão da mistura com {min(results)} worker(s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--db-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 2])
+    parser.add_argument("--max-connections", type=int, default=15, help="DB_MAX_CONNECTIONS dividido entre os workers")
+    parser.add_argument("--with-cache", action="store_true", help="Mantém o cache de respostas ligado")
+    parser.add_argument(
+        "--with-single-flight", action="store_true", help="Mantém a coalescência de requisições iguais ligada"
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60, help="Espera máxima pela partida do servidor (segundos)")
+    parser.add_argument("--output", help="Grava os relatórios em JSON")
+    args = parser.parse_args()
+
+    results: Dict[int, Dict[str, Any]] = {}
+    for workers in sorted(set(args.workers)):
+        print(f"▶ {workers} workers...", flush=True)
+        results[workers] = measure(args, workers)
+    print()
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump({str(workers): report for workers, report in results.items()}, file, indent=2, default=str)
+        print(f"\nRelatório gravado em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,60 @@
 # database.py
 
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from dotenv import load_dotenv
 from os import getenv
+import uuid
+
+from metrics import instrument_engine, TimedQueuePool, TimedAsyncAdaptedQueuePool
 
 load_dotenv()
 
+# "sync": Session/psycopg2 executado em threadpool; "async": AsyncSession/asyncpg no event loop
+DB_MODE_SYNC = "sync"
+DB_MODE_ASYNC = "async"
+DB_MODE = getenv("DB_MODE", DB_MODE_SYNC).lower()
+
+if DB_MODE not in (DB_MODE_SYNC, DB_MODE_ASYNC):
+    raise ValueError(f"DB_MODE inválido: '{DB_MODE}' (use 'sync' ou 'async')")
+
+APPLICATION_NAME = "fastapi-darc-app"
+CONNECT_TIMEOUT = int(getenv("DB_CONNECT_TIMEOUT", "30"))
+
+# "queue": pool próprio de conexões (QueuePool); "transaction": para o pooler do
+# Supabase/PgBouncer em modo transaction, sem pool local (NullPool) e sem
+# prepared statements nomeados, que não sobrevivem à troca de conexão no servidor
+DB_POOL_MODE_QUEUE = "queue"
+DB_POOL_MODE_TRANSACTION = "transaction"
+DB_POOL_MODE = getenv("DB_POOL_MODE", DB_POOL_MODE_QUEUE).lower()
+
+if DB_POOL_MODE not in (DB_POOL_MODE_QUEUE, DB_POOL_MODE_TRANSACTION):
+    raise ValueError(f"DB_POOL_MODE inválido: '{DB_POOL_MODE}' (use 'queue' ou 'transaction')")
+
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", "3600"))
+# Conexões abertas na inicialização, para a primeira requisição não pagar o handshake TLS
+DB_POOL_WARMUP = int(getenv("DB_POOL_WARMUP", "0"))
+# Monta e compila as consultas mais comuns da listagem na inicialização (só CPU, sem ir ao banco)
+STARTUP_WARM_QUERIES = getenv("STARTUP_WARM_QUERIES", "true").lower() in ("1", "true", "yes")
+# Intervalo (segundos) da verificação de conexões ociosas em segundo plano; 0 desativa
+DB_POOL_LIVENESS_INTERVAL = float(getenv("DB_POOL_LIVENESS_INTERVAL", "30"))
+# O pre-ping custa uma ida ao banco a cada checkout; por padrão só é usado sem a verificação em segundo plano
+DB_POOL_PRE_PING = getenv(
+    "DB_POOL_PRE_PING", "false" if DB_POOL_LIVENESS_INTERVAL > 0 else "true"
+).lower() in ("1", "true", "yes")
+
 def get_database_url():
-    """Constrói a URL do banco usando apenas a conexão pooler"""
+    """Constrói a URL do banco usando apenas a conexão pooler (ou DATABASE_URL, se definida)"""
+    database_url = getenv("DATABASE_URL")
+    if database_url:
+        return database_url
+
     user = getenv("USER")
     password = getenv("PASSWORD")
     host = getenv("HOST")
@@ -19,31 +66,126 @@ def get_database_url():
     
     return f"postgresql://{user}:{password}@{host}:{port}/{dbname}?sslmode=require"
 
+def get_replica_database_url():
+    """URL da réplica de leitura (REPLICA_DATABASE_URL), ou None para ler só do primário"""
+    return getenv("REPLICA_DATABASE_URL") or None
+
+def get_async_database_url(url: str):
+    """Converte a URL síncrona para o driver assíncrono equivalente (asyncpg/aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        # asyncpg não aceita sslmode na URL; o SSL vai em connect_args
+        parsed = parsed.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+        if DB_POOL_MODE == DB_POOL_MODE_TRANSACTION:
+            # Desliga o cache de prepared statements do dialeto asyncpg do SQLAlchemy
+            parsed = parsed.update_query_dict({"prepared_statement_cache_size": "0"})
+        return parsed
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    return parsed
+
+def _engine_options(url, is_async: bool) -> dict:
+    """Opções do engine conforme o banco: pool e SSL só fazem sentido no Postgres"""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {"connect_args": {"check_same_thread": False}} if not is_async else {}
+
+    if is_async:
+        connect_args = {
+            "ssl": "require",
+            "timeout": CONNECT_TIMEOUT,
+            "server_settings": {"application_name": APPLICATION_NAME}
+        }
+    else:
+        connect_args = {
+            "sslmode": "require",
+            "connect_timeout": CONNECT_TIMEOUT,
+            "application_name": APPLICATION_NAME
+        }
+
+    if DB_POOL_MODE == DB_POOL_MODE_TRANSACTION:
+        if is_async:
+            # Sem cache de statements no asyncpg e com nomes únicos, para não colidir entre clientes do pooler
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        # O pooler já reaproveita as conexões com o Postgres; um pool local só seguraria conexões do pooler
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,  # Mede a espera no checkout
+        "pool_pre_ping": DB_POOL_PRE_PING,  # Verifica conexões antes de usar (ver DB_POOL_LIVENESS_INTERVAL)
+        "pool_recycle": DB_POOL_RECYCLE,    # Recicla conexões antigas
+        "pool_size": DB_POOL_SIZE,          # Tamanho do pool de conexões
+        "max_overflow": DB_MAX_OVERFLOW,    # Máximo de conexões extras
+        "pool_timeout": DB_POOL_TIMEOUT,    # Espera máxima por uma conexão livre
+        "connect_args": connect_args,
+    }
+
 DATABASE_URL = get_database_url()
 
 # Configurações do engine otimizadas para Supabase Pooler
 engine = create_engine(
     DATABASE_URL,
     echo=False,  # Mude para True para debug
-    pool_pre_ping=True,  # Verifica conexões antes de usar
-    pool_recycle=3600,   # Recicla conexões a cada hora
-    pool_size=5,         # Tamanho do pool de conexões
-    max_overflow=10,     # Máximo de conexões extras
-    connect_args={
-        "sslmode": "require",
-        "connect_timeout": 30,
-        "application_name": "fastapi-darc-app"
-    }
+    **_engine_options(DATABASE_URL, is_async=False)
 )
+instrument_engine(engine, "sync")
+
+# O engine assíncrono só é criado no modo async (exige asyncpg/aiosqlite instalados)
+async_engine = None
+if DB_MODE == DB_MODE_ASYNC:
+    ASYNC_DATABASE_URL = get_async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        echo=False,
+        **_engine_options(ASYNC_DATABASE_URL, is_async=True)
+    )
+    instrument_engine(async_engine.sync_engine, "async")
+
+# Réplica de leitura opcional, usada pela listagem e pelas estatísticas (ver db_routing);
+# sem ela, ou enquanto estiver fora do ar, as leituras vão para o primário
+REPLICA_DATABASE_URL = get_replica_database_url()
+replica_engine = None
+async_replica_engine = None
+if REPLICA_DATABASE_URL:
+    replica_engine = create_engine(
+        REPLICA_DATABASE_URL,
+        echo=False,
+        **_engine_options(REPLICA_DATABASE_URL, is_async=False)
+    )
+    instrument_engine(replica_engine, "replica")
+    if DB_MODE == DB_MODE_ASYNC:
+        ASYNC_REPLICA_DATABASE_URL = get_async_database_url(REPLICA_DATABASE_URL)
+        async_replica_engine = create_async_engine(
+            ASYNC_REPLICA_DATABASE_URL,
+            echo=False,
+            **_engine_options(ASYNC_REPLICA_DATABASE_URL, is_async=True)
+        )
+        instrument_engine(async_replica_engine.sync_engine, "async_replica")
+
+def is_async_mode() -> bool:
+    return DB_MODE == DB_MODE_ASYNC
 
 def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+# Dependência usada pelas rotas, conforme DB_MODE
+session_dependency = get_async_session if is_async_mode() else get_session
+
+# O esquema é gerenciado por migrações (python manage.py migrate). Criar as tabelas
+# na inicialização só faz sentido em bancos locais/descartáveis.
+AUTO_CREATE_TABLES = getenv("AUTO_CREATE_TABLES", "false").lower() in ("1", "true", "yes")
+
 def create_db_and_tables():
     try:
         SQLModel.metadata.create_all(engine)
         print("Tabelas criadas com sucesso!")
     except Exception as e:
         print(f"Erro ao criar tabelas: {e}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,196 @@
+# db_pool.py
+
+from typing import Any, Dict, List, Optional, Sequence
+import asyncio
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import NullPool, QueuePool
+
+from database import (
+    engine, async_engine, replica_engine, async_replica_engine, is_async_mode,
+    DB_POOL_WARMUP, DB_POOL_LIVENESS_INTERVAL, STARTUP_WARM_QUERIES
+)
+from Repositories import EventQueries
+
+PING = text("SELECT 1")
+
+
+def warm_up(sync_engine: Engine, connections: int) -> int:
+    """
+    Abre `connections` conexões ao mesmo tempo e as devolve ao pool, já com o
+    handshake TLS feito. Retorna quantas conexões foram abertas.
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = sync_engine.connect()
+            opened.append(connection)
+            connection.execute(PING)
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+async def warm_up_async(engine_: AsyncEngine, connections: int) -> int:
+    """Versão assíncrona de warm_up, para o AsyncEngine"""
+    opened = []
+    try:
+        for _ in range(connections):
+            connection = await engine_.connect()
+            opened.append(connection)
+            await connection.execute(PING)
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+def _idle_connections(sync_engine: Engine) -> int:
+    pool = sync_engine.pool
+    return pool.checkedin() if isinstance(pool, QueuePool) else 0
+
+
+class PoolLivenessChecker:
+    """
+    Substitui o pre-ping (uma ida ao banco a cada checkout) por uma verificação
+    periódica em segundo plano: a cada `interval` segundos cada conexão ociosa
+    dos pools (primário e réplica) executa um SELECT 1. Conexões que falham são
+    invalidadas pelo próprio SQLAlchemy (erro de desconexão) e o pool abre
+    outra no lugar.
+
+    Sem pool local (DB_POOL_MODE=transaction) não há conexões ociosas e a
+    verificação não faz nada.
+    """
+
+    def __init__(
+        self,
+        sync_engines: Sequence[Optional[Engine]],
+        async_engines: Sequence[Optional[AsyncEngine]] = (),
+        interval: float = 30.0
+    ):
+        # Engines não configurados (None) são ignorados
+        self.sync_engines = [engine_ for engine_ in sync_engines if engine_ is not None]
+        self.async_engines = [engine_ for engine_ in async_engines if engine_ is not None]
+        self.interval = interval
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+        self.runs = 0
+        self.checked = 0
+        self.failures = 0
+        self.last_run_seconds: Optional[float] = None
+
+    def _ping_sync(self) -> List[bool]:
+        # O QueuePool é FIFO: retirar e devolver uma conexão por vez percorre todas as ociosas
+        results = []
+        for sync_engine in self.sync_engines:
+            for _ in range(_idle_connections(sync_engine)):
+                try:
+                    with sync_engine.connect() as connection:
+                        connection.execute(PING)
+                    results.append(True)
+                except Exception:
+                    results.append(False)
+        return results
+
+    async def _ping_async(self) -> List[bool]:
+        results = []
+        for async_engine_ in self.async_engines:
+            for _ in range(_idle_connections(async_engine_.sync_engine)):
+                try:
+                    async with async_engine_.connect() as connection:
+                        await connection.execute(PING)
+                    results.append(True)
+                except Exception:
+                    results.append(False)
+        return results
+
+    async def check(self) -> int:
+        """Verifica as conexões ociosas uma vez. Retorna quantas falharam."""
+        started = time.perf_counter()
+        results = await run_in_threadpool(self._ping_sync)
+        results += await self._ping_async()
+
+        failed = results.count(False)
+        self.runs += 1
+        self.checked += len(results)
+        self.failures += failed
+        self.last_run_seconds = time.perf_counter() - started
+        if failed:
+            print(f"⚠️ {failed} conexões do pool descartadas na verificação de saúde")
+        return failed
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping.is_set():
+                break
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"❌ Erro na verificação de saúde do pool: {e}")
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "engines": len(self.sync_engines) + len(self.async_engines),
+            "runs": self.runs,
+            "checked": self.checked,
+            "failures": self.failures,
+            "lastRunSeconds": self.last_run_seconds,
+        }
+
+
+async def warm_up_pools(connections: int = DB_POOL_WARMUP) -> int:
+    """Pré-abre as conexões do engine usado pelas rotas (conforme DB_MODE)"""
+    target = async_engine.sync_engine if is_async_mode() else engine
+    if connections <= 0 or isinstance(target.pool, NullPool):
+        return 0
+    if is_async_mode():
+        return await warm_up_async(async_engine, connections)
+    return await run_in_threadpool(warm_up, engine, connections)
+
+
+def compile_startup_queries(dialect: Dialect) -> int:
+    """
+    Monta os formatos comuns da listagem (que ficam no statement_cache) e
+    compila a SQL de cada um para o dialeto, sem ir ao banco. Retorna quantos
+    formatos foram compilados.
+    """
+    queries = EventQueries.startup_queries(dialect.name)
+    for query, _ in queries:
+        query.compile(dialect=dialect)
+    return len(queries)
+
+
+def warm_up_statements() -> int:
+    """Prepara as consultas da listagem para o engine usado pelas rotas (STARTUP_WARM_QUERIES)"""
+    if not STARTUP_WARM_QUERIES:
+        return 0
+    target = async_engine if is_async_mode() else engine
+    return compile_startup_queries(target.dialect)
+
+
+liveness_checker = PoolLivenessChecker(
+    [engine, replica_engine], [async_engine, async_replica_engine], interval=DB_POOL_LIVENESS_INTERVAL
+)
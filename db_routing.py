@@ -0,0 +1,262 @@
+# db_routing.py
+
+from typing import Any, Callable, Dict, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+import math
+import threading
+import time
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event as sa_event, exc as sa_exc
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import (
+    engine, async_engine, replica_engine, async_replica_engine, is_async_mode, CONNECT_TIMEOUT
+)
+from metrics import checkout_timeout, TimedQueuePool, TimedAsyncAdaptedQueuePool
+
+# SQLSTATE do Postgres para consulta cancelada (inclui o statement_timeout)
+QUERY_CANCELED = "57014"
+
+# Depois de uma falha de conexão, por quantos segundos a réplica deixa de receber leituras
+REPLICA_RETRY_INTERVAL = float(getenv("REPLICA_RETRY_INTERVAL", "30"))
+
+
+class QueryBudget:
+    """
+    Orçamento de latência de um endpoint: `statement_timeout` de cada consulta
+    (ms, 0 = sem limite; só no Postgres), espera máxima por uma conexão do
+    pool (s) e timeout para abrir uma conexão nova (s).
+    """
+
+    __slots__ = ("name", "statement_timeout_ms", "checkout_timeout", "connect_timeout")
+
+    def __init__(self, name: str, statement_timeout_ms: int, checkout_timeout: float, connect_timeout: int):
+        self.name = name
+        self.statement_timeout_ms = statement_timeout_ms
+        self.checkout_timeout = checkout_timeout
+        self.connect_timeout = connect_timeout
+
+    @classmethod
+    def from_env(cls, name: str, statement_timeout_ms: int, checkout_timeout: float, connect_timeout: int):
+        """Valores padrão sobrescritos por <NOME>_STATEMENT_TIMEOUT_MS, _CHECKOUT_TIMEOUT e _CONNECT_TIMEOUT."""
+        prefix = name.upper()
+        return cls(
+            name,
+            int(getenv(f"{prefix}_STATEMENT_TIMEOUT_MS", str(statement_timeout_ms))),
+            float(getenv(f"{prefix}_CHECKOUT_TIMEOUT", str(checkout_timeout))),
+            int(getenv(f"{prefix}_CONNECT_TIMEOUT", str(connect_timeout))),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "statementTimeoutMs": self.statement_timeout_ms,
+            "checkoutTimeout": self.checkout_timeout,
+            "connectTimeout": self.connect_timeout,
+        }
+
+
+BUDGET_EVENTS = "events"
+BUDGET_STATS = "stats"
+
+QUERY_BUDGETS = {
+    # A listagem é a rota mais quente: melhor recusar rápido do que enfileirar
+    BUDGET_EVENTS: QueryBudget.from_env(BUDGET_EVENTS, 3000, 0.5, min(5, CONNECT_TIMEOUT)),
+    BUDGET_STATS: QueryBudget.from_env(BUDGET_STATS, 5000, 1.0, min(5, CONNECT_TIMEOUT)),
+}
+
+_current_budget: ContextVar[Optional[QueryBudget]] = ContextVar("query_budget", default=None)
+
+
+class DatabaseOverloaded(Exception):
+    """
+    O banco não atenderia dentro do orçamento do endpoint: pool saturado, espera
+    esgotada no checkout ou consulta cancelada pelo statement_timeout (vira 503
+    com Retry-After).
+    """
+
+    def __init__(self, budget: Optional[QueryBudget], retry_after: int, reason: str = "pool saturado"):
+        super().__init__(f"Banco sobrecarregado ({reason}) para '{budget.name if budget else 'sem orçamento'}'")
+        self.budget = budget
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def database_overloaded(error: BaseException) -> Optional[DatabaseOverloaded]:
+    """
+    DatabaseOverloaded equivalente a `error` quando a consulta falhou por falta
+    de tempo (espera esgotada no checkout do pool ou statement_timeout), para
+    responder 503 em vez de 500. Outros erros retornam None.
+    """
+    budget = _current_budget.get()
+    if isinstance(error, sa_exc.TimeoutError):
+        reason, wait = "checkout", budget.checkout_timeout if budget else 1
+    elif isinstance(error, sa_exc.DBAPIError) and getattr(error.orig, "pgcode", None) == QUERY_CANCELED:
+        reason, wait = "statement_timeout", budget.statement_timeout_ms / 1000 if budget else 1
+    else:
+        return None
+    read_router.count_timeout(budget, reason)
+    return DatabaseOverloaded(budget, retry_after=max(1, math.ceil(wait)), reason=reason)
+
+
+class ReadRouter:
+    """
+    Escolhe o engine das leituras: a réplica, quando configurada e disponível,
+    ou o primário. Uma falha de conexão com a réplica a tira de rotação por
+    REPLICA_RETRY_INTERVAL segundos; a próxima leitura depois disso tenta de novo.
+    Também recusa leituras quando o pool escolhido está saturado e a espera
+    recente no checkout já passa do orçamento do endpoint.
+    """
+
+    def __init__(self, primary, replica=None, retry_interval: float = REPLICA_RETRY_INTERVAL):
+        self.primary = primary
+        self.replica = replica
+        self.retry_interval = retry_interval
+
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.replica_failures = 0
+        self.shed: Dict[str, int] = {}
+        self.timeouts: Dict[str, int] = {}
+
+        if replica is not None:
+            sa_event.listen(_sync_engine(replica), "handle_error", self._on_replica_error)
+
+    def _on_replica_error(self, context) -> None:
+        # Conexão recusada/derrubada (não erros da consulta em si)
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self) -> None:
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_interval
+            self.replica_failures += 1
+
+    def replica_available(self) -> bool:
+        return self.replica is not None and time.monotonic() >= self._down_until
+
+    def engine_for_read(self, budget: QueryBudget):
+        """Engine da leitura com o orçamento `budget`. Lança DatabaseOverloaded se for preciso recusar."""
+        use_replica = self.replica_available()
+        target = self.replica if use_replica else self.primary
+        self._check_saturation(target, budget)
+        if use_replica:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        return target
+
+    def _check_saturation(self, target, budget: QueryBudget) -> None:
+        pool = _sync_engine(target).pool
+        if not isinstance(pool, (TimedQueuePool, TimedAsyncAdaptedQueuePool)):
+            # Sem pool local (DB_POOL_MODE=transaction) não há fila de checkout aqui
+            return
+        capacity = pool.capacity()
+        if capacity is None or pool.checkedout() < capacity:
+            return
+        if pool.recent_wait >= budget.checkout_timeout:
+            with self._lock:
+                self.shed[budget.name] = self.shed.get(budget.name, 0) + 1
+            raise DatabaseOverloaded(budget, retry_after=max(1, math.ceil(pool.recent_wait)))
+
+    def count_timeout(self, budget: Optional[QueryBudget], reason: str) -> None:
+        key = f"{budget.name if budget else 'none'}:{reason}"
+        with self._lock:
+            self.timeouts[key] = self.timeouts.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicaConfigured": self.replica is not None,
+            "replicaAvailable": self.replica_available(),
+            "replicaReads": self.replica_reads,
+            "primaryReads": self.primary_reads,
+            "replicaFailures": self.replica_failures,
+            "shed": dict(self.shed),
+            "timeouts": dict(self.timeouts),
+            "budgets": {name: budget.stats() for name, budget in QUERY_BUDGETS.items()},
+        }
+
+
+def _sync_engine(engine_):
+    return getattr(engine_, "sync_engine", engine_)
+
+
+if is_async_mode():
+    read_router = ReadRouter(async_engine, async_replica_engine)
+else:
+    read_router = ReadRouter(engine, replica_engine)
+
+
+@contextmanager
+def query_budget(budget_name: str):
+    """Aplica o orçamento `budget_name` às sessões e conexões abertas dentro do bloco."""
+    budget = QUERY_BUDGETS[budget_name]
+    budget_token = _current_budget.set(budget)
+    checkout_token = checkout_timeout.set(budget.checkout_timeout)
+    try:
+        yield budget
+    finally:
+        checkout_timeout.reset(checkout_token)
+        _current_budget.reset(budget_token)
+
+
+def read_session_dependency(budget_name: str, bypass: Optional[Callable[[], bool]] = None):
+    """
+    Dependência de sessão somente leitura para as rotas de consulta: usa a
+    réplica (ou o primário), aplica o orçamento `budget_name` às consultas e
+    conexões da requisição e recusa com DatabaseOverloaded quando o pool está
+    saturado. A dependência é assíncrona nos dois modos para que o orçamento
+    (uma ContextVar) chegue também ao threadpool do modo sync.
+
+    Quando `bypass()` é verdadeiro a rota não vai ao banco (ex.: índice em
+    memória) e recebe None, sem passar pela verificação de saturação.
+    """
+    budget = QUERY_BUDGETS[budget_name]
+
+    async def get_read_session():
+        if bypass is not None and bypass():
+            yield None
+            return
+        bind = read_router.engine_for_read(budget)
+        _current_budget.set(budget)
+        checkout_timeout.set(budget.checkout_timeout)
+        if is_async_mode():
+            async with AsyncSession(bind, expire_on_commit=False) as session:
+                yield session
+            return
+        # Criar a sessão não faz I/O; fechá-la devolve a conexão ao pool (ROLLBACK), então vai para o threadpool
+        session = Session(bind)
+        try:
+            yield session
+        finally:
+            await run_in_threadpool(session.close)
+
+    return get_read_session
+
+
+# statement_timeout por transação: SET LOCAL vale só até o fim da transação,
+# então também funciona com o pooler em modo transaction
+@sa_event.listens_for(OrmSession, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    budget = _current_budget.get()
+    if budget is None or budget.statement_timeout_ms <= 0 or connection.dialect.name != "postgresql":
+        return
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(budget.statement_timeout_ms)}")
+
+
+def _apply_connect_timeout(dialect, connection_record, cargs, cparams):
+    budget = _current_budget.get()
+    if budget is None or dialect.name != "postgresql":
+        return
+    cparams["timeout" if dialect.driver == "asyncpg" else "connect_timeout"] = budget.connect_timeout
+
+
+for _engine in (engine, async_engine, replica_engine, async_replica_engine):
+    if _engine is not None:
+        sa_event.listen(_sync_engine(_engine), "do_connect", _apply_connect_timeout)
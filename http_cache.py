@@ -0,0 +1,52 @@
+# http_cache.py
+
+from typing import Any
+from os import getenv
+import hashlib
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Cache HTTP da listagem (navegadores e edge do fly). max-age=0 desativa o cache
+# compartilhado, mantendo apenas a revalidação por ETag.
+EVENTS_MAX_AGE = int(getenv("EVENTS_HTTP_MAX_AGE", "10"))
+EVENTS_STALE_WHILE_REVALIDATE = int(getenv("EVENTS_HTTP_STALE_WHILE_REVALIDATE", "30"))
+
+# Respostas de erro nunca devem ser reaproveitadas por caches intermediários
+NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+def events_cache_control() -> str:
+    if EVENTS_MAX_AGE <= 0:
+        return "no-cache"
+    return f"public, max-age={EVENTS_MAX_AGE}, stale-while-revalidate={EVENTS_STALE_WHILE_REVALIDATE}"
+
+def make_etag(body: bytes) -> str:
+    """ETag forte: hash do corpo serializado"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110), aceitando lista e '*'"""
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in [candidate.removeprefix("W/") for candidate in candidates]
+
+def cached_json_response(request: Request, content: Any, cache_control: str) -> Response:
+    """
+    Serializa o conteúdo, calcula o ETag e responde 304 quando o cliente já tem
+    a mesma versão (If-None-Match).
+    """
+    body = JSONResponse(content=jsonable_encoder(content)).body
+    return cached_body_response(request, body, cache_control)
+
+def cached_body_response(
+    request: Request, body: bytes, cache_control: str, media_type: str = "application/json"
+) -> Response:
+    """Como `cached_json_response`, para um corpo já serializado"""
+    etag = make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,15 +1,38 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 from typing import List, Optional, Dict, Any
-from datetime import date
-import uvicorn
-from fastapi.responses import JSONResponse
+from datetime import date, datetime
+from os import getenv
+import secrets
+import time
+import uuid
+from functools import partial
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import request_validation_exception_handler
+from sqlalchemy.exc import SQLAlchemyError
 
 
 from Entities.Event import Event, EventTypeEnum, PricingTypeEnum, EventView, EventRegistration # Import new models
-from database import get_session, create_db_and_tables
+from database import is_async_mode, create_db_and_tables, AUTO_CREATE_TABLES
 from Controllers.EventController import EventController
+from Services.EventCache import get_event_cache
+from Services.SingleFlight import get_events_flight, get_async_events_flight
+from Services.ViewBuffer import view_buffer
+from Services.MemoryIndex import index_refresher, memory_index_ready
+from db_pool import liveness_checker, warm_up_pools, warm_up_statements
+from db_routing import (
+    read_session_dependency, read_router, DatabaseOverloaded, database_overloaded, BUDGET_EVENTS, BUDGET_STATS
+)
+from http_cache import cached_body_response, cached_json_response, events_cache_control, NO_STORE_HEADERS
+from Entities.EventSchemas import EventListResponse, serialize_event_list
+from Repositories import EventQueries
+from metrics import (
+    begin_request, span, render_metrics, SERVER_TIMING_ENABLED, HTTP_REQUEST_DURATION, DB_QUERIES_PER_REQUEST
+)
 
 # Configuração da aplicação
 app = FastAPI(
@@ -25,15 +48,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    """Mede cada requisição (duração, consultas SQL) e responde com Server-Timing"""
+    metrics = begin_request()
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - metrics.started, request.method, route_path, str(status_code)
+        )
+        DB_QUERIES_PER_REQUEST.observe(metrics.queries, route_path)
+
+    if SERVER_TIMING_ENABLED:
+        response.headers["Server-Timing"] = metrics.server_timing()
+    return response
+
 # Eventos de inicialização
 @app.on_event("startup")
 async def startup_event():
-    """Cria as tabelas do banco de dados na inicialização"""
-    create_db_and_tables()
+    """
+    Inicia o buffer de visualizações e a verificação de saúde do pool, pré-abre
+    as conexões (DB_POOL_WARMUP), compila as consultas da listagem sem
+    executá-las (STARTUP_WARM_QUERIES), carrega o índice em memória (EVENTS_MEMORY_INDEX)
+    e cria as tabelas, só com AUTO_CREATE_TABLES
+    """
+    if AUTO_CREATE_TABLES:
+        create_db_and_tables()
+    warm_up_statements()
+    try:
+        warmed = await warm_up_pools()
+        if warmed:
+            print(f"✅ {warmed} conexões pré-abertas no pool")
+    except Exception as e:
+        # Sem banco na inicialização a aplicação sobe mesmo assim; as conexões abrem sob demanda
+        print(f"⚠️ Falha ao aquecer o banco: {e}")
+    if index_refresher is not None:
+        await index_refresher.start()
+    view_buffer.start()
+    liveness_checker.start()
     print("✅ Aplicação iniciada com sucesso!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Grava as visualizações ainda pendentes no buffer antes de encerrar"""
+    await liveness_checker.stop()
+    if index_refresher is not None:
+        await index_refresher.stop()
+    await view_buffer.stop()
+
 # Rotas da API
 @app.get("/", tags=["Health"])
 async def root():
@@ -43,9 +113,41 @@ async def root():
         "version": "v1.0",
     }
 
+@app.get("/cache/stats", tags=["Health"])
+async def cache_stats():
+    """Contadores do cache da listagem de eventos (hits, misses, descartes), das requisições coalescidas e do índice em memória"""
+    cache = get_event_cache()
+    flight = get_async_events_flight() if is_async_mode() else get_events_flight()
+    return {
+        "enabled": cache is not None,
+        **(cache.stats() if cache else {}),
+        "singleFlight": flight.stats() if flight is not None else None,
+        "memoryIndex": index_refresher.stats() if index_refresher is not None else None,
+    }
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Métricas no formato do Prometheus: latência por rota e etapa, consultas e pool de conexões"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/views/stats", tags=["Health"])
+async def views_stats():
+    """Contadores do buffer de visualizações (pendentes, gravadas, recusadas)"""
+    return view_buffer.stats()
+
+@app.get("/db/stats", tags=["Health"])
+async def db_stats():
+    """Verificação de saúde do pool, roteamento das leituras e reaproveitamento das consultas montadas da listagem"""
+    return {
+        "liveness": liveness_checker.stats(),
+        "routing": read_router.stats(),
+        "statements": EventQueries.statement_cache.stats(),
+    }
+
 # Endpoints de eventos
-@app.get("/events", tags=["Events"])
+@app.get("/events", tags=["Events"], response_model=EventListResponse)
 async def get_events_list(
+    request: Request,
     search: Optional[str] = Query(
         None, description="String usada para fazer uma busca na lista de eventos por nome, sumário ou descrição."
     ),
@@ -70,23 +172,220 @@ async def get_events_list(
     sort: Optional[str] = Query(
         None, description="String usada para ordenar a lista de eventos, podendo ter os valores: relevance, date, popularity."
     ),
-    session: Session = Depends(get_session)
-) -> Dict[str, Any]:
+    count_mode: Optional[str] = Query(
+        None, description="Como calcular o total de itens: exact (mesma consulta da página), estimate (estimativa do banco) ou none (sem total). Padrão: exact, ou none quando há cursor."
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco retornado em pagination.nextCursor/prevCursor, para paginação em tempo constante. Quando informado, 'page' é ignorado."
+    ),
+    include_description: bool = Query(
+        True, description="Inclui a descrição completa de cada evento; use false para listagens mais leves."
+    ),
+    filter_uf: Optional[str] = Query(
+        None, description="Sigla da UF usada para filtrar a lista de eventos (igualdade exata, ex.: SP)."
+    ),
+    filter_city: Optional[str] = Query(
+        None, description="Cidade usada para filtrar a lista de eventos (igualdade exata)."
+    ),
+    filter_category: Optional[str] = Query(
+        None, description="Categoria usada para filtrar a lista de eventos (igualdade exata)."
+    ),
+    facets: bool = Query(
+        False, description="Inclui em 'facets' as contagens por tipo, precificação, UF e categoria sob os filtros atuais."
+    ),
+    session: Optional[Session] = Depends(read_session_dependency(BUDGET_EVENTS, bypass=memory_index_ready))
+) -> Response:
     """
     Retorna a lista de eventos com opções de busca, filtros, ordenação e paginação.
+    Responde com ETag e Cache-Control; envie If-None-Match para receber 304.
     """
     controller = EventController(session)
-    response = controller.list_events(
-        search=search,
-        page=page,
-        page_size=page_size,
-        filter_type=filter_type,
-        filter_pricing=filter_pricing,
-        filter_interval_start=filter_interval_start,
-        filter_interval_end=filter_interval_end,
-        sort=sort
+    # No modo sync as consultas bloqueiam, então rodam no threadpool e não no event loop;
+    # o índice em memória também vai para o threadpool, já que filtra e ordena na CPU
+    if is_async_mode() and not controller.in_memory:
+        list_events = controller.list_events_async
+    else:
+        list_events = partial(run_in_threadpool, controller.list_events)
+    with span("controller"):
+        response = await list_events(
+            search=search,
+            page=page,
+            page_size=page_size,
+            filter_type=filter_type,
+            filter_pricing=filter_pricing,
+            filter_interval_start=filter_interval_start,
+            filter_interval_end=filter_interval_end,
+            sort=sort,
+            count_mode=count_mode,
+            cursor=cursor,
+            include_description=include_description,
+            filter_uf=filter_uf,
+            filter_city=filter_city,
+            filter_category=filter_category,
+            facets=facets
+        )
+    with span("serialize"):
+        body = serialize_event_list(response)
+    return cached_body_response(request, body, events_cache_control())
+
+@app.post("/events/{event_id}/views", tags=["Events"], status_code=status.HTTP_202_ACCEPTED)
+async def track_event_view(event_id: uuid.UUID) -> Dict[str, Any]:
+    """
+    Registra uma visualização do evento. A gravação é feita em lote, de forma
+    assíncrona; com o buffer cheio responde 503 com Retry-After.
+    """
+    if not view_buffer.add(event_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "data": None,
+                "error": {
+                    "code": "VIEW_BUFFER_FULL",
+                    "message": "Muitas visualizações pendentes. Tente novamente em instantes.",
+                    "details": []
+                }
+            },
+            headers={"Retry-After": str(max(1, round(view_buffer.flush_interval)))}
+        )
+    return {"data": {"accepted": True}, "error": None}
+
+# Módulos usados só pelas rotas de estatísticas e de importação/exportação
+# são importados na primeira chamada, fora do caminho da partida a frio
+def _transfer_format(fmt: str) -> str:
+    from Services import EventTransfer
+
+    if fmt not in EventTransfer.MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "data": None,
+                "error": {
+                    "code": "INVALID_QUERY_PARAMS",
+                    "message": "O parâmetro 'format' deve ser 'ndjson' ou 'csv'.",
+                    "details": [{"field": "format", "message": "Valor inválido"}]
+                }
+            }
+        )
+    return fmt
+
+# Token das rotas administrativas (importação e exportação em lote), enviado como "Authorization: Bearer <token>".
+# Sem EVENTS_ADMIN_TOKEN essas rotas ficam fora da API pública (404)
+ADMIN_TOKEN = getenv("EVENTS_ADMIN_TOKEN") or None
+admin_bearer = HTTPBearer(auto_error=False)
+
+async def require_admin(credentials: Optional[HTTPAuthorizationCredentials] = Depends(admin_bearer)) -> None:
+    """Libera a rota só com o token administrativo; a comparação não depende do tempo"""
+    if ADMIN_TOKEN is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"data": None, "error": {"code": "NOT_FOUND", "message": "Rota não encontrada.", "details": []}}
+        )
+    if credentials is None or not secrets.compare_digest(credentials.credentials.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "data": None,
+                "error": {"code": "UNAUTHORIZED", "message": "Token administrativo ausente ou inválido.", "details": []}
+            },
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+# Importação e exportação em lote
+@app.get(
+    "/events/export", tags=["Events"], dependencies=[Depends(require_admin)], include_in_schema=ADMIN_TOKEN is not None
+)
+async def export_events(
+    format: str = Query(
+        "ndjson", description="Formato do arquivo: ndjson (um evento JSON por linha) ou csv."
     )
-    return response
+) -> StreamingResponse:
+    """
+    Exporta todos os eventos, enviados em partes à medida que são lidos do
+    banco (cursor do lado do servidor), sem montar o arquivo em memória.
+    Exige o token administrativo (EVENTS_ADMIN_TOKEN): o download segura uma
+    conexão do pool do primário até terminar.
+    """
+    from Services import EventTransfer
+
+    fmt = _transfer_format(format)
+    if is_async_mode():
+        body = EventTransfer.export_events_async(fmt)
+    else:
+        # Gerador síncrono: o Starlette o consome no threadpool
+        body = EventTransfer.export_events(fmt)
+    return StreamingResponse(
+        body,
+        media_type=EventTransfer.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="events.{fmt}"', **NO_STORE_HEADERS}
+    )
+
+@app.post(
+    "/events/import", tags=["Events"], dependencies=[Depends(require_admin)], include_in_schema=ADMIN_TOKEN is not None
+)
+async def import_events(
+    request: Request,
+    format: Optional[str] = Query(
+        None, description="Formato do corpo: ndjson ou csv. Padrão: pelo Content-Type (text/csv ou NDJSON)."
+    )
+) -> Dict[str, Any]:
+    """
+    Importa eventos em NDJSON ou CSV (mesmas colunas da exportação). O corpo é
+    lido em partes e gravado em blocos; registros inválidos e blocos que
+    falharem são listados no relatório, sem interromper os demais.
+    Exige o token administrativo (EVENTS_ADMIN_TOKEN).
+    """
+    from Services import EventTransfer
+
+    fmt = _transfer_format(format or EventTransfer.format_for_content_type(request.headers.get("content-type")))
+    with span("controller"):
+        report = await run_in_threadpool(
+            EventTransfer.import_events, EventTransfer.iter_request_body(request.stream()), fmt
+        )
+    return {"data": report, "error": None}
+
+# Estatísticas (respondidas a partir dos agregados por hora/dia)
+@app.get("/events/{event_id}/stats", tags=["Stats"])
+async def get_event_stats(
+    request: Request,
+    event_id: uuid.UUID,
+    granularity: str = Query(
+        "day", description="Tamanho de cada janela da série: hour ou day (UTC)."
+    ),
+    start: Optional[datetime] = Query(
+        None, description="Início do período (inclusive), recuado até o início da janela que o contém. Padrão: 48 horas ou 30 dias antes do fim."
+    ),
+    end: Optional[datetime] = Query(
+        None, description="Fim do período (exclusive), estendido até o fim da janela que o contém. Padrão: inclui a janela corrente."
+    ),
+    session: Session = Depends(read_session_dependency(BUDGET_STATS))
+) -> Response:
+    """Views e inscrições do evento por hora ou por dia, com os totais do período"""
+    from Controllers.StatsController import StatsController
+
+    with span("controller"):
+        content = await StatsController(session).event_stats(event_id, granularity, start, end)
+    return cached_json_response(request, content, events_cache_control())
+
+@app.get("/stats/top", tags=["Stats"])
+async def get_top_events(
+    request: Request,
+    window_hours: int = Query(
+        24, ge=1, le=24 * 90, description="Janela, em horas, considerada no ranking (eventos em alta)."
+    ),
+    metric: str = Query(
+        "score", description="Ordenação do ranking: score (views e inscrições ponderadas), views ou registrations."
+    ),
+    limit: int = Query(
+        10, ge=1, le=100, description="Número de eventos no ranking."
+    ),
+    session: Session = Depends(read_session_dependency(BUDGET_STATS))
+) -> Response:
+    """Eventos com mais atividade nas últimas `window_hours` horas"""
+    from Controllers.StatsController import StatsController
+
+    with span("controller"):
+        content = await StatsController(session).top_events(window_hours, metric, limit)
+    return cached_json_response(request, content, events_cache_control())
 
 # Tratamento de erros
 @app.exception_handler(HTTPException)
@@ -94,9 +393,41 @@ async def http_exception_handler(request, exc):
     """Tratamento padronizado de erros HTTP"""
     return JSONResponse(
         status_code=exc.status_code,
-        content=exc.detail
+        content=exc.detail,
+        headers={**(exc.headers or {}), **NO_STORE_HEADERS}
     )
 
+@app.exception_handler(DatabaseOverloaded)
+async def database_overloaded_handler(request, exc):
+    """Banco sem folga para o orçamento do endpoint (pool saturado, checkout ou statement_timeout esgotados): 503"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "data": None,
+            "error": {
+                "code": "DATABASE_BUSY",
+                "message": "Banco de dados sobrecarregado. Tente novamente em instantes.",
+                "details": []
+            }
+        },
+        headers={"Retry-After": str(exc.retry_after), **NO_STORE_HEADERS}
+    )
+
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request, exc):
+    """Timeouts do banco fora da listagem também viram 503; os demais erros seguem o tratamento geral"""
+    overloaded = database_overloaded(exc)
+    if overloaded is not None:
+        return await database_overloaded_handler(request, overloaded)
+    return await general_exception_handler(request, exc)
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request, exc):
+    """Erros de validação mantêm o formato padrão do FastAPI, sem cache"""
+    response = await request_validation_exception_handler(request, exc)
+    response.headers.update(NO_STORE_HEADERS)
+    return response
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Tratamento de erros gerais"""
@@ -111,11 +442,15 @@ async def general_exception_handler(request, exc):
                 "message": "Erro interno do servidor",
                 "details": []
             }
-        }
+        },
+        headers=NO_STORE_HEADERS
     )
 
-# Execução da aplicação
+# Execução em desenvolvimento (com reload); em produção use serve.py
 if __name__ == "__main__":
+    # Importado só aqui: em produção o uvicorn é carregado pelo serve.py
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -0,0 +1,256 @@
+# manage.py
+"""Comandos administrativos: python manage.py <comando>"""
+
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime
+from sqlmodel import Session, select, func
+
+from database import engine
+from Entities.Event import Event, EventView, EventRegistration, EventTypeEnum, PricingTypeEnum, search_ddl, search_rebuild_ddl
+from Repositories.PopularityRepository import PopularityRepository
+from Repositories.RollupRepository import RollupRepository
+from Repositories import EventQueries
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def rebuild_popularity(args) -> int:
+    """Recalcula a tabela event_popularity a partir das tabelas brutas"""
+    with Session(engine) as session:
+        total = PopularityRepository(session).rebuild()
+    print(f"✅ Popularidade recalculada para {total} eventos")
+    return 0
+
+
+def check_popularity(args) -> int:
+    """Compara os contadores de popularidade com as tabelas brutas"""
+    with Session(engine) as session:
+        mismatches = PopularityRepository(session).check_consistency()
+    if not mismatches:
+        print("✅ Contadores de popularidade consistentes")
+        return 0
+    print(f"❌ {len(mismatches)} eventos com contadores divergentes:")
+    for row in mismatches[:args.limit]:
+        print(
+            f"  {row['event_id']}: views {row['stored_view_count']} (esperado {row['view_count']}), "
+            f"inscrições {row['stored_registration_count']} (esperado {row['registration_count']}), "
+            f"pontuação na listagem {row['stored_popularity_score']} (esperado {row['score']})"
+        )
+    return 1
+
+
+def rebuild_rollups(args) -> int:
+    """Recalcula os agregados de views/inscrições por hora e por dia a partir das tabelas brutas"""
+    since = datetime.strptime(args.since, "%Y-%m-%d") if args.since else None
+    with Session(engine) as session:
+        total = RollupRepository(session).rebuild(since)
+    scope = f"a partir de {args.since}" if since else "completos"
+    print(f"✅ Agregados recalculados ({scope}); {total} janelas por hora no total")
+    return 0
+
+
+def setup_search(args) -> int:
+    """Cria o índice de busca textual (se necessário) e reindexa os eventos existentes"""
+    dialect = engine.dialect.name
+    statements = search_ddl(dialect) + search_rebuild_ddl(dialect)
+    if not statements:
+        print(f"⚠️ Dialeto '{dialect}' sem índice de busca; a busca usará ILIKE")
+        return 0
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+    print("✅ Índice de busca pronto")
+    return 0
+
+
+def migrate(args) -> int:
+    """Aplica as migrações do Alembic (alembic upgrade)"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    command.upgrade(config, args.revision)
+    print(f"✅ Banco migrado para '{args.revision}'")
+    return 0
+
+
+def _index_checks():
+    """Consultas representativas de /events e o índice que cada uma deve usar"""
+    dialect = engine.dialect.name
+    event_id = uuid.UUID(int=0)
+    since = datetime(2025, 1, 1)
+    return [
+        (
+            "ix_event_start_date_id_desc",
+            "listagem ordenada por data",
+            EventQueries.page_query({}, 1, 10, "date", dialect, EventQueries.COUNT_NONE),
+        ),
+        (
+            "ix_event_popularity_score_start_date_id",
+            "listagem ordenada por popularidade",
+            EventQueries.page_query({}, 1, 10, "popularity", dialect, EventQueries.COUNT_NONE),
+        ),
+        (
+            "ix_event_type_pricing_start_date",
+            "filtro por tipo + precificação + intervalo de datas",
+            select(Event.id).where(
+                Event.event_type == EventTypeEnum.online,
+                Event.pricing_type == PricingTypeEnum.gratis,
+                Event.start_date >= since,
+            ),
+        ),
+        (
+            "ix_event_location_uf_city",
+            "filtro por UF e cidade",
+            select(Event.id).where(Event.location_uf == "SP", Event.location_city == "São Paulo"),
+        ),
+        (
+            "ix_event_location_city",
+            "filtro só por cidade",
+            select(Event.id).where(Event.location_city == "São Paulo"),
+        ),
+        (
+            "ix_event_category_start_date",
+            "filtro por categoria + intervalo de datas",
+            select(Event.id).where(Event.category == "tecnologia", Event.start_date >= since),
+        ),
+        (
+            "ix_event_updated_at",
+            "eventos alterados (atualização do índice em memória)",
+            select(Event.id).where(Event.updated_at >= since),
+        ),
+        (
+            "ix_eventview_event_id_view_timestamp",
+            "views de um evento em uma janela de tempo",
+            select(func.sum(EventView.view_count)).where(
+                EventView.event_id == event_id,
+                EventView.view_timestamp >= since,
+            ),
+        ),
+        (
+            "ix_eventregistration_event_id",
+            "inscrições de um evento",
+            select(func.count()).select_from(EventRegistration).where(
+                EventRegistration.event_id == event_id
+            ),
+        ),
+    ]
+
+
+def _explain(connection, query) -> str:
+    if connection.dialect.name == "postgresql":
+        # Em tabelas pequenas o planner prefere seq scan; aqui só interessa se o índice é utilizável
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    rows = connection.execute(EventQueries.Explain(query, json=False)).all()
+    return "\n".join(" ".join(str(column) for column in row) for row in rows)
+
+
+def check_indexes(args) -> int:
+    """Roda EXPLAIN nas consultas de /events e confere se cada índice é usado"""
+    failures = 0
+    with engine.connect() as connection:
+        for index_name, description, query in _index_checks():
+            with connection.begin():
+                plan = _explain(connection, query)
+            used = index_name in plan
+            failures += not used
+            print(f"{'✅' if used else '❌'} {index_name}: {description}")
+            if args.verbose or not used:
+                print("   " + plan.replace("\n", "\n   "))
+    return 1 if failures else 0
+
+
+def check_pool(args) -> int:
+    """Pré-abre conexões e roda uma verificação de saúde do pool contra o banco configurado"""
+    import asyncio
+    import time
+    from database import DB_POOL_MODE
+    from db_pool import warm_up, PoolLivenessChecker
+
+    started = time.perf_counter()
+    warmed = warm_up(engine, args.connections)
+    print(f"✅ {warmed} conexões abertas em {(time.perf_counter() - started) * 1000:.1f} ms (DB_POOL_MODE={DB_POOL_MODE})")
+    print(f"   {engine.pool.status()}")
+
+    checker = PoolLivenessChecker([engine])
+    failed = asyncio.run(checker.check())
+    stats = checker.stats()
+    print(
+        f"{'❌' if failed else '✅'} verificação de saúde: {stats['checked']} conexões ociosas, "
+        f"{failed} falhas, {stats['lastRunSeconds'] * 1000:.1f} ms"
+    )
+    return 1 if failed else 0
+
+
+def check_routing(args) -> int:
+    """Mostra para qual banco vão as leituras de cada orçamento e o statement_timeout aplicado"""
+    from sqlalchemy import text
+    from database import replica_engine
+    from db_routing import ReadRouter, QUERY_BUDGETS, query_budget
+
+    router = ReadRouter(engine, replica_engine)
+    failures = 0
+    for name in QUERY_BUDGETS:
+        with query_budget(name):
+            for _ in range(2):
+                target = router.engine_for_read(QUERY_BUDGETS[name])
+                label = "réplica" if target is replica_engine else "primário"
+                try:
+                    with Session(target) as session:
+                        session.execute(text("SELECT 1"))
+                        timeout = (
+                            session.execute(text("SHOW statement_timeout")).scalar()
+                            if target.dialect.name == "postgresql" else "n/a"
+                        )
+                except Exception as e:
+                    print(f"⚠️ {name}: falha na {label}: {str(e).splitlines()[0]}")
+                    if target is replica_engine and not router.replica_available():
+                        continue  # A réplica saiu de rotação: tenta de novo no primário
+                    failures += 1
+                    break
+                url = target.url.render_as_string(hide_password=True)
+                print(f"✅ {name}: {label} ({url}), statement_timeout={timeout}")
+                break
+    return 1 if failures else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Comandos administrativos da DARC Events API")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("rebuild-popularity", help=rebuild_popularity.__doc__).set_defaults(func=rebuild_popularity)
+
+    check = commands.add_parser("check-popularity", help=check_popularity.__doc__)
+    check.add_argument("--limit", type=int, default=20, help="Número máximo de divergências exibidas")
+    check.set_defaults(func=check_popularity)
+
+    rollups = commands.add_parser("rebuild-rollups", help=rebuild_rollups.__doc__)
+    rollups.add_argument("--since", help="Recalcula só a partir desta data (YYYY-MM-DD)")
+    rollups.set_defaults(func=rebuild_rollups)
+
+    commands.add_parser("setup-search", help=setup_search.__doc__).set_defaults(func=setup_search)
+
+    upgrade = commands.add_parser("migrate", help=migrate.__doc__)
+    upgrade.add_argument("revision", nargs="?", default="head", help="Revisão alvo (padrão: head)")
+    upgrade.set_defaults(func=migrate)
+
+    explain = commands.add_parser("check-indexes", help=check_indexes.__doc__)
+    explain.add_argument("--verbose", action="store_true", help="Exibe o plano de todas as consultas")
+    explain.set_defaults(func=check_indexes)
+
+    pool = commands.add_parser("check-pool", help=check_pool.__doc__)
+    pool.add_argument("--connections", type=int, default=5, help="Número de conexões pré-abertas")
+    pool.set_defaults(func=check_pool)
+
+    commands.add_parser("check-routing", help=check_routing.__doc__).set_defaults(func=check_routing)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
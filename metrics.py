@@ -0,0 +1,280 @@
+# metrics.py
+
+from typing import Dict, List, Optional, Tuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import getenv
+import bisect
+import threading
+import time
+
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Server-Timing expõe a duração de cada etapa ao cliente; desative em produção se preferir
+SERVER_TIMING_ENABLED = getenv("SERVER_TIMING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus, com rótulos"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [contagem por bucket (+Inf no fim), soma]
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            base = list(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(base + [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Contador monotônico no formato do Prometheus, com rótulos"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(list(zip(self.label_names, labels)))} {value}")
+        return lines
+
+
+def _format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    escaped = [(key, str(value).replace("\\", "\\\\").replace('"', '\\"')) for key, value in pairs]
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP", ("method", "route", "status")
+)
+STAGE_DURATION = Histogram(
+    "app_stage_duration_seconds", "Duração de cada etapa (controller, service, repository, ...)", ("stage",)
+)
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Duração de cada consulta SQL", ("engine",))
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Consultas SQL por requisição", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Espera por uma conexão livre no pool", ("engine",)
+)
+
+HISTOGRAMS = [HTTP_REQUEST_DURATION, STAGE_DURATION, DB_QUERY_DURATION, DB_QUERIES_PER_REQUEST, DB_POOL_CHECKOUT_WAIT]
+
+SINGLE_FLIGHT_REQUESTS = Counter(
+    "single_flight_requests_total",
+    "Requisições idênticas simultâneas por resultado: leader (consultou o banco), coalesced (reaproveitou), timeout ou error",
+    ("flight", "outcome"),
+)
+
+COUNTERS = [SINGLE_FLIGHT_REQUESTS]
+
+
+class RequestMetrics:
+    """Métricas acumuladas durante uma requisição (consultas e etapas)"""
+
+    __slots__ = ("started", "queries", "db_time", "spans")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans: Dict[str, float] = {}
+
+    def server_timing(self) -> str:
+        """Valor do cabeçalho Server-Timing (durações em milissegundos)"""
+        entries = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        entries += [f"{name};dur={duration * 1000:.2f}" for name, duration in self.spans.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def begin_request() -> RequestMetrics:
+    metrics = RequestMetrics()
+    _request_metrics.set(metrics)
+    return metrics
+
+
+def current_request() -> Optional[RequestMetrics]:
+    return _request_metrics.get()
+
+
+@contextmanager
+def span(name: str):
+    """Mede uma etapa da requisição; aparece no Server-Timing e em app_stage_duration_seconds"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, name)
+        metrics = _request_metrics.get()
+        if metrics is not None:
+            metrics.spans[name] = metrics.spans.get(name, 0.0) + elapsed
+
+
+# Engines instrumentados, para as métricas de saturação do pool
+_engines: Dict[str, Engine] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Registra a contagem e a duração das consultas do engine (por requisição e no total)"""
+    _engines[name] = engine
+    if isinstance(engine.pool, _TimedCheckoutMixin):
+        engine.pool.metrics_name = name
+
+    @sa_event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @sa_event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_DURATION.observe(elapsed, name)
+        metrics = _request_metrics.get()
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += elapsed
+
+
+# Espera máxima no checkout para a requisição atual (orçamento do endpoint, ver
+# db_routing); None usa o pool_timeout do engine
+checkout_timeout: ContextVar[Optional[float]] = ContextVar("checkout_timeout", default=None)
+
+# Peso da última medida na média móvel da espera no checkout
+CHECKOUT_WAIT_SMOOTHING = 0.2
+
+
+class _TimedCheckoutMixin:
+    """
+    Mede quanto tempo o checkout espera por uma conexão livre e mantém uma
+    média móvel dessa espera (`recent_wait`), usada para recusar requisições
+    antes de entrarem na fila. A espera máxima segue `checkout_timeout`.
+    """
+
+    metrics_name = "default"
+    recent_wait = 0.0
+
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        self.max_overflow = max_overflow
+
+    def capacity(self) -> Optional[int]:
+        """Máximo de conexões (pool_size + max_overflow); None quando o overflow não tem limite."""
+        return None if self.max_overflow < 0 else self.size() + self.max_overflow
+
+    @property
+    def _timeout(self) -> float:
+        override = checkout_timeout.get()
+        return override if override is not None else self._pool_timeout
+
+    @_timeout.setter
+    def _timeout(self, value: float) -> None:
+        self._pool_timeout = value
+
+    def recreate(self):
+        # O pool novo herda o pool_timeout configurado, não o orçamento da requisição corrente
+        token = checkout_timeout.set(None)
+        try:
+            pool = super().recreate()
+        finally:
+            checkout_timeout.reset(token)
+        pool.metrics_name = self.metrics_name
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            self.recent_wait += (waited - self.recent_wait) * CHECKOUT_WAIT_SMOOTHING
+            DB_POOL_CHECKOUT_WAIT.observe(waited, self.metrics_name)
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def _pool_lines() -> List[str]:
+    gauges = {
+        "db_pool_checked_out": ("Conexões em uso", []),
+        "db_pool_capacity": ("Máximo de conexões (pool_size + max_overflow)", []),
+        "db_pool_saturation": ("Fração da capacidade do pool em uso", []),
+    }
+    for name, engine in sorted(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, _TimedCheckoutMixin):
+            continue
+        checked_out = pool.checkedout()
+        capacity = pool.capacity()
+        labels = _format_labels([("engine", name)])
+        gauges["db_pool_checked_out"][1].append(f"db_pool_checked_out{labels} {checked_out}")
+        if capacity is not None:
+            gauges["db_pool_capacity"][1].append(f"db_pool_capacity{labels} {capacity}")
+            gauges["db_pool_saturation"][1].append(f"db_pool_saturation{labels} {checked_out / capacity if capacity else 0}")
+
+    lines = []
+    for name, (description, samples) in gauges.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"] + samples
+    return lines
+
+
+def render_metrics() -> str:
+    """Todas as métricas no formato texto do Prometheus (0.0.4)"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.render()
+    for counter in COUNTERS:
+        lines += counter.render()
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
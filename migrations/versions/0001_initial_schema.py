@@ -0,0 +1,66 @@
+"""Esquema inicial: event, eventview e eventregistration
+
+Corresponde às tabelas antes criadas por SQLModel.metadata.create_all.
+Bancos que já têm essas tabelas devem ser marcados com
+`alembic stamp 0001` antes do primeiro `upgrade`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-07-17 18:19:44
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("summary", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=False),
+        sa.Column("end_date", sa.DateTime(), nullable=True),
+        sa.Column("photo_url", sa.String(), nullable=True),
+        sa.Column("location_city", sa.String(), nullable=False),
+        sa.Column("location_uf", sa.String(), nullable=False),
+        sa.Column("event_type", sa.Enum("presencial", "online", "hibrido", name="eventtypeenum"), nullable=False),
+        sa.Column("pricing_type", sa.Enum("gratis", "pago", name="pricingtypeenum"), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "eventview",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.Column("view_timestamp", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["event.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "eventregistration",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.Column("registration_timestamp", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("payment_id", sa.Uuid(), nullable=True),
+        sa.ForeignKeyConstraint(["event_id"], ["event.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("eventregistration")
+    op.drop_table("eventview")
+    op.drop_table("event")
+    sa.Enum(name="pricingtypeenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="eventtypeenum").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,65 @@
+"""Contadores de popularidade e índice de busca textual
+
+Cria event_popularity (preenchida a partir das tabelas brutas) e o índice
+de busca: coluna tsvector + GIN no Postgres, tabela FTS5 no SQLite.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-07-21 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from Entities.Event import search_ddl, search_rebuild_ddl, WEIGHT_VIEW, WEIGHT_REGISTRATION
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_popularity",
+        sa.Column("event_id", sa.Uuid(), nullable=False),
+        sa.Column("view_count", sa.Integer(), nullable=False),
+        sa.Column("registration_count", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["event.id"]),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_index("ix_event_popularity_score", "event_popularity", ["score"])
+
+    # Backfill: views e inscrições agregadas separadamente para não multiplicar linhas
+    op.execute(f"""
+        INSERT INTO event_popularity (event_id, view_count, registration_count, score)
+        SELECT e.id,
+               coalesce(v.view_count, 0),
+               coalesce(r.registration_count, 0),
+               coalesce(v.view_count, 0) * {WEIGHT_VIEW} + coalesce(r.registration_count, 0) * {WEIGHT_REGISTRATION}
+        FROM event e
+        LEFT JOIN (SELECT event_id, count(*) AS view_count FROM eventview GROUP BY event_id) v ON v.event_id = e.id
+        LEFT JOIN (SELECT event_id, count(*) AS registration_count FROM eventregistration GROUP BY event_id) r ON r.event_id = e.id
+    """)
+
+    dialect = op.get_bind().dialect.name
+    for statement in search_ddl(dialect) + search_rebuild_ddl(dialect):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_event_search_vector")
+        op.execute("ALTER TABLE event DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("event_fts_ai", "event_fts_ad", "event_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS event_fts")
+
+    op.drop_index("ix_event_popularity_score", table_name="event_popularity")
+    op.drop_table("event_popularity")
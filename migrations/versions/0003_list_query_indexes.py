@@ -0,0 +1,37 @@
+"""Índices para os filtros e ordenações de /events
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-07-24 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_event_start_date_id_desc", "event", [sa.text("start_date DESC"), sa.text("id DESC")]
+    )
+    op.create_index(
+        "ix_event_type_pricing_start_date", "event", ["event_type", "pricing_type", "start_date"]
+    )
+    op.create_index(
+        "ix_eventview_event_id_view_timestamp", "eventview", ["event_id", "view_timestamp"]
+    )
+    op.create_index("ix_eventregistration_event_id", "eventregistration", ["event_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_eventregistration_event_id", table_name="eventregistration")
+    op.drop_index("ix_eventview_event_id_view_timestamp", table_name="eventview")
+    op.drop_index("ix_event_type_pricing_start_date", table_name="event")
+    op.drop_index("ix_event_start_date_id_desc", table_name="event")
@@ -0,0 +1,92 @@
+"""Agregados de views e inscrições por hora e por dia
+
+Cria event_activity_hourly e event_activity_daily (preenchidas a partir das
+tabelas brutas), usadas por /events/{id}/stats e /stats/top. O backfill fica
+escrito aqui, com as tabelas como eram nesta revisão (cada linha de eventview
+vale uma view; view_count só chega na 0007), em vez de importar o repositório.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-07-28 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROLLUP_TABLES = ("event_activity_hourly", "event_activity_daily")
+GRANULARITIES = {"event_activity_hourly": "hour", "event_activity_daily": "day"}
+
+# Mesmo formato em que o SQLAlchemy grava DateTime no SQLite, para casar com a chave primária
+SQLITE_BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00:00.000000", "day": "%Y-%m-%d 00:00:00.000000"}
+
+eventview = sa.table("eventview", sa.column("event_id"), sa.column("view_timestamp"))
+eventregistration = sa.table("eventregistration", sa.column("event_id"), sa.column("registration_timestamp"))
+
+
+def bucket_start(column, granularity: str, dialect: str):
+    if dialect == "postgresql":
+        return sa.func.date_trunc(granularity, column)
+    return sa.func.strftime(SQLITE_BUCKET_FORMATS[granularity], column)
+
+
+def backfill(table_name: str, dialect: str):
+    """INSERT ... SELECT com views e inscrições empilhadas (UNION ALL) e somadas por janela."""
+    granularity = GRANULARITIES[table_name]
+    views = sa.select(
+        eventview.c.event_id.label("event_id"),
+        bucket_start(eventview.c.view_timestamp, granularity, dialect).label("bucket_start"),
+        sa.literal(1).label("view_count"),
+        sa.literal(0).label("registration_count"),
+    )
+    registrations = sa.select(
+        eventregistration.c.event_id.label("event_id"),
+        bucket_start(eventregistration.c.registration_timestamp, granularity, dialect).label("bucket_start"),
+        sa.literal(0).label("view_count"),
+        sa.literal(1).label("registration_count"),
+    )
+    activity = sa.union_all(views, registrations).subquery("activity")
+    aggregated = sa.select(
+        activity.c.event_id,
+        activity.c.bucket_start,
+        sa.func.sum(activity.c.view_count),
+        sa.func.sum(activity.c.registration_count),
+    ).group_by(activity.c.event_id, activity.c.bucket_start)
+    target = sa.table(
+        table_name,
+        sa.column("event_id"), sa.column("bucket_start"), sa.column("view_count"), sa.column("registration_count"),
+    )
+    return sa.insert(target).from_select(
+        ["event_id", "bucket_start", "view_count", "registration_count"], aggregated
+    )
+
+
+def upgrade() -> None:
+    for table_name in ROLLUP_TABLES:
+        op.create_table(
+            table_name,
+            sa.Column("event_id", sa.Uuid(), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("view_count", sa.Integer(), nullable=False),
+            sa.Column("registration_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["event_id"], ["event.id"]),
+            sa.PrimaryKeyConstraint("event_id", "bucket_start"),
+        )
+        op.create_index(f"ix_{table_name}_bucket_start", table_name, ["bucket_start"])
+
+    dialect = op.get_bind().dialect.name
+    for table_name in ROLLUP_TABLES:
+        op.execute(backfill(table_name, dialect))
+
+
+def downgrade() -> None:
+    for table_name in reversed(ROLLUP_TABLES):
+        op.drop_index(f"ix_{table_name}_bucket_start", table_name=table_name)
+        op.drop_table(table_name)
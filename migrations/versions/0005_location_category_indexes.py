@@ -0,0 +1,28 @@
+"""Índices para os filtros exatos de local e categoria de /events
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-08-04 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_event_location_uf_city", "event", ["location_uf", "location_city"])
+    op.create_index("ix_event_location_city", "event", ["location_city"])
+    op.create_index("ix_event_category_start_date", "event", ["category", "start_date"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_category_start_date", table_name="event")
+    op.drop_index("ix_event_location_city", table_name="event")
+    op.drop_index("ix_event_location_uf_city", table_name="event")
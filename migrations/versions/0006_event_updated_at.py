@@ -0,0 +1,122 @@
+"""Coluna event.updated_at, feed de mudanças do índice em memória da listagem
+
+Um trigger mantém a coluna atualizada também em UPDATEs feitos fora do ORM.
+Os comandos ficam copiados aqui (e não importados de Entities.Event) para
+que a migração continue fazendo o mesmo quando o modelo mudar.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-08-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPDATED_AT_TRIGGER = "event_updated_at"
+UPDATED_AT_FUNCTION = "event_set_updated_at"
+
+# Mesmo formato de texto que o SQLAlchemy grava (microssegundos)
+SQLITE_NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+POSTGRES_UPDATED_AT_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION {UPDATED_AT_FUNCTION}() RETURNS trigger AS $$
+    BEGIN
+        NEW.updated_at := timezone('utc', now());
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    f"DROP TRIGGER IF EXISTS {UPDATED_AT_TRIGGER} ON event",
+    f"""
+    CREATE TRIGGER {UPDATED_AT_TRIGGER} BEFORE UPDATE ON event
+    FOR EACH ROW EXECUTE FUNCTION {UPDATED_AT_FUNCTION}()
+    """,
+]
+
+SQLITE_UPDATED_AT_DDL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {UPDATED_AT_TRIGGER} AFTER UPDATE ON event
+    WHEN new.updated_at IS old.updated_at
+    BEGIN
+        UPDATE event SET updated_at = {SQLITE_NOW} WHERE rowid = new.rowid;
+    END
+    """,
+]
+
+# Recriar a tabela no SQLite descarta os triggers da busca e renumera o rowid,
+# então a busca é recriada e reindexada. O de UPDATE passa a reindexar só
+# quando muda o texto, não no UPDATE do trigger de updated_at.
+SQLITE_SEARCH_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts(rowid, name, summary, description)
+        VALUES (new.rowid, new.name, new.summary, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, name, summary, description)
+        VALUES ('delete', old.rowid, old.name, old.summary, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF name, summary, description ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, name, summary, description)
+        VALUES ('delete', old.rowid, old.name, old.summary, old.description);
+        INSERT INTO event_fts(rowid, name, summary, description)
+        VALUES (new.rowid, new.name, new.summary, new.description);
+    END
+    """,
+    "INSERT INTO event_fts(event_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        # O SQLite não aceita default não constante em ADD COLUMN: a coluna entra
+        # anulável, é preenchida e só então a tabela é recriada com NOT NULL e default
+        op.add_column("event", sa.Column("updated_at", sa.DateTime(), nullable=True))
+        op.execute(f"UPDATE event SET updated_at = {SQLITE_NOW}")
+        for trigger in ("event_fts_ai", "event_fts_ad", "event_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        with op.batch_alter_table("event", recreate="always") as batch:
+            batch.alter_column(
+                "updated_at",
+                existing_type=sa.DateTime(),
+                nullable=False,
+                server_default=sa.text("CURRENT_TIMESTAMP"),
+            )
+        # A cópia da tabela recria os índices pela reflexão, que perde o DESC
+        op.drop_index("ix_event_start_date_id_desc", table_name="event")
+        op.create_index("ix_event_start_date_id_desc", "event", [sa.text("start_date DESC"), sa.text("id DESC")])
+        for statement in SQLITE_SEARCH_TRIGGERS + SQLITE_UPDATED_AT_DDL:
+            op.execute(statement)
+    else:
+        op.add_column(
+            "event",
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.text("timezone('utc', now())"), nullable=False),
+        )
+        for statement in POSTGRES_UPDATED_AT_DDL:
+            op.execute(statement)
+    op.create_index("ix_event_updated_at", "event", ["updated_at"])
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(f"DROP TRIGGER IF EXISTS {UPDATED_AT_TRIGGER} ON event")
+        op.execute(f"DROP FUNCTION IF EXISTS {UPDATED_AT_FUNCTION}()")
+    elif dialect == "sqlite":
+        op.execute(f"DROP TRIGGER IF EXISTS {UPDATED_AT_TRIGGER}")
+    op.drop_index("ix_event_updated_at", table_name="event")
+    op.drop_column("event", "updated_at")
@@ -0,0 +1,30 @@
+"""Coluna eventview.view_count: uma linha pode representar várias visualizações
+
+Com o buffer pré-agregado (VIEW_BUFFER_PRE_AGGREGATE) cada evento e minuto é
+gravado como uma única linha com a contagem. As linhas existentes valem 1.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-08-25 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("eventview", sa.Column("view_count", sa.Integer(), server_default="1", nullable=False))
+
+
+def downgrade() -> None:
+    # Sem a coluna, linhas agregadas passam a valer 1 nas reconstruções a partir das tabelas brutas
+    # (rebuild-popularity/rebuild-rollups); os contadores e agregados atuais não são alterados
+    op.drop_column("eventview", "view_count")
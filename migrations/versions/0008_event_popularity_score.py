@@ -0,0 +1,85 @@
+"""Coluna event.popularity_score para a ordenação por popularidade sem JOIN
+
+Cópia de event_popularity.score na própria linha do evento, com um índice
+(popularity_score DESC, start_date DESC, id DESC) na ordem da listagem. O
+trigger de updated_at passa a ignorar UPDATEs que só mudam a pontuação.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-09-01 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UPDATED_AT_TRIGGER = "event_updated_at"
+UPDATED_AT_FUNCTION = "event_set_updated_at"
+INDEX_NAME = "ix_event_popularity_score_start_date_id"
+
+
+def _postgres_function(condition: str) -> str:
+    assignment = "NEW.updated_at := timezone('utc', now());"
+    if condition:
+        assignment = f"IF {condition} THEN {assignment} END IF;"
+    return f"""
+    CREATE OR REPLACE FUNCTION {UPDATED_AT_FUNCTION}() RETURNS trigger AS $$
+    BEGIN
+        {assignment}
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """
+
+
+def _sqlite_trigger(condition: str) -> str:
+    return f"""
+    CREATE TRIGGER {UPDATED_AT_TRIGGER} AFTER UPDATE ON event
+    WHEN {condition}
+    BEGIN
+        UPDATE event SET updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now') WHERE rowid = new.rowid;
+    END
+    """
+
+
+def _replace_updated_at_trigger(dialect: str, skip_popularity: bool) -> None:
+    if dialect == "postgresql":
+        condition = "NEW.popularity_score IS NOT DISTINCT FROM OLD.popularity_score" if skip_popularity else ""
+        op.execute(_postgres_function(condition))
+    elif dialect == "sqlite":
+        condition = "new.updated_at IS old.updated_at"
+        if skip_popularity:
+            condition += " AND new.popularity_score IS old.popularity_score"
+        op.execute(f"DROP TRIGGER IF EXISTS {UPDATED_AT_TRIGGER}")
+        op.execute(_sqlite_trigger(condition))
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    op.add_column("event", sa.Column("popularity_score", sa.Integer(), server_default="0", nullable=False))
+    # Trigger antes do backfill, para que ele não altere updated_at
+    _replace_updated_at_trigger(dialect, skip_popularity=True)
+    op.execute("""
+        UPDATE event SET popularity_score = (
+            SELECT p.score FROM event_popularity p WHERE p.event_id = event.id
+        )
+        WHERE id IN (SELECT event_id FROM event_popularity WHERE score != 0)
+    """)
+    op.create_index(
+        INDEX_NAME, "event", [sa.text("popularity_score DESC"), sa.text("start_date DESC"), sa.text("id DESC")]
+    )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    op.drop_index(INDEX_NAME, table_name="event")
+    # O trigger do SQLite cita a coluna: volta à versão anterior antes de removê-la
+    _replace_updated_at_trigger(dialect, skip_popularity=False)
+    op.drop_column("event", "popularity_score")
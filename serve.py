@@ -0,0 +1,162 @@
+# serve.py
+"""
+Servidor de produção: python serve.py [--workers N] [--port 8000]
+
+Sobe o uvicorn com vários workers (processos independentes). O número de
+workers vem de WEB_CONCURRENCY ou é calculado pelos núcleos e pela memória
+disponíveis (cgroup da máquina). O limite total de conexões com o banco
+(DB_MAX_CONNECTIONS) é dividido entre os workers e entre os engines que cada
+worker abre para o mesmo banco (no DB_MODE=async, o síncrono e o assíncrono),
+para não passar do limite do pooler do Supabase. A réplica
+(REPLICA_DATABASE_URL) tem o próprio pooler e recebe o mesmo limite.
+
+Cada worker tem seus próprios caches (respostas, consultas montadas, buffer
+de visualizações, métricas). Com o cache de respostas em memória, uma escrita
+só invalida o cache do worker que a recebeu; nos demais a entrada expira por
+EVENTS_CACHE_TTL. Use EVENTS_CACHE_BACKEND=redis para invalidar em todos.
+
+Use `python main.py` apenas em desenvolvimento.
+"""
+
+import argparse
+import math
+import os
+import sys
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+
+# Limite total de conexões de todos os workers; o padrão mantém as 5 + 10 de um único worker
+DEFAULT_MAX_CONNECTIONS = 15
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as file:
+            raw = file.read().split()[0]
+    except (OSError, IndexError):
+        return None
+    return int(raw) if raw.isdigit() else None
+
+
+def available_cpus() -> float:
+    """Núcleos disponíveis ao processo, respeitando a cota de CPU do cgroup"""
+    try:
+        cpus: float = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as file:
+            quota, period = file.read().split()
+        if quota != "max":
+            cpus = min(cpus, int(quota) / int(period))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def available_memory_mb() -> Optional[int]:
+    """Memória disponível (limite do cgroup ou memória física), em MB"""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        limit = _read_int(path)
+        # Sem limite, o cgroup v1 reporta um valor enorme
+        if limit is not None and limit < 1 << 60:
+            return limit // (1024 * 1024)
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def worker_count() -> int:
+    """WEB_CONCURRENCY, ou núcleos * WORKERS_PER_CORE limitado pela memória e por MAX_WORKERS"""
+    explicit = os.getenv("WEB_CONCURRENCY")
+    if explicit:
+        return max(1, int(explicit))
+
+    workers = math.ceil(available_cpus() * float(os.getenv("WORKERS_PER_CORE", "1")))
+    memory_mb = available_memory_mb()
+    if memory_mb is not None:
+        workers = min(workers, memory_mb // int(os.getenv("WORKER_MEMORY_MB", "256")))
+    workers = min(workers, int(os.getenv("MAX_WORKERS", "8")))
+    return max(1, workers)
+
+
+def engines_per_database() -> int:
+    """
+    Engines com pool que cada worker abre para um mesmo banco (ver database.py):
+    o síncrono sempre e, no DB_MODE=async, também o assíncrono.
+    """
+    return 2 if os.getenv("DB_MODE", "sync").lower() == "async" else 1
+
+
+def pool_sizes(budget: int, workers: int, engines: int) -> Tuple[int, int]:
+    """
+    (pool_size, max_overflow) de cada engine para que workers * engines pools
+    não passem de `budget` conexões, na proporção 1:2. Cada pool tem ao menos
+    uma conexão, mesmo que o limite seja menor que o número de pools.
+    """
+    per_pool = max(1, budget // (workers * engines))
+    pool_size = max(1, math.ceil(per_pool / 3))
+    return pool_size, max(0, per_pool - pool_size)
+
+
+def configure_pool(workers: int) -> None:
+    """
+    Divide DB_MAX_CONNECTIONS entre os pools de todos os workers
+    (`pool_sizes`). Valores definidos explicitamente são mantidos.
+    """
+    budget = int(os.getenv("DB_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS)))
+    engines = engines_per_database()
+    pool_size, max_overflow = pool_sizes(budget, workers, engines)
+    if workers * engines > budget:
+        print(f"⚠️ DB_MAX_CONNECTIONS={budget} não cobre uma conexão para cada um dos {workers * engines} pools")
+    os.environ.setdefault("DB_POOL_SIZE", str(pool_size))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max_overflow))
+
+    warmup = os.getenv("DB_POOL_WARMUP")
+    if warmup and int(warmup) > int(os.environ["DB_POOL_SIZE"]):
+        os.environ["DB_POOL_WARMUP"] = os.environ["DB_POOL_SIZE"]
+
+
+def main(argv=None) -> int:
+    # Carrega o .env antes de dimensionar, para que os workers herdem as mesmas variáveis
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8000")))
+    parser.add_argument("--workers", type=int, help="Número de workers (padrão: WEB_CONCURRENCY ou automático)")
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "20")),
+        help="Segundos para concluir as requisições em andamento no encerramento"
+    )
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args(argv)
+
+    workers = args.workers or worker_count()
+    configure_pool(workers)
+    print(
+        f"🚀 {workers} workers, {engines_per_database()} pool(s) por worker: "
+        f"{os.environ['DB_POOL_SIZE']} + {os.environ['DB_MAX_OVERFLOW']} conexões cada"
+    )
+    if workers > 1 and os.getenv("EVENTS_CACHE_BACKEND", "memory").lower() == "memory":
+        print("⚠️ Cache de respostas em memória: invalidações valem só para o worker que recebeu a escrita")
+
+    import uvicorn
+
+    # "auto" usa uvloop e httptools quando instalados
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop="auto",
+        http="auto",
+        timeout_graceful_shutdown=args.graceful_timeout,
+        log_level=args.log_level,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Fixtures dos testes: um banco SQLite temporário (a aplicação lê DATABASE_URL
+na importação, então o ambiente é montado antes de importar qualquer módulo
+dela), tabelas limpas e cache vazio a cada teste e um TestClient sem os
+eventos de inicialização (sem tarefas em segundo plano).
+
+    pip install -r requirements-dev.txt
+    python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DB_DIR = tempfile.mkdtemp(prefix="darc-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DB_DIR, 'primary.db')}"
+os.environ["DB_MODE"] = "sync"
+os.environ["EVENTS_CACHE_BACKEND"] = "memory"
+os.environ["STARTUP_WARM_QUERIES"] = "false"
+os.environ.pop("REPLICA_DATABASE_URL", None)
+os.environ.pop("EVENTS_MEMORY_INDEX", None)
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlmodel import Session, SQLModel
+
+import database
+from Entities.Event import (
+    Event, EventView, EventRegistration, EventPopularity, EventActivityHourly, EventActivityDaily,
+    EventTypeEnum, PricingTypeEnum
+)
+from Services import EventCache
+
+START = datetime(2025, 3, 1, 12, 0)
+
+
+def make_event(index: int, **overrides):
+    """Linha de Event com valores determinísticos (sobrescreva o que o teste precisar)."""
+    row = {
+        "id": uuid.UUID(int=index + 1),
+        "name": f"Evento {index}",
+        "summary": "Resumo do evento",
+        "description": "Descrição do evento",
+        "start_date": START + timedelta(days=index),
+        "end_date": None,
+        "photo_url": None,
+        "location_city": "São Paulo",
+        "location_uf": "SP",
+        "event_type": EventTypeEnum.presencial,
+        "pricing_type": PricingTypeEnum.gratis,
+        "category": "tecnologia",
+    }
+    row.update(overrides)
+    return row
+
+
+def insert_events(rows, bind=None):
+    with Session(bind or database.engine) as session:
+        session.exec(insert(Event), params=list(rows))
+        session.commit()
+
+
+def create_schema(bind) -> None:
+    SQLModel.metadata.create_all(bind)
+
+
+def clear_tables(bind) -> None:
+    with Session(bind) as session:
+        for model in (EventView, EventRegistration, EventPopularity, EventActivityHourly, EventActivityDaily, Event):
+            session.exec(delete(model))
+        session.commit()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    create_schema(database.engine)
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    clear_tables(database.engine)
+    if EventCache.event_cache is not None:
+        EventCache.event_cache.backend = EventCache.MemoryCacheBackend()
+    yield
+
+
+@pytest.fixture
+def migrated_db(monkeypatch):
+    """Banco SQLite à parte criado pelas migrações (alembic upgrade head); retorna (url, config do Alembic)."""
+    from alembic import command
+    from alembic.config import Config
+
+    path = os.path.join(DB_DIR, "migrated.db")
+    url = f"sqlite:///{path}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "head")
+    yield url, config
+    os.remove(path)
+
+
+@pytest.fixture(params=[database.DB_MODE_SYNC, database.DB_MODE_ASYNC])
+def db_mode(request, monkeypatch):
+    """
+    Roda o teste nos dois valores de DB_MODE. No async as rotas leem o mesmo
+    arquivo pelo aiosqlite; sem pool, porque cada requisição do TestClient
+    roda em um event loop próprio.
+    """
+    if request.param == database.DB_MODE_SYNC:
+        yield request.param
+        return
+
+    import asyncio
+    import db_routing
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    async_engine = create_async_engine(database.get_async_database_url(database.DATABASE_URL), poolclass=NullPool)
+    monkeypatch.setattr(database, "DB_MODE", database.DB_MODE_ASYNC)
+    monkeypatch.setattr(db_routing, "read_router", db_routing.ReadRouter(async_engine))
+    yield request.param
+    asyncio.run(async_engine.dispose())
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
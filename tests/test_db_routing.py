@@ -0,0 +1,153 @@
+import math
+import os
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+import database
+import db_routing
+from metrics import TimedQueuePool
+from Repositories import EventQueries
+from conftest import DB_DIR, clear_tables, create_schema, insert_events, make_event
+
+
+def sqlite_engine(name: str, **options):
+    return create_engine(
+        f"sqlite:///{os.path.join(DB_DIR, name)}", connect_args={"check_same_thread": False}, **options
+    )
+
+
+@pytest.fixture
+def replica():
+    engine = sqlite_engine("replica.db")
+    create_schema(engine)
+    clear_tables(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def use_router(monkeypatch):
+    """Troca o roteador de leituras da aplicação pelo montado no teste."""
+    def install(primary, replica=None):
+        router = db_routing.ReadRouter(primary, replica, retry_interval=60)
+        monkeypatch.setattr(db_routing, "read_router", router)
+        return router
+    return install
+
+
+@pytest.fixture
+def small_pool():
+    """Primário com uma única conexão, para saturar o pool segurando-a."""
+    engine = sqlite_engine("small-pool.db", poolclass=TimedQueuePool, pool_size=1, max_overflow=0, pool_timeout=5)
+    yield engine
+    engine.dispose()
+
+
+def listed_names(response):
+    assert response.status_code == 200
+    return [event["name"] for event in response.json()["data"]]
+
+
+def test_reads_go_to_the_replica(client, replica, use_router):
+    insert_events([make_event(0, name="No primário")])
+    insert_events([make_event(0, name="Na réplica")], bind=replica)
+    router = use_router(database.engine, replica)
+
+    assert listed_names(client.get("/events")) == ["Na réplica"]
+    assert (router.replica_reads, router.primary_reads) == (1, 0)
+
+
+def test_reads_fall_back_to_the_primary_while_the_replica_is_down(client, replica, use_router):
+    insert_events([make_event(0, name="No primário")])
+    insert_events([make_event(0, name="Na réplica")], bind=replica)
+    router = use_router(database.engine, replica)
+    router.mark_down()
+
+    assert listed_names(client.get("/events")) == ["No primário"]
+    assert (router.replica_reads, router.primary_reads) == (0, 1)
+    assert router.stats()["replicaAvailable"] is False
+
+
+def test_replica_connection_failure_takes_it_out_of_rotation(client, use_router):
+    insert_events([make_event(0, name="No primário")])
+    unreachable = sqlite_engine(os.path.join("sem-diretorio", "replica.db"))
+    router = use_router(database.engine, unreachable)
+
+    assert client.get("/events").status_code == 500
+    assert router.replica_failures == 1
+    assert not router.replica_available()
+
+    assert listed_names(client.get("/events")) == ["No primário"]
+    unreachable.dispose()
+
+
+def test_saturated_pool_sheds_reads(client, small_pool, use_router):
+    router = use_router(small_pool)
+    held = small_pool.connect()
+    try:
+        small_pool.pool.recent_wait = 1.0
+        started = time.perf_counter()
+        response = client.get("/events")
+        elapsed = time.perf_counter() - started
+    finally:
+        held.close()
+
+    assert response.status_code == 503
+    assert response.json()["error"]["code"] == "DATABASE_BUSY"
+    assert response.headers["Retry-After"] == "1"
+    assert response.headers["Cache-Control"] == "no-store"
+    assert router.shed == {db_routing.BUDGET_EVENTS: 1}
+    # Recusada antes de entrar na fila do checkout
+    assert elapsed < db_routing.QUERY_BUDGETS[db_routing.BUDGET_EVENTS].checkout_timeout
+
+
+def test_checkout_timeout_inside_the_query_is_503(client, small_pool, use_router):
+    router = use_router(small_pool)
+    held = small_pool.connect()
+    try:
+        response = client.get("/events")
+    finally:
+        held.close()
+
+    budget = db_routing.QUERY_BUDGETS[db_routing.BUDGET_EVENTS]
+    assert response.status_code == 503
+    assert response.json()["error"]["code"] == "DATABASE_BUSY"
+    assert response.headers["Retry-After"] == str(max(1, math.ceil(budget.checkout_timeout)))
+    assert router.shed == {}
+    assert router.timeouts == {f"{db_routing.BUDGET_EVENTS}:checkout": 1}
+
+
+class QueryCanceled(Exception):
+    pgcode = db_routing.QUERY_CANCELED
+
+
+def test_statement_timeout_is_503(client, monkeypatch):
+    insert_events([make_event(0)])
+
+    def canceled_facet_query(filters, dialect):
+        raise OperationalError("SELECT ...", {}, QueryCanceled("canceling statement due to statement timeout"))
+
+    monkeypatch.setattr(EventQueries, "cached_facet_query", canceled_facet_query)
+    response = client.get("/events", params={"facets": "true"})
+
+    assert response.status_code == 503
+    assert response.json()["error"]["code"] == "DATABASE_BUSY"
+    assert response.headers["Retry-After"] == "3"
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_other_database_errors_are_not_overload():
+    error = OperationalError("SELECT ...", {}, Exception("conexão perdida"))
+
+    assert db_routing.database_overloaded(error) is None
+
+
+def test_pool_capacity_uses_the_configured_overflow(small_pool):
+    assert small_pool.pool.capacity() == 1
+
+    unbounded = sqlite_engine("unbounded.db", poolclass=TimedQueuePool, pool_size=2, max_overflow=-1)
+    assert unbounded.pool.capacity() is None
+    unbounded.dispose()
@@ -0,0 +1,87 @@
+import pickle
+import threading
+
+import orjson
+from sqlmodel import Session
+
+import database
+from Entities.EventSchemas import serialize_event_list
+from Repositories.EventRepository import EventRepository
+from Services.EventCache import EventListCache, MemoryCacheBackend, RedisCacheBackend
+from Services.EventService import EventService
+from conftest import insert_events, make_event
+
+
+class FakeRedis:
+    """O suficiente do cliente redis-py para o RedisCacheBackend (valores em bytes)."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, b"0")) + 1).encode()
+        return int(self.values[key])
+
+
+def redis_cache():
+    return EventListCache(RedisCacheBackend("redis://cache", client=FakeRedis()))
+
+
+def list_events(cache):
+    with Session(database.engine) as session:
+        return EventService(EventRepository(session), cache).get_events({}, 1, 10, include_facets=True)
+
+
+def test_redis_entries_are_json():
+    insert_events([make_event(0), make_event(1)])
+    cache = redis_cache()
+
+    list_events(cache)
+
+    stored = [value for key, value in cache.backend.client.values.items() if not key.startswith("darc:generation:")]
+    assert len(stored) == 2  # listagem e facetas
+    for raw in stored:
+        orjson.loads(raw)
+
+
+def test_redis_hit_serializes_like_the_fresh_response():
+    insert_events([make_event(0, end_date=make_event(0)["start_date"]), make_event(1)])
+    cache = redis_cache()
+
+    fresh = list_events(cache)
+    cached = list_events(cache)
+
+    assert (cache.hits, cache.misses) == (1, 2)  # o acerto da listagem já traz as facetas
+    assert serialize_event_list(cached) == serialize_event_list(fresh)
+
+
+def test_redis_ignores_entries_that_are_not_json():
+    backend = RedisCacheBackend("redis://cache", client=FakeRedis())
+    backend.client.set("darc:events:1::abc", pickle.dumps({"data": []}))
+
+    assert backend.get("events:1::abc") is None
+
+
+def test_counters_are_exact_under_concurrent_lookups():
+    cache = EventListCache(MemoryCacheBackend())
+    cache.set("presente", {"data": []}, None)
+    threads_count, lookups = 8, 2000
+
+    def lookup():
+        for index in range(lookups):
+            cache.get("presente" if index % 2 else "ausente")
+
+    threads = [threading.Thread(target=lookup) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (threads_count * lookups // 2, threads_count * lookups // 2)
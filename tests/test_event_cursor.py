@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import update
+
+import database
+from Entities.Event import Event
+from conftest import START, insert_events, make_event
+
+EVENT_COUNT = 11
+PAGE_SIZE = 3
+
+
+@pytest.fixture
+def tied_events():
+    """Eventos com start_date, popularidade e relevância repetidos: só o id desempata."""
+    rows = [
+        make_event(
+            index,
+            start_date=START + timedelta(days=index // 3),
+            summary=" ".join(["festival"] * (1 + index % 2)),
+        )
+        for index in range(EVENT_COUNT)
+    ]
+    insert_events(rows)
+    with database.engine.begin() as connection:
+        for index, row in enumerate(rows):
+            connection.execute(
+                update(Event).where(Event.id == row["id"]).values(popularity_score=index % 4)
+            )
+
+
+def list_events(client, **params):
+    response = client.get("/events", params={"page_size": PAGE_SIZE, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ids(body):
+    return [event["id"] for event in body["data"]]
+
+
+CASES = [
+    {"sort": "date"},
+    {"sort": "popularity"},
+    {"sort": "relevance", "search": "festival"},
+]
+
+
+@pytest.mark.parametrize("params", CASES, ids=["date", "popularity", "relevance"])
+def test_cursor_walks_forward_and_back_over_ties(client, db_mode, tied_events, params):
+    expected = ids(list_events(client, **params, page_size=100))
+    assert len(expected) == EVENT_COUNT
+
+    pages = [list_events(client, **params)]
+    while pages[-1]["pagination"]["nextCursor"]:
+        pages.append(list_events(client, **params, cursor=pages[-1]["pagination"]["nextCursor"]))
+
+    assert [event_id for page in pages for event_id in ids(page)] == expected
+    assert len(pages) == -(-EVENT_COUNT // PAGE_SIZE)
+
+    # Voltando da última página pelo prevCursor as mesmas páginas reaparecem
+    back = [pages[-1]]
+    while back[-1]["pagination"]["prevCursor"]:
+        back.append(list_events(client, **params, cursor=back[-1]["pagination"]["prevCursor"]))
+
+    assert [ids(page) for page in reversed(back)] == [ids(page) for page in pages]
+
+
+def test_cursor_pages_skip_the_total_by_default(client, db_mode, tied_events):
+    first = list_events(client)
+    after = list_events(client, cursor=first["pagination"]["nextCursor"])
+
+    assert first["pagination"]["totalItems"] == EVENT_COUNT
+    assert after["pagination"]["totalItems"] is None
+    assert after["pagination"]["totalPages"] is None
+
+
+def test_cursor_pages_count_when_asked(client, tied_events):
+    first = list_events(client)
+    after = list_events(client, cursor=first["pagination"]["nextCursor"], count_mode="exact")
+
+    assert after["pagination"]["totalItems"] == EVENT_COUNT
@@ -0,0 +1,191 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+import database
+from Entities.Event import Event, EventTypeEnum
+from Repositories import EventQueries
+from Repositories.EventRepository import EventRepository
+from Repositories.PopularityRepository import PopularityRepository
+from conftest import insert_events, make_event
+
+SORTS = (EventQueries.SORT_DATE, EventQueries.SORT_POPULARITY, EventQueries.SORT_RELEVANCE)
+COUNT_MODES = (EventQueries.COUNT_EXACT, EventQueries.COUNT_NONE)
+
+
+@pytest.fixture
+def searchable_events():
+    insert_events([
+        make_event(0, name="Festival de música"),
+        make_event(1, name="Workshop de python", summary="música e dados"),
+        make_event(2, name="Palestra de carreira"),
+    ])
+    with Session(database.engine) as session:
+        # O evento mais antigo: só a popularidade o coloca na frente
+        PopularityRepository(session).increment(make_event(0)["id"], views=5)
+        session.commit()
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("count_mode", COUNT_MODES)
+def test_search_with_each_sort_sqlite(searchable_events, sort, count_mode):
+    with Session(database.engine) as session:
+        page = EventRepository(session).get_filtered_events_page(
+            {"search_query": "musica"}, 1, 10, sort, count_mode
+        )
+
+    names = [event["name"] for event in page["events"]]
+    assert sorted(names) == ["Festival de música", "Workshop de python"]
+    if sort == EventQueries.SORT_POPULARITY:
+        assert names[0] == "Festival de música"
+    if count_mode == EventQueries.COUNT_EXACT:
+        assert page["total"] == 2
+
+
+@pytest.mark.parametrize("sort", SORTS)
+@pytest.mark.parametrize("count_mode", COUNT_MODES)
+def test_search_with_each_sort_postgresql(sort, count_mode):
+    query = EventQueries.page_query({"search_query": "música"}, 1, 10, sort, "postgresql", count_mode)
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert "websearch_to_tsquery" in sql
+    assert "event_popularity" not in sql
+    assert ("ORDER BY event.popularity_score DESC" in sql) == (sort == EventQueries.SORT_POPULARITY)
+
+
+def test_search_with_popularity_sort_needs_no_join():
+    query = EventQueries.page_query(
+        {"search_query": "música"}, 1, 10, EventQueries.SORT_POPULARITY, "sqlite", EventQueries.COUNT_EXACT
+    )
+    sql = str(query.compile(dialect=database.engine.dialect))
+
+    assert "FROM event JOIN event_fts" in sql
+    assert "event_popularity" not in sql
+
+
+def test_popularity_score_follows_the_counters():
+    first, second = make_event(0)["id"], make_event(1)["id"]
+    long_ago = datetime(2020, 1, 1)
+    insert_events([make_event(0, updated_at=long_ago), make_event(1, updated_at=long_ago)])
+
+    with Session(database.engine) as session:
+        repository = EventRepository(session)
+        repository.bulk_record_views([(first, long_ago, 3), (second, long_ago, 1)])
+        repository.record_registration(second, "confirmed")
+        scores = dict(session.exec(select(Event.id, Event.popularity_score)).all())
+        updated = set(session.exec(select(Event.updated_at)).all())
+
+    # 3 views contra 1 view + 1 inscrição (peso 2)
+    assert scores == {first: 3, second: 3}
+    # A pontuação não conta como alteração do evento (feed do índice em memória)
+    assert updated == {long_ago}
+
+    with Session(database.engine) as session:
+        session.exec(Event.__table__.update().values(popularity_score=0, updated_at=Event.__table__.c.updated_at))
+        session.commit()
+        popularity = PopularityRepository(session)
+        assert {row["event_id"] for row in popularity.check_consistency()} == {first, second}
+        popularity.rebuild()
+        assert popularity.check_consistency() == []
+        assert dict(session.exec(select(Event.id, Event.popularity_score)).all()) == scores
+
+
+@pytest.fixture
+def varied_events():
+    EventQueries.statement_cache.clear()
+    EventQueries.statement_cache.hits = EventQueries.statement_cache.misses = 0
+    insert_events([
+        make_event(0, name="Festival de música", event_type=EventTypeEnum.presencial, location_uf="SP"),
+        make_event(1, name="Workshop de python", event_type=EventTypeEnum.online, location_uf="RJ"),
+        make_event(2, name="Meetup de python", event_type=EventTypeEnum.online, location_uf="SP"),
+        make_event(3, name="Feira de música", event_type=EventTypeEnum.hibrido, location_uf="MG"),
+    ])
+
+
+def listed_names(filters, page=1, page_size=10, cursor=None):
+    with Session(database.engine) as session:
+        page = EventRepository(session).get_filtered_events_page(
+            filters, page, page_size, EventQueries.SORT_DATE, EventQueries.COUNT_EXACT, cursor
+        )
+    return [event["name"] for event in page["events"]], page
+
+
+SAME_SHAPE = {
+    "type": [
+        ({"event_type": EventTypeEnum.online}, ["Meetup de python", "Workshop de python"]),
+        ({"event_type": EventTypeEnum.presencial}, ["Festival de música"]),
+        ({"event_type": EventTypeEnum.hibrido}, ["Feira de música"]),
+    ],
+    "search": [
+        ({"search_query": "python"}, ["Meetup de python", "Workshop de python"]),
+        ({"search_query": "música"}, ["Feira de música", "Festival de música"]),
+    ],
+    "uf_and_interval": [
+        (
+            {"location_uf": "SP", "start_date_interval": datetime(2025, 3, 1), "end_date_interval": datetime(2025, 3, 2)},
+            ["Festival de música"],
+        ),
+        (
+            {"location_uf": "SP", "start_date_interval": datetime(2025, 3, 2), "end_date_interval": datetime(2025, 3, 4)},
+            ["Meetup de python"],
+        ),
+    ],
+}
+
+
+@pytest.mark.parametrize("cases", SAME_SHAPE.values(), ids=SAME_SHAPE.keys())
+def test_same_shape_reuses_the_statement_with_new_values(varied_events, cases):
+    cache = EventQueries.statement_cache
+    statements = set()
+    for filters, expected in cases:
+        statement, _ = EventQueries.cached_page_query(
+            filters, 1, 10, EventQueries.SORT_DATE, "sqlite", EventQueries.COUNT_EXACT
+        )
+        statements.add(id(statement))
+        names, page = listed_names(filters)
+        assert names == expected
+        assert page["total"] == len(expected)
+
+    assert len(statements) == 1
+    # Uma montagem para a consulta da página; as demais chamadas reaproveitam
+    page_shapes = [key for key in cache._statements if key[0] == "page"]
+    assert len(page_shapes) == 1
+    assert cache.misses == 1
+    assert cache.hits == 2 * len(cases) - 1
+
+
+def test_other_shapes_get_their_own_statement(varied_events):
+    assert listed_names({"event_type": EventTypeEnum.online})[0] == ["Meetup de python", "Workshop de python"]
+    assert listed_names({"event_type": EventTypeEnum.online, "location_uf": "SP"})[0] == ["Meetup de python"]
+    assert listed_names({"location_uf": "SP"})[0] == ["Meetup de python", "Festival de música"]
+
+    assert EventQueries.statement_cache.stats()["shapes"] == 3
+
+
+def test_pages_and_cursors_reuse_the_statement(varied_events):
+    first, first_page = listed_names({}, page_size=2)
+    second, _ = listed_names({}, page=2, page_size=2)
+    next_cursor = EventQueries.decode_cursor(first_page["next_cursor"])
+    after_first, after_page = listed_names({}, page_size=2, cursor=next_cursor)
+    one_after, _ = listed_names({}, page_size=1, cursor=next_cursor)
+    back, _ = listed_names({}, page_size=2, cursor=EventQueries.decode_cursor(after_page["prev_cursor"]))
+
+    assert first == back == ["Feira de música", "Meetup de python"]
+    assert second == after_first == ["Workshop de python", "Festival de música"]
+    assert one_after == ["Workshop de python"]
+    # Offset (com janela), cursor para frente e para trás: três formatos, quaisquer que sejam os valores
+    page_shapes = [key for key in EventQueries.statement_cache._statements if key[0] == "page"]
+    assert len(page_shapes) == 3
+
+
+def test_same_shape_facets_count_the_new_values(varied_events):
+    with Session(database.engine) as session:
+        repository = EventRepository(session)
+        online = repository.get_facets({"event_type": EventTypeEnum.online})
+        presencial = repository.get_facets({"event_type": EventTypeEnum.presencial})
+
+    assert online["locationUf"] == [{"value": "RJ", "count": 1}, {"value": "SP", "count": 1}]
+    assert presencial["locationUf"] == [{"value": "SP", "count": 1}]
+    assert EventQueries.statement_cache.stats()["shapes"] == 1
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from Repositories import EventQueries
+from Services import EventCache
+from conftest import insert_events, make_event
+
+
+def database_error(*args, **kwargs):
+    raise OperationalError("SELECT ...", {}, Exception("conexão perdida"))
+
+
+@pytest.fixture
+def broken_listing(monkeypatch):
+    """A consulta da página falha no banco."""
+    monkeypatch.setattr(EventQueries, "cached_page_query", database_error)
+
+
+def test_listing_is_cacheable(client):
+    insert_events([make_event(i) for i in range(3)])
+
+    response = client.get("/events", params={"sort": "popularity"})
+
+    assert response.status_code == 200
+    assert "ETag" in response.headers
+    assert response.headers["Cache-Control"].startswith("public")
+    assert len(response.json()["data"]) == 3
+
+
+def test_failing_query_is_not_cached(client, broken_listing):
+    insert_events([make_event(i) for i in range(3)])
+
+    response = client.get("/events", params={"sort": "popularity"})
+
+    assert response.status_code == 500
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert response.json()["code"] == "SERVER_ERROR"
+    assert EventCache.event_cache.backend.size() == 0
+
+
+def test_failing_facets_are_not_cached(client, monkeypatch):
+    insert_events([make_event(0)])
+
+    monkeypatch.setattr(EventQueries, "cached_facet_query", database_error)
+    response = client.get("/events", params={"facets": "true"})
+
+    assert response.status_code == 500
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert EventCache.event_cache.backend.size() == 0
@@ -0,0 +1,131 @@
+import pytest
+
+from Entities.Event import EventTypeEnum, PricingTypeEnum
+from conftest import insert_events, make_event
+
+
+@pytest.fixture
+def listed_events():
+    insert_events([
+        make_event(0, name="Festival de música"),
+        make_event(
+            1, name="Workshop de python", summary="música e dados", event_type=EventTypeEnum.online,
+            pricing_type=PricingTypeEnum.pago, location_uf="RJ", location_city="Rio de Janeiro", category="educacao"
+        ),
+        make_event(2, name="Palestra de carreira", pricing_type=PricingTypeEnum.pago, location_city="Campinas"),
+        make_event(3, name="Hackathon", event_type=EventTypeEnum.online, category="educacao"),
+    ])
+
+
+# Parâmetros da listagem e os nomes esperados, na ordem da resposta (data decrescente)
+CASES = {
+    "all": ({}, ["Hackathon", "Palestra de carreira", "Workshop de python", "Festival de música"]),
+    "type": ({"filter_type": "online"}, ["Hackathon", "Workshop de python"]),
+    "pricing": ({"filter_pricing": "pago"}, ["Palestra de carreira", "Workshop de python"]),
+    "uf": ({"filter_uf": "rj"}, ["Workshop de python"]),
+    "city": ({"filter_city": "Campinas"}, ["Palestra de carreira"]),
+    "category": ({"filter_category": "educacao", "filter_type": "online"}, ["Hackathon", "Workshop de python"]),
+    "interval": (
+        {"filter_interval_start": "2025-03-02", "filter_interval_end": "2025-03-03"},
+        ["Palestra de carreira", "Workshop de python"],
+    ),
+    "search": ({"search": "musica"}, ["Workshop de python", "Festival de música"]),
+    "search_and_filter": ({"search": "música", "filter_pricing": "gratis"}, ["Festival de música"]),
+    "no_match": ({"search": "inexistente"}, []),
+}
+
+
+@pytest.mark.parametrize("params, expected", CASES.values(), ids=CASES.keys())
+@pytest.mark.parametrize("count_mode", ["exact", "estimate", "none"])
+def test_list_events(client, db_mode, listed_events, params, expected, count_mode):
+    response = client.get("/events", params={**params, "count_mode": count_mode})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [event["name"] for event in body["data"]] == expected
+    assert body["pagination"]["totalItems"] == (None if count_mode == "none" else len(expected))
+
+
+@pytest.mark.parametrize("count_mode", ["exact", "none"])
+def test_pages_split_the_listing(client, db_mode, listed_events, count_mode):
+    pages = [
+        client.get("/events", params={"page": page, "page_size": 3, "count_mode": count_mode}).json()
+        for page in (1, 2, 3)
+    ]
+
+    assert [len(page["data"]) for page in pages] == [3, 1, 0]
+    assert [page["pagination"]["nextPage"] for page in pages] == [2, None, None]
+    if count_mode == "exact":
+        assert [page["pagination"]["totalItems"] for page in pages] == [4, 4, 4]
+
+
+def test_async_mode_uses_the_async_repository(client, monkeypatch, listed_events, db_mode):
+    from Controllers.EventController import EventController
+
+    repositories = []
+    original = EventController.__init__
+
+    def spy(self, session=None):
+        original(self, session)
+        repositories.append(type(self.repository).__name__)
+
+    monkeypatch.setattr(EventController, "__init__", spy)
+    assert client.get("/events").status_code == 200
+
+    expected = "AsyncEventRepository" if db_mode == "async" else "EventRepository"
+    assert repositories == [expected]
+
+
+def buckets(*pairs):
+    return [{"value": value, "count": count} for value, count in pairs]
+
+
+# Facetas esperadas sob os filtros: cada uma por contagem decrescente, empate pelo valor
+FACET_CASES = {
+    "unfiltered": ({}, {
+        "eventType": buckets(("online", 2), ("presencial", 2)),
+        "pricingType": buckets(("gratis", 2), ("pago", 2)),
+        "locationUf": buckets(("SP", 3), ("RJ", 1)),
+        "category": buckets(("educacao", 2), ("tecnologia", 2)),
+    }),
+    "filtered": ({"filter_type": "online"}, {
+        "eventType": buckets(("online", 2)),
+        "pricingType": buckets(("gratis", 1), ("pago", 1)),
+        "locationUf": buckets(("RJ", 1), ("SP", 1)),
+        "category": buckets(("educacao", 2)),
+    }),
+    "search": ({"search": "musica"}, {
+        "eventType": buckets(("online", 1), ("presencial", 1)),
+        "pricingType": buckets(("gratis", 1), ("pago", 1)),
+        "locationUf": buckets(("RJ", 1), ("SP", 1)),
+        "category": buckets(("educacao", 1), ("tecnologia", 1)),
+    }),
+    "search_and_filter": ({"search": "música", "filter_uf": "SP"}, {
+        "eventType": buckets(("presencial", 1)),
+        "pricingType": buckets(("gratis", 1)),
+        "locationUf": buckets(("SP", 1)),
+        "category": buckets(("tecnologia", 1)),
+    }),
+    "no_match": ({"search": "inexistente"}, {
+        "eventType": [], "pricingType": [], "locationUf": [], "category": [],
+    }),
+}
+
+
+@pytest.mark.parametrize("params, expected", FACET_CASES.values(), ids=FACET_CASES.keys())
+def test_facet_counts(client, db_mode, listed_events, params, expected):
+    response = client.get("/events", params={**params, "facets": "true"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["facets"] == expected
+
+
+def test_facets_cover_all_pages(client, listed_events):
+    first = client.get("/events", params={"facets": "true", "page_size": 1}).json()
+    second = client.get("/events", params={"facets": "true", "page_size": 1, "page": 2}).json()
+
+    assert first["facets"] == second["facets"] == FACET_CASES["unfiltered"][1]
+
+
+def test_facets_only_when_asked(client, listed_events):
+    assert "facets" not in client.get("/events").json()
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import main
+from conftest import insert_events, make_event
+
+TOKEN = "token-de-teste"
+
+
+def ndjson(*indexes) -> bytes:
+    rows = []
+    for index in indexes:
+        row = make_event(index, name=f"Evento importado {index}")
+        rows.append(json.dumps({
+            **row,
+            "id": str(row["id"]),
+            "start_date": row["start_date"].isoformat(),
+            "event_type": row["event_type"].value,
+            "pricing_type": row["pricing_type"].value,
+        }))
+    return ("\n".join(rows) + "\n").encode()
+
+
+def post_import(client, body: bytes, token=None):
+    headers = {"Content-Type": "application/x-ndjson"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    return client.post("/events/import", content=body, headers=headers)
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", TOKEN)
+    return TOKEN
+
+
+def test_import_is_disabled_without_admin_token(client):
+    response = post_import(client, ndjson(0), token="qualquer")
+
+    assert response.status_code == 404
+    assert response.headers["Cache-Control"] == "no-store"
+    assert client.get("/events").json()["data"] == []
+
+
+@pytest.mark.parametrize("token", [None, "token-errado"])
+def test_import_requires_the_admin_token(client, admin_token, token):
+    response = post_import(client, ndjson(0), token=token)
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert response.json()["error"]["code"] == "UNAUTHORIZED"
+    assert client.get("/events").json()["data"] == []
+
+
+def test_import_with_admin_token(client, admin_token):
+    response = post_import(client, ndjson(0, 1), token=admin_token)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["inserted"] == 2
+
+
+def test_failed_chunk_log_has_no_row_data(client, admin_token, capsys):
+    insert_events([make_event(0)])
+
+    response = post_import(client, ndjson(0), token=admin_token)
+
+    report = response.json()["data"]
+    assert (report["inserted"], report["rejected"]) == (0, 1)
+    output = capsys.readouterr().out
+    assert "Error importing events (chunk 0): IntegrityError" in output
+    assert "Evento importado" not in output
+    assert str(make_event(0)["id"]) not in output
+
+
+def get_export(client, token=None):
+    headers = {"Authorization": f"Bearer {token}"} if token is not None else {}
+    return client.get("/events/export", headers=headers)
+
+
+def test_export_is_disabled_without_admin_token(client):
+    insert_events([make_event(0)])
+
+    response = get_export(client, token="qualquer")
+
+    assert response.status_code == 404
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+@pytest.mark.parametrize("token", [None, "token-errado"])
+def test_export_requires_the_admin_token(client, admin_token, token):
+    insert_events([make_event(0)])
+
+    response = get_export(client, token=token)
+
+    assert response.status_code == 401
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert str(make_event(0)["id"]) not in response.text
+
+
+def test_export_with_admin_token(client, admin_token):
+    insert_events([make_event(0), make_event(1)])
+
+    response = get_export(client, token=admin_token)
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(row["id"] for row in rows) == sorted(str(make_event(index)["id"]) for index in (0, 1))
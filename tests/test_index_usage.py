@@ -0,0 +1,129 @@
+"""
+Cada formato de consulta de /events tem que usar o seu índice `ix_event_*`
+(EXPLAIN QUERY PLAN no SQLite). No Postgres a mesma conferência roda com
+`python manage.py check-indexes`.
+"""
+
+import re
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+import database
+from Repositories import EventQueries
+from Services.EventService import EventService
+from manage import _explain, _index_checks
+
+INTERVAL = {"start_date_interval": "2025-01-01", "end_date_interval": "2025-02-01"}
+
+# (filtros como chegam do controller, índice esperado)
+SHAPES = [
+    ({"event_type": "online", "pricing_type": "gratis", **INTERVAL}, "ix_event_type_pricing_start_date"),
+    ({"event_type": "online"}, "ix_event_type_pricing_start_date"),
+    (INTERVAL, "ix_event_start_date_id_desc"),
+    ({"location_uf": "SP", "location_city": "São Paulo"}, "ix_event_location_uf_city"),
+    ({"location_uf": "SP"}, "ix_event_location_uf_city"),
+    ({"location_city": "São Paulo"}, "ix_event_location_city"),
+    ({"category": "tecnologia", **INTERVAL}, "ix_event_category_start_date"),
+    ({"category": "tecnologia"}, "ix_event_category_start_date"),
+]
+SHAPE_IDS = [index for _, index in SHAPES]
+
+# Leitura de `event` sem índice nenhum
+FULL_SCAN = re.compile(r"SCAN event(?! USING)")
+
+
+def plan_for(query) -> str:
+    with database.engine.connect() as connection:
+        return _explain(connection, query)
+
+
+def assert_uses(plan: str, index_name: str) -> None:
+    assert f"INDEX {index_name}" in plan, plan
+    assert not FULL_SCAN.search(plan), plan
+
+
+def validated(filters):
+    return EventService(None)._validate_filters(filters)
+
+
+@pytest.mark.parametrize("sort", (EventQueries.SORT_DATE, EventQueries.SORT_POPULARITY))
+@pytest.mark.parametrize("count_mode", (EventQueries.COUNT_NONE, EventQueries.COUNT_EXACT))
+@pytest.mark.parametrize("filters,index_name", SHAPES, ids=SHAPE_IDS)
+def test_filtered_page_uses_its_index(filters, index_name, sort, count_mode):
+    query = EventQueries.page_query(validated(filters), 1, 10, sort, "sqlite", count_mode)
+
+    assert_uses(plan_for(query), index_name)
+
+
+def test_unfiltered_page_by_date_walks_the_date_index():
+    query = EventQueries.page_query({}, 1, 10, EventQueries.SORT_DATE, "sqlite", EventQueries.COUNT_NONE)
+
+    plan = plan_for(query)
+    assert_uses(plan, "ix_event_start_date_id_desc")
+    # A ordem já vem do índice: sem ordenação em memória
+    assert "TEMP B-TREE" not in plan
+
+
+def test_cursor_page_seeks_on_the_date_index():
+    cursor = {
+        "sort": EventQueries.SORT_DATE,
+        "direction": EventQueries.CURSOR_NEXT,
+        "values": [datetime(2025, 1, 1), uuid.UUID(int=1)],
+    }
+    query = EventQueries.page_query({}, 1, 10, EventQueries.SORT_DATE, "sqlite", EventQueries.COUNT_NONE, cursor)
+
+    plan = plan_for(query)
+    assert_uses(plan, "ix_event_start_date_id_desc")
+    assert "(start_date,id)<(?,?)" in plan
+
+
+@pytest.mark.parametrize("filters,index_name", SHAPES, ids=SHAPE_IDS)
+def test_count_uses_its_index(filters, index_name):
+    assert_uses(plan_for(EventQueries.count_query(validated(filters), "sqlite")), index_name)
+
+
+@pytest.mark.parametrize("filters,index_name", SHAPES, ids=SHAPE_IDS)
+def test_facets_use_the_filter_index(filters, index_name):
+    plan = plan_for(EventQueries.facet_query(validated(filters), "sqlite"))
+
+    # Um GROUP BY por faceta, todos pelo índice do filtro
+    assert plan.count(f"INDEX {index_name}") == 4, plan
+    assert not FULL_SCAN.search(plan), plan
+
+
+INDEX_CHECKS = _index_checks()
+
+
+@pytest.mark.parametrize("index_name,description,query", INDEX_CHECKS, ids=[check[0] for check in INDEX_CHECKS])
+def test_check_indexes_queries(index_name, description, query):
+    assert_uses(plan_for(query), index_name)
+
+
+POPULARITY_CURSORS = [None] + [
+    {
+        "sort": EventQueries.SORT_POPULARITY,
+        "direction": direction,
+        "values": [3, datetime(2025, 1, 1), uuid.UUID(int=1)],
+    }
+    for direction in (EventQueries.CURSOR_NEXT, EventQueries.CURSOR_PREV)
+]
+
+
+@pytest.mark.parametrize("count_mode", (EventQueries.COUNT_NONE, EventQueries.COUNT_EXACT))
+@pytest.mark.parametrize("cursor", POPULARITY_CURSORS, ids=["offset", "cursor-next", "cursor-prev"])
+def test_popularity_page_walks_the_popularity_index(migrated_db, count_mode, cursor):
+    url, _ = migrated_db
+    query = EventQueries.page_query({}, 1, 10, EventQueries.SORT_POPULARITY, "sqlite", count_mode, cursor)
+
+    # Esquema criado pelas migrações, não pelo create_all dos testes
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            plan = _explain(connection, query)
+    finally:
+        engine.dispose()
+    assert_uses(plan, "ix_event_popularity_score_start_date_id")
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,85 @@
+import re
+
+from conftest import insert_events, make_event
+
+EVENTS_REQUEST = 'http_request_duration_seconds_count{method="GET",route="/events",status="200"}'
+EVENTS_QUERIES = 'db_queries_per_request_sum{route="/events"}'
+EVENTS_REQUESTS_WITH_QUERIES = 'db_queries_per_request_count{route="/events"}'
+
+
+def scrape(client):
+    """Amostras de /metrics como {série com rótulos: valor}."""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    samples = {}
+    for line in response.text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def delta(before, after, series):
+    return after.get(series, 0) - before.get(series, 0)
+
+
+def server_timing(response):
+    """Cabeçalho Server-Timing como {métrica: (duração em ms, descrição)}."""
+    entries = {}
+    for entry in response.headers["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        values = dict(param.split("=", 1) for param in params)
+        entries[name] = (float(values["dur"]), values.get("desc", "").strip('"'))
+    return entries
+
+
+def test_events_request_moves_the_metrics(client):
+    insert_events([make_event(0), make_event(1)])
+    before = scrape(client)
+
+    response = client.get("/events")
+    after = scrape(client)
+
+    assert response.status_code == 200
+    assert delta(before, after, EVENTS_REQUEST) == 1
+    assert delta(before, after, EVENTS_REQUESTS_WITH_QUERIES) == 1
+    queries = delta(before, after, EVENTS_QUERIES)
+    assert queries >= 1
+    assert delta(before, after, 'db_query_duration_seconds_count{engine="sync"}') == queries
+    for stage in ("controller", "service", "repository", "hydrate", "serialize"):
+        assert delta(before, after, f'app_stage_duration_seconds_count{{stage="{stage}"}}') == 1, stage
+    leaders = [
+        series for series in after
+        if series.startswith("single_flight_requests_total") and 'outcome="leader"' in series
+    ]
+    assert sum(delta(before, after, series) for series in leaders) == 1
+
+    # O Server-Timing traz as mesmas consultas e as etapas medidas
+    timing = server_timing(response)
+    assert timing["db"][1] == f"{int(queries)} queries"
+    assert {"controller", "service", "repository", "hydrate", "serialize", "total"} <= set(timing)
+    assert timing["total"][0] >= timing["controller"][0] >= timing["repository"][0]
+
+
+def test_cached_response_reports_no_queries(client):
+    insert_events([make_event(0)])
+    client.get("/events")
+    before = scrape(client)
+
+    response = client.get("/events")
+    after = scrape(client)
+
+    assert server_timing(response)["db"][1] == "0 queries"
+    assert delta(before, after, EVENTS_REQUEST) == 1
+    assert delta(before, after, EVENTS_QUERIES) == 0
+    assert delta(before, after, 'app_stage_duration_seconds_count{stage="repository"}') == 0
+
+
+def test_unmatched_routes_are_grouped(client):
+    before = scrape(client)
+
+    client.get("/nao-existe")
+    after = scrape(client)
+
+    assert delta(before, after, 'http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}') == 1
+    assert not [series for series in after if re.search(r'route="/nao-existe"', series)]
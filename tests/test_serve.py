@@ -0,0 +1,52 @@
+import pytest
+
+import serve
+
+
+@pytest.mark.parametrize("budget,workers,engines,expected", [
+    # Um worker síncrono mantém o padrão de 5 + 10
+    (15, 1, 1, (5, 10)),
+    (15, 2, 1, (3, 4)),
+    (15, 4, 1, (1, 2)),
+    # No modo async cada worker tem dois pools no primário
+    (15, 1, 2, (3, 4)),
+    (15, 3, 2, (1, 1)),
+    (60, 4, 2, (3, 4)),
+])
+def test_pool_sizes_fit_the_budget(budget, workers, engines, expected):
+    pool_size, max_overflow = serve.pool_sizes(budget, workers, engines)
+
+    assert (pool_size, max_overflow) == expected
+    assert workers * engines * (pool_size + max_overflow) <= budget
+
+
+def test_pool_sizes_keep_one_connection_per_pool():
+    assert serve.pool_sizes(3, 4, 2) == (1, 0)
+
+
+@pytest.fixture
+def pool_env(monkeypatch):
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_WARMUP"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "20")
+    return monkeypatch
+
+
+@pytest.mark.parametrize("mode,expected", [("sync", ("2", "3")), ("async", ("1", "1"))])
+def test_configure_pool_counts_the_engines_of_the_mode(pool_env, mode, expected):
+    pool_env.setenv("DB_MODE", mode)
+
+    serve.configure_pool(4)
+
+    assert (serve.os.environ["DB_POOL_SIZE"], serve.os.environ["DB_MAX_OVERFLOW"]) == expected
+
+
+def test_configure_pool_keeps_explicit_values(pool_env):
+    pool_env.setenv("DB_MODE", "async")
+    pool_env.setenv("DB_POOL_SIZE", "7")
+    pool_env.setenv("DB_POOL_WARMUP", "9")
+
+    serve.configure_pool(2)
+
+    assert serve.os.environ["DB_POOL_SIZE"] == "7"
+    assert serve.os.environ["DB_POOL_WARMUP"] == "7"
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from Services.AsyncEventService import AsyncEventService
+from Services.EventCache import EventListCache, MemoryCacheBackend
+from Services.EventService import EventService
+from Services.SingleFlight import (
+    SingleFlight, AsyncSingleFlight, OUTCOME_COALESCED, OUTCOME_ERROR, OUTCOME_LEADER
+)
+
+FOLLOWERS = 4
+KEY = "events:listagem"
+
+
+def database_error():
+    return OperationalError("SELECT ...", {}, Exception("conexão perdida"))
+
+
+class WaitedEvent(threading.Event):
+    """threading.Event que avisa quando `expected` threads já estão esperando nele."""
+
+    def __init__(self, expected: int):
+        super().__init__()
+        self.expected = expected
+        self.waiting = 0
+        self.all_waiting = threading.Event()
+        self._count_lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        with self._count_lock:
+            self.waiting += 1
+            if self.waiting == self.expected:
+                self.all_waiting.set()
+        return super().wait(timeout)
+
+
+def hold_until_followers_wait(flight: SingleFlight, leader_started: threading.Event) -> None:
+    """Chamado dentro da chamada líder: só segue quando todas as seguidoras estão esperando."""
+    call = next(iter(flight._calls.values()))
+    call.done = waited = WaitedEvent(FOLLOWERS)
+    leader_started.set()
+    assert waited.all_waiting.wait(5)
+
+
+def run_followers(target, leader_started: threading.Event):
+    """Dispara FOLLOWERS threads com `target` depois que a líder começou; retorna o resultado (ou erro) de cada uma."""
+    assert leader_started.wait(5)
+    outcomes = [None] * FOLLOWERS
+
+    def follower(position):
+        try:
+            outcomes[position] = target()
+        except BaseException as e:
+            outcomes[position] = e
+
+    threads = [threading.Thread(target=follower, args=(position,)) for position in range(FOLLOWERS)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_failing_leader_raises_in_every_follower():
+    flight = SingleFlight("test")
+    leader_started = threading.Event()
+    error = database_error()
+
+    def failing_load():
+        hold_until_followers_wait(flight, leader_started)
+        raise error
+
+    def unexpected_load():
+        raise AssertionError("a seguidora não deveria consultar o banco")
+
+    leader_outcome = []
+    leader = threading.Thread(target=lambda: leader_outcome.append(pytest.raises(OperationalError, flight.do, KEY, failing_load)))
+    leader.start()
+    threads, outcomes = run_followers(lambda: flight.do(KEY, unexpected_load), leader_started)
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    assert leader_outcome[0].value is error
+    assert all(outcome is error for outcome in outcomes)
+    assert flight._calls == {}
+    assert (flight.counts[OUTCOME_ERROR], flight.counts[OUTCOME_COALESCED]) == (1, FOLLOWERS)
+
+
+class FlakyRepository:
+    """Repositório da listagem cuja primeira consulta falha (depois que as seguidoras chegam)."""
+
+    def __init__(self, flight):
+        self.flight = flight
+        self.calls = 0
+        self.leader_started = threading.Event()
+
+    def get_filtered_events_page(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            hold_until_followers_wait(self.flight, self.leader_started)
+            raise database_error()
+        return {"events": [], "total": 0, "has_next": False, "next_cursor": None, "prev_cursor": None}
+
+
+def test_failing_leader_leaves_no_cache_entry():
+    cache = EventListCache(MemoryCacheBackend())
+    flight = SingleFlight("test")
+    repository = FlakyRepository(flight)
+    service = EventService(repository, cache, flight)
+
+    leader_response = []
+    leader = threading.Thread(target=lambda: leader_response.append(service.get_events({}, 1, 10)))
+    leader.start()
+    threads, responses = run_followers(lambda: service.get_events({}, 1, 10), repository.leader_started)
+    for thread in threads + [leader]:
+        thread.join(5)
+
+    for response in leader_response + responses:
+        assert response["error"]["code"] == "SERVER_ERROR"
+    assert repository.calls == 1
+    assert cache.backend.size() == 0
+
+    # A falha não ficou guardada: a próxima requisição consulta de novo e só então grava
+    assert service.get_events({}, 1, 10)["error"] is None
+    assert repository.calls == 2
+    assert cache.backend.size() == 1
+
+
+def test_failing_async_leader_raises_in_every_follower():
+    async def scenario():
+        flight = AsyncSingleFlight("test")
+        release = asyncio.Event()
+        error = database_error()
+
+        async def failing_load():
+            await release.wait()
+            raise error
+
+        async def unexpected_load():
+            raise AssertionError("a seguidora não deveria consultar o banco")
+
+        leader = asyncio.create_task(flight.do(KEY, failing_load))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do(KEY, unexpected_load)) for _ in range(FOLLOWERS)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(leader, *followers, return_exceptions=True)
+        return flight, error, outcomes
+
+    flight, error, outcomes = asyncio.run(scenario())
+
+    assert all(outcome is error for outcome in outcomes)
+    assert flight._calls == {}
+    assert flight.counts[OUTCOME_LEADER] == 0
+    assert (flight.counts[OUTCOME_ERROR], flight.counts[OUTCOME_COALESCED]) == (1, FOLLOWERS)
+
+
+def test_failing_async_leader_leaves_no_cache_entry():
+    class AsyncFlakyRepository:
+        def __init__(self):
+            self.calls = 0
+            self.release = asyncio.Event()
+
+        async def get_filtered_events_page(self, *args, **kwargs):
+            self.calls += 1
+            if self.calls == 1:
+                await self.release.wait()
+                raise database_error()
+            return {"events": [], "total": 0, "has_next": False, "next_cursor": None, "prev_cursor": None}
+
+    async def scenario():
+        cache = EventListCache(MemoryCacheBackend())
+        repository = AsyncFlakyRepository()
+        service = AsyncEventService(repository, cache, AsyncSingleFlight("test"))
+
+        requests = [asyncio.create_task(service.get_events({}, 1, 10)) for _ in range(FOLLOWERS + 1)]
+        await asyncio.sleep(0)
+        repository.release.set()
+        responses = await asyncio.gather(*requests)
+        return cache, repository, responses
+
+    cache, repository, responses = asyncio.run(scenario())
+
+    assert all(response["error"]["code"] == "SERVER_ERROR" for response in responses)
+    assert repository.calls == 1
+    assert cache.backend.size() == 0
@@ -0,0 +1,202 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlmodel import Session
+
+import database
+from Entities.Event import EventActivityDaily, EventActivityHourly
+from Repositories.EventRepository import EventRepository
+from Repositories.RollupRepository import RollupRepository
+from Services.StatsService import StatsService
+from conftest import DB_DIR, ROOT, insert_events, make_event
+
+DAY = datetime(2025, 3, 10)
+FIRST, SECOND = make_event(0)["id"], make_event(1)["id"]
+
+
+def record(views=(), registrations=()):
+    with Session(database.engine) as session:
+        repository = EventRepository(session)
+        repository.bulk_record_views([(event_id, timestamp, 1) for event_id, timestamp in views])
+        for event_id, timestamp in registrations:
+            repository.record_registration(event_id, "confirmed", registration_timestamp=timestamp)
+
+
+def rollups(model):
+    with Session(database.engine) as session:
+        rows = session.exec(select(model.event_id, model.bucket_start, model.view_count, model.registration_count))
+        return sorted(tuple(row) for row in rows.all())
+
+
+@pytest.fixture
+def activity():
+    insert_events([make_event(0), make_event(1)])
+    record(
+        views=[
+            (FIRST, DAY.replace(hour=10, minute=5)),
+            (FIRST, DAY.replace(hour=10, minute=20)),
+            (FIRST, DAY.replace(hour=12, minute=59)),
+            (SECOND, DAY.replace(hour=10, minute=30)),
+            (FIRST, DAY + timedelta(days=1, hours=3)),
+        ],
+        registrations=[(FIRST, DAY.replace(hour=12, minute=1)), (SECOND, DAY.replace(hour=23, minute=59))],
+    )
+
+
+def stats(client, event_id, **params):
+    response = client.get(f"/events/{event_id}/stats", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()["data"]
+
+
+def series(data):
+    return [(bucket["bucketStart"], bucket["views"], bucket["registrations"]) for bucket in data["series"]]
+
+
+def test_hourly_series_fills_the_empty_hours(client, activity):
+    data = stats(client, FIRST, granularity="hour", start="2025-03-10T10:00:00", end="2025-03-10T13:00:00")
+
+    assert series(data) == [
+        ("2025-03-10T10:00:00", 2, 0),
+        ("2025-03-10T11:00:00", 0, 0),
+        ("2025-03-10T12:00:00", 1, 1),
+    ]
+    assert data["totals"] == {"views": 3, "registrations": 1}
+
+
+def test_daily_series(client, activity):
+    data = stats(client, FIRST, granularity="day", start="2025-03-10T00:00:00", end="2025-03-12T00:00:00")
+
+    assert series(data) == [("2025-03-10T00:00:00", 3, 1), ("2025-03-11T00:00:00", 1, 0)]
+
+
+@pytest.mark.parametrize("start, end", [
+    ("2025-03-10T10:15:00", "2025-03-10T10:45:00"),
+    ("2025-03-10T10:00:00", "2025-03-10T10:00:01"),
+])
+def test_sub_hour_range_returns_the_partial_bucket(client, activity, start, end):
+    data = stats(client, FIRST, granularity="hour", start=start, end=end)
+
+    assert series(data) == [("2025-03-10T10:00:00", 2, 0)]
+    assert data["end"] == "2025-03-10T11:00:00"
+
+
+def test_end_on_a_bucket_boundary_is_exclusive(client, activity):
+    data = stats(client, FIRST, granularity="hour", start="2025-03-10T10:00:00", end="2025-03-10T12:00:00")
+
+    assert [bucket[0] for bucket in series(data)] == ["2025-03-10T10:00:00", "2025-03-10T11:00:00"]
+
+
+def test_stats_of_unknown_event(client):
+    response = client.get(f"/events/{FIRST}/stats")
+
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "EVENT_NOT_FOUND"
+
+
+@pytest.mark.parametrize("params", [
+    {"granularity": "week"},
+    {"start": "2025-03-10T12:00:00", "end": "2025-03-10T10:00:00"},
+])
+def test_stats_rejects_invalid_params(client, activity, params):
+    response = client.get(f"/events/{FIRST}/stats", params=params)
+
+    assert response.status_code == 400
+
+
+def test_top_events_by_metric(activity):
+    now = DAY + timedelta(days=1, hours=3, minutes=30)
+    with Session(database.engine) as session:
+        service = StatsService(RollupRepository(session))
+        by_score = service.get_top_events(window_hours=24, now=now)
+        by_views = service.get_top_events(window_hours=24, metric="views", limit=1, now=now)
+        last_hours = service.get_top_events(window_hours=2, now=now)
+        by_day = service.get_top_events(window_hours=24 * 7, now=now)
+
+    assert [(event["eventId"], event["views"], event["registrations"]) for event in by_score["data"]] == [
+        (FIRST, 4, 1), (SECOND, 1, 1)
+    ]
+    assert by_score["window"]["since"] == DAY.replace(hour=4)
+    assert [event["eventId"] for event in by_views["data"]] == [FIRST]
+    # A partir das 02:00 do dia seguinte só resta a view das 03:00
+    assert [(event["eventId"], event["views"]) for event in last_hours["data"]] == [(FIRST, 1)]
+    assert by_day["window"]["granularity"] == "day"
+    assert [event["score"] for event in by_day["data"]] == [
+        by_score["data"][0]["score"], by_score["data"][1]["score"]
+    ]
+
+
+def test_top_events_endpoint(client):
+    insert_events([make_event(0), make_event(1)])
+    now = datetime.utcnow()
+    record(views=[(SECOND, now), (SECOND, now), (FIRST, now)])
+
+    response = client.get("/stats/top", params={"window_hours": 1, "metric": "views"})
+
+    assert response.status_code == 200
+    assert [event["views"] for event in response.json()["data"]] == [2, 1]
+    assert client.get("/stats/top", params={"metric": "likes"}).status_code == 400
+
+
+def test_rebuild_matches_the_incremental_rollups(activity):
+    incremental = rollups(EventActivityHourly), rollups(EventActivityDaily)
+    with Session(database.engine) as session:
+        session.exec(text("DELETE FROM event_activity_hourly"))
+        session.exec(text("DELETE FROM event_activity_daily"))
+        session.commit()
+        RollupRepository(session).rebuild()
+
+    assert (rollups(EventActivityHourly), rollups(EventActivityDaily)) == incremental
+    assert len(incremental[0]) == 5
+
+
+def test_migration_backfills_the_rollups(monkeypatch):
+    from alembic import command
+    from alembic.config import Config
+
+    path = os.path.join(DB_DIR, "rollups.db")
+    url = f"sqlite:///{path}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "0003")
+
+    engine = create_engine(url)
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO event (id, name, summary, description, start_date, location_city, location_uf, "
+                "event_type, pricing_type, category) VALUES (:id, 'Evento', '', '', '2025-03-01 00:00:00.000000', "
+                "'São Paulo', 'SP', 'presencial', 'gratis', 'tecnologia')"
+            ), {"id": FIRST.hex})
+            for index, timestamp in enumerate(["2025-03-10 10:05:00.000000", "2025-03-10 10:50:00.000000"]):
+                connection.execute(
+                    text("INSERT INTO eventview (id, event_id, view_timestamp) VALUES (:id, :event_id, :timestamp)"),
+                    {"id": f"{index:032x}", "event_id": FIRST.hex, "timestamp": timestamp},
+                )
+            connection.execute(text(
+                "INSERT INTO eventregistration (id, event_id, registration_timestamp, status) "
+                "VALUES (:id, :event_id, '2025-03-11 08:00:00.000000', 'confirmed')"
+            ), {"id": "f" * 32, "event_id": FIRST.hex})
+
+        command.upgrade(config, "0004")
+
+        with engine.connect() as connection:
+            hourly = connection.execute(text(
+                "SELECT bucket_start, view_count, registration_count FROM event_activity_hourly ORDER BY bucket_start"
+            )).all()
+            daily = connection.execute(text(
+                "SELECT bucket_start, view_count, registration_count FROM event_activity_daily ORDER BY bucket_start"
+            )).all()
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+    assert [tuple(row) for row in hourly] == [
+        ("2025-03-10 10:00:00.000000", 2, 0), ("2025-03-11 08:00:00.000000", 0, 1)
+    ]
+    assert [tuple(row) for row in daily] == [
+        ("2025-03-10 00:00:00.000000", 2, 0), ("2025-03-11 00:00:00.000000", 0, 1)
+    ]
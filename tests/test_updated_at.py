@@ -0,0 +1,136 @@
+import os
+import re
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlmodel import Session
+
+import database
+from Entities.Event import Event, UPDATED_AT_TRIGGER
+from conftest import DB_DIR, ROOT, START, insert_events, make_event
+
+LONG_AGO = datetime(2020, 1, 1)
+
+
+def updated_at(bind, event_id):
+    with bind.connect() as connection:
+        return connection.execute(select(Event.updated_at).where(Event.id == event_id)).scalar_one()
+
+
+def test_update_outside_the_orm_bumps_updated_at():
+    row = make_event(0, updated_at=LONG_AGO)
+    insert_events([row])
+
+    with database.engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE event SET name = 'Renomeado por SQL'")
+
+    assert updated_at(database.engine, row["id"]) > START
+
+
+def test_search_index_survives_updates_outside_the_orm(client):
+    insert_events([make_event(0, updated_at=LONG_AGO), make_event(1, updated_at=LONG_AGO)])
+
+    with database.engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE event SET name = 'Hackathon de dados' WHERE location_uf = 'SP'")
+        connection.exec_driver_sql("UPDATE event SET category = 'dados'")
+        # Lança erro se o índice FTS divergir da tabela event
+        connection.exec_driver_sql("INSERT INTO event_fts(event_fts) VALUES ('integrity-check')")
+
+    response = client.get("/events", params={"search": "hackathon"})
+    assert len(response.json()["data"]) == 2
+
+
+def test_explicit_updated_at_is_kept():
+    row = make_event(0, updated_at=LONG_AGO)
+    insert_events([row])
+    moment = datetime(2024, 6, 1, 8, 30, 15, 250000)
+
+    with database.engine.begin() as connection:
+        connection.exec_driver_sql(
+            "UPDATE event SET name = 'Renomeado', updated_at = ?", (moment.isoformat(" "),)
+        )
+
+    assert updated_at(database.engine, row["id"]) == moment
+
+
+def test_orm_update_still_sets_updated_at():
+    row = make_event(0, updated_at=LONG_AGO)
+    insert_events([row])
+
+    with Session(database.engine) as session:
+        event = session.get(Event, row["id"])
+        event.name = "Renomeado pelo ORM"
+        session.commit()
+
+    assert updated_at(database.engine, row["id"]) > START
+
+
+def test_migration_creates_and_drops_the_trigger(migrated_db):
+    from alembic import command
+
+    url, config = migrated_db
+    engine = create_engine(url)
+    row = make_event(0, updated_at=LONG_AGO)
+    insert_events([row], bind=engine)
+
+    with engine.begin() as connection:
+        triggers = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars().all()
+        connection.exec_driver_sql("UPDATE event SET name = 'Renomeado por SQL'")
+    assert UPDATED_AT_TRIGGER in triggers
+    assert updated_at(engine, row["id"]) > START
+
+    command.downgrade(config, "0005")
+    with engine.connect() as connection:
+        triggers = connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").scalars().all()
+    assert UPDATED_AT_TRIGGER not in triggers
+    assert "updated_at" not in {column["name"] for column in inspect(engine).get_columns("event")}
+    engine.dispose()
+
+
+
+def test_migration_backfills_and_matches_the_model(monkeypatch):
+    from alembic import command
+    from alembic.config import Config
+
+    path = os.path.join(DB_DIR, "backfilled.db")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "migrations"))
+    command.upgrade(config, "0005")
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        for index, name in enumerate(["Show", "Hackathon de dados", "Feira"]):
+            connection.exec_driver_sql(
+                "INSERT INTO event (id, name, description, start_date, location_city, location_uf, "
+                "event_type, pricing_type, category) VALUES (?, ?, 'd', '2025-03-01 12:00:00.000000', "
+                "'São Paulo', 'SP', 'online', 'gratis', 'tecnologia')",
+                (f"{index + 1:032x}", name),
+            )
+        # Deixa um buraco no rowid, que a cópia da tabela renumera
+        connection.exec_driver_sql("DELETE FROM event WHERE name = 'Show'")
+
+    command.upgrade(config, "head")
+    try:
+        with engine.begin() as connection:
+            stored = connection.exec_driver_sql("SELECT updated_at FROM event").scalars().all()
+            # Lança erro se o índice FTS divergir da tabela event
+            connection.exec_driver_sql("INSERT INTO event_fts(event_fts) VALUES ('integrity-check')")
+            found = connection.exec_driver_sql(
+                "SELECT event.name FROM event JOIN event_fts ON event_fts.rowid = event.rowid "
+                "WHERE event_fts MATCH 'hackathon'"
+            ).scalars().all()
+        columns = {column["name"]: column for column in inspect(engine).get_columns("event")}
+        index_sql = inspect(engine).get_indexes("event")
+
+        # Backfill no mesmo formato do trigger (com microssegundos)
+        assert len(stored) == 2 and all(re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{6}", value) for value in stored)
+        assert not columns["updated_at"]["nullable"]
+        assert columns["updated_at"]["default"] == "CURRENT_TIMESTAMP"
+        assert found == ["Hackathon de dados"]
+        assert "ix_event_start_date_id_desc" in {index["name"] for index in index_sql}
+        # Modelos e migrações batem (alembic check lança erro se houver diferença)
+        command.check(config)
+    finally:
+        engine.dispose()
+        os.remove(path)
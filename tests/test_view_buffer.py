@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, select, func
+
+import database
+from Entities.Event import EventView, EventPopularity, EventActivityHourly
+from Repositories.PopularityRepository import PopularityRepository
+from Repositories.RollupRepository import RollupRepository
+from Services.ViewBuffer import ViewIngestionBuffer
+from conftest import insert_events, make_event
+
+MINUTE = datetime(2025, 3, 1, 12, 30)
+
+
+def add_views(buffer, event_id, count, at):
+    for second in range(count):
+        assert buffer.add(event_id, at + timedelta(seconds=second))
+
+
+def totals():
+    with Session(database.engine) as session:
+        rows, views = session.exec(select(func.count(), func.sum(EventView.view_count))).one()
+        popularity = {row.event_id: row.view_count for row in session.exec(select(EventPopularity)).all()}
+        hourly = {
+            (row.event_id, row.bucket_start): row.view_count for row in session.exec(select(EventActivityHourly)).all()
+        }
+    return rows, views, popularity, hourly
+
+
+@pytest.mark.parametrize("pre_aggregate", [False, True])
+def test_flush_writes_the_same_counts(pre_aggregate):
+    first, second = make_event(0)["id"], make_event(1)["id"]
+    insert_events([make_event(0), make_event(1)])
+    buffer = ViewIngestionBuffer(pre_aggregate=pre_aggregate)
+    add_views(buffer, first, 5, MINUTE)
+    add_views(buffer, first, 2, MINUTE + timedelta(minutes=1))
+    add_views(buffer, second, 3, MINUTE)
+
+    assert asyncio.run(buffer.flush()) == 10
+
+    rows, views, popularity, hourly = totals()
+    # Pré-agregado: uma linha por evento e minuto, com a contagem
+    assert rows == (3 if pre_aggregate else 10)
+    assert views == 10
+    assert popularity == {first: 7, second: 3}
+    assert hourly == {(first, MINUTE.replace(minute=0)): 7, (second, MINUTE.replace(minute=0)): 3}
+
+
+def test_rebuilds_from_aggregated_rows_are_exact():
+    event_id = make_event(0)["id"]
+    insert_events([make_event(0)])
+    buffer = ViewIngestionBuffer(pre_aggregate=True)
+    add_views(buffer, event_id, 4, MINUTE)
+    asyncio.run(buffer.flush())
+    before = totals()
+
+    with Session(database.engine) as session:
+        assert PopularityRepository(session).check_consistency() == []
+        PopularityRepository(session).rebuild()
+        RollupRepository(session).rebuild()
+
+    assert totals() == before